@@ -134,6 +134,14 @@ class ExportGLTF2_Base:
         default='',
     )
 
+    export_spill_buffers: BoolProperty(
+        name='Spill Buffers to Disk',
+        description='Write the vertex, index, animation and skin data to temporary files while exporting, '
+                    'instead of keeping it in memory until the .bin file is written. '
+                    'Lowers memory use on large scenery exports',
+        default=False
+    )
+
     export_texcoords: BoolProperty(
         name='UVs',
         description='Export UVs (texture coordinates) with meshes',
@@ -198,6 +206,22 @@ class ExportGLTF2_Base:
         default=True
     )
 
+    export_legacy_extraction: BoolProperty(
+        name='Legacy Mesh Extraction',
+        description='Extract mesh data loop by loop, as done by previous versions. '
+                    'Much slower, only use it if the default extraction gives wrong results',
+        default=False
+    )
+
+    export_extraction_chunk_size: IntProperty(
+        name='Extraction Chunk Size',
+        description='Extract meshes by chunks of this many triangles, writing their vertices directly in the '
+                    'interleaved buffer layout. Bounds memory use on very large meshes, vertices shared between '
+                    'chunks are duplicated. Meshes with shape keys are extracted at once (0 = whole mesh at once)',
+        default=0,
+        min=0
+    )
+
     export_materials: BoolProperty(
         name='Materials',
         description='Export materials',
@@ -417,6 +441,7 @@ class ExportGLTF2_Base:
         )
 
         export_settings['gltf_format'] = self.export_format
+        export_settings['gltf_spill_buffers'] = self.export_format == 'GLTF_SEPARATE' and self.export_spill_buffers
         export_settings['gltf_image_format'] = self.export_image_format
         export_settings['gltf_copyright'] = self.export_copyright
         export_settings['gltf_texcoords'] = self.export_texcoords
@@ -433,6 +458,8 @@ class ExportGLTF2_Base:
         else:
             export_settings['gltf_draco_mesh_compression'] = False
 
+        export_settings['gltf_legacy_extraction'] = self.export_legacy_extraction
+        export_settings['gltf_extraction_chunk_size'] = self.export_extraction_chunk_size
         export_settings['gltf_materials'] = self.export_materials
         export_settings['gltf_colors'] = self.export_colors
         export_settings['gltf_cameras'] = self.export_cameras
@@ -536,6 +563,7 @@ class GLTF_PT_export_main(bpy.types.Panel):
         layout.prop(operator, 'export_format')
         if operator.export_format == 'GLTF_SEPARATE':
             layout.prop(operator, 'export_texture_dir', icon='FILE_FOLDER')
+            layout.prop(operator, 'export_spill_buffers')
         layout.prop(operator, 'export_copyright')
         layout.prop(operator, 'will_save_settings')
 
@@ -621,6 +649,10 @@ class GLTF_PT_export_geometry(bpy.types.Panel):
         col.active = operator.export_normals
         col.prop(operator, 'export_tangents')
         layout.prop(operator, 'export_colors')
+        layout.prop(operator, 'export_legacy_extraction')
+        col = layout.column()
+        col.active = not operator.export_legacy_extraction
+        col.prop(operator, 'export_extraction_chunk_size')
         layout.prop(operator, 'export_materials')
         col = layout.column()
         col.active = operator.export_materials
@@ -905,6 +937,13 @@ class ImportGLTF2(Operator, ImportHelper):
         default=True
     )
 
+    import_trusted: BoolProperty(
+        name='Trusted Input',
+        description='Skip the validation of the glTF file. Only use this for files exported by this addon, '
+                    'invalid files can fail to import with unclear errors',
+        default=False
+    )
+
     def draw(self, context):
         layout = self.layout
 
@@ -915,6 +954,7 @@ class ImportGLTF2(Operator, ImportHelper):
         # layout.prop(self, 'guess_original_bind_pose')
         # layout.prop(self, 'bone_heuristic')
         layout.prop(self, 'include_sim_textures')
+        layout.prop(self, 'import_trusted')
 
     def execute(self, context):
         return self.import_gltf2(context)
@@ -0,0 +1,93 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+#
+# Axis aligned bounding boxes of the exported meshes and nodes.
+# A bounding box is a (min, max) tuple of two 3 component lists, or None when empty.
+#
+
+import typing
+
+import numpy as np
+from mathutils import Quaternion
+
+from io_scene_gltf2.io.com import gltf2_io
+from io_scene_gltf2.blender.exp import gltf2_blender_export_keys
+
+
+def positions_bounds(positions) -> typing.Optional[tuple]:
+    """Bounding box of a flat list or array of Vec3 positions."""
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    if len(positions) == 0:
+        return None
+    return positions.min(axis=0).tolist(), positions.max(axis=0).tolist()
+
+
+def merge_bounds(bounds: typing.Iterable[typing.Optional[tuple]]) -> typing.Optional[tuple]:
+    """Bounding box containing all the given ones."""
+    bounds = [b for b in bounds if b is not None]
+    if len(bounds) == 0:
+        return None
+    return (
+        np.min([b[0] for b in bounds], axis=0).tolist(),
+        np.max([b[1] for b in bounds], axis=0).tolist()
+    )
+
+
+def transform_bounds(bounds: typing.Optional[tuple], translation, rotation, scale) -> typing.Optional[tuple]:
+    """Bounding box of a box transformed by a glTF TRS (rotation is x, y, z, w)."""
+    if bounds is None:
+        return None
+
+    corners = np.array([[bounds[i >> k & 1][k] for k in range(3)] for i in range(8)], dtype=np.float64)
+    if scale is not None:
+        corners *= scale
+    if rotation is not None:
+        x, y, z, w = rotation
+        corners = corners @ np.array(Quaternion((w, x, y, z)).to_matrix(), dtype=np.float64).T
+    if translation is not None:
+        corners += translation
+
+    return corners.min(axis=0).tolist(), corners.max(axis=0).tolist()
+
+
+def gather_mesh_bounds(mesh: gltf2_io.Mesh, export_settings) -> typing.Optional[tuple]:
+    """Bounding box of a mesh, from the min and max of its POSITION accessors. Cached in the export settings."""
+    mesh_bounds = export_settings[gltf2_blender_export_keys.MESH_BOUNDS]
+    if mesh not in mesh_bounds:
+        accessors = [primitive.attributes['POSITION'] for primitive in mesh.primitives]
+        mesh_bounds[mesh] = merge_bounds(
+            (accessor.min, accessor.max) if accessor.min is not None and accessor.max is not None
+            else positions_bounds(accessor.buffer_view)
+            for accessor in accessors
+        )
+    return mesh_bounds[mesh]
+
+
+def gather_node_bounds(node: gltf2_io.Node, export_settings) -> typing.Optional[tuple]:
+    """
+    Bounding box of a node, its mesh and all its descendants, in the node's local space.
+
+    Bounds of all visited nodes and meshes are kept in the export settings.
+    """
+    node_bounds = export_settings[gltf2_blender_export_keys.NODE_BOUNDS]
+    if node not in node_bounds:
+        bounds = []
+        if node.mesh is not None:
+            bounds.append(gather_mesh_bounds(node.mesh, export_settings))
+        for child in node.children or []:
+            bounds.append(transform_bounds(gather_node_bounds(child, export_settings),
+                                           child.translation, child.rotation, child.scale))
+        node_bounds[node] = merge_bounds(bounds)
+    return node_bounds[node]
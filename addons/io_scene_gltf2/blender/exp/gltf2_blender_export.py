@@ -19,11 +19,13 @@ import traceback
 
 from io_scene_gltf2.blender.com import gltf2_blender_json
 from io_scene_gltf2.blender.exp import gltf2_blender_export_keys
+from io_scene_gltf2.blender.exp import gltf2_blender_bounds
 from io_scene_gltf2.blender.exp import gltf2_blender_gather
 from io_scene_gltf2.blender.exp.gltf2_blender_gltf2_exporter import GlTF2Exporter
 from io_scene_gltf2.io.com.gltf2_io_debug import print_console, print_newline
 from io_scene_gltf2.io.exp import gltf2_io_export
 from io_scene_gltf2.io.exp import gltf2_io_draco_compression_extension
+from io_scene_gltf2.io.exp import gltf2_io_quantization
 from io_scene_gltf2.io.exp.gltf2_io_user_extensions import export_user_extensions
 
 
@@ -41,8 +43,8 @@ def save(context, export_settings):
     start_time = time.time()
     export_settings[gltf2_blender_export_keys.BINARY_FILENAME] = bpy.context.scene['gltf_filename_no_ext'] + '.bin'
     export_settings['gltf_filename'] = bpy.context.scene['gltf_filename_no_ext'] + '.gltf'
-    json, buffer = __export(export_settings)
-    __write_file(json, buffer, export_settings)
+    gltf, buffer = __export(export_settings)
+    __write_file(gltf, buffer, export_settings)
 
     end_time = time.time()
     __notify_end(context, end_time - start_time)
@@ -57,22 +59,19 @@ def __export(export_settings):
     __gather_gltf(exporter, export_settings)
     buffer = __create_buffer(exporter, export_settings)
     exporter.finalize_images()
-    json = __fix_json(exporter.glTF.to_dict())
-
-    return json, buffer
+    return exporter.glTF, buffer
 
 
 def __gather_gltf(exporter, export_settings):
-    export_settings['bounding_box_max_x'] = 0
-    export_settings['bounding_box_max_y'] = 0
-    export_settings['bounding_box_max_z'] = 0
-    export_settings['bounding_box_min_x'] = 0
-    export_settings['bounding_box_min_y'] = 0
-    export_settings['bounding_box_min_z'] = 0
+    export_settings[gltf2_blender_export_keys.MESH_BOUNDS] = {}
+    export_settings[gltf2_blender_export_keys.NODE_BOUNDS] = {}
+    export_settings[gltf2_blender_export_keys.QUANTIZATION_ERRORS] = {}
 
     active_scene_idx, scenes, animations = gltf2_blender_gather.gather_gltf2(export_settings)
 
     print(f'gather_gltf2 complete')
+    for line in gltf2_io_quantization.format_errors(export_settings[gltf2_blender_export_keys.QUANTIZATION_ERRORS]):
+        print_console('INFO', line)
 
     plan = {'active_scene_idx': active_scene_idx, 'scenes': scenes, 'animations': animations}
     export_user_extensions('gather_gltf_hook', export_settings, plan)
@@ -82,6 +81,10 @@ def __gather_gltf(exporter, export_settings):
         gltf2_io_draco_compression_extension.compress_scene_primitives(scenes, export_settings)
         exporter.add_draco_extension()
 
+    for scene in scenes:
+        for node in scene.nodes:
+            gltf2_blender_bounds.gather_node_bounds(node, export_settings)
+
     for idx, scene in enumerate(scenes):
         exporter.add_scene(scene, idx==active_scene_idx)
     for animation in animations:
@@ -89,16 +92,9 @@ def __gather_gltf(exporter, export_settings):
 
     exporter.add_original_extensions(bpy.context.scene['extensionsRequired'], bpy.context.scene['extensionsUsed'])
 
-    bounding_box_max = [
-        export_settings['bounding_box_max_x'],
-        export_settings['bounding_box_max_y'],
-        export_settings['bounding_box_max_z'],
-    ]
-    bounding_box_min = [
-        export_settings['bounding_box_min_x'],
-        export_settings['bounding_box_min_y'],
-        export_settings['bounding_box_min_z'],
-    ]
+    # Union of the mesh bounds, which always contains the origin
+    bounding_box_min, bounding_box_max = gltf2_blender_bounds.merge_bounds(
+        [([0.0, 0.0, 0.0], [0.0, 0.0, 0.0])] + list(export_settings[gltf2_blender_export_keys.MESH_BOUNDS].values()))
 
     extensions = {
         "ASOBO_asset_optimized": {
@@ -116,7 +112,7 @@ def __gather_gltf(exporter, export_settings):
 
 
 def __create_buffer(exporter, export_settings):
-    buffer = bytes()
+    buffer = []
     if export_settings[gltf2_blender_export_keys.FORMAT] == 'GLB':
         buffer = exporter.finalize_buffer(export_settings[gltf2_blender_export_keys.FILE_DIRECTORY], is_glb=True)
     else:
@@ -129,49 +125,31 @@ def __create_buffer(exporter, export_settings):
     return buffer
 
 
-def __fix_json(obj):
-    # TODO: move to custom JSON encoder
-    fixed = obj
-    if isinstance(obj, dict):
-        fixed = {}
-        for key, value in obj.items():
-            if not __should_include_json_value(key, value):
-                continue
-            fixed[key] = __fix_json(value)
-    elif isinstance(obj, list):
-        fixed = []
-        for value in obj:
-            fixed.append(__fix_json(value))
-    elif isinstance(obj, float):
-        # force floats to int, if they are integers (prevent INTEGER_WRITTEN_AS_FLOAT validator warnings)
-        if int(obj) == obj:
-            return int(obj)
-    return fixed
-
-
-def __should_include_json_value(key, value):
-    allowed_empty_collections = ["KHR_materials_unlit", "ASOBO_material_anisotropic", "ASOBO_material_SSS", "ASOBO_material_glass", \
-        "ASOBO_material_blend_gbuffer", "ASOBO_material_clear_coat", "ASOBO_material_environment_occluder", "ASOBO_material_fake_terrain", \
-            "ASOBO_material_fresnel_fade", "ASOBO_material_parallax_window", "ASOBO_material_invisible"] # asobo materials
-
-    if value is None:
-        return False
-    elif __is_empty_collection(value) and key not in allowed_empty_collections:
-        return False
-    return True
-
-
-def __is_empty_collection(value):
-    return (isinstance(value, dict) or isinstance(value, list)) and len(value) == 0
-
-
-def __write_file(json, buffer, export_settings):
+# Keys of the empty objects that are still written to the JSON: extensions without properties
+ALLOWED_EMPTY_COLLECTIONS = [
+    "KHR_materials_unlit",
+    # asobo materials
+    "ASOBO_material_anisotropic",
+    "ASOBO_material_SSS",
+    "ASOBO_material_glass",
+    "ASOBO_material_blend_gbuffer",
+    "ASOBO_material_clear_coat",
+    "ASOBO_material_environment_occluder",
+    "ASOBO_material_fake_terrain",
+    "ASOBO_material_fresnel_fade",
+    "ASOBO_material_parallax_window",
+    "ASOBO_material_invisible"
+]
+
+
+def __write_file(gltf, buffer, export_settings):
     try:
         gltf2_io_export.save_gltf(
-            json,
+            gltf,
             export_settings,
             gltf2_blender_json.BlenderJSONEncoder,
-            buffer)
+            buffer,
+            ALLOWED_EMPTY_COLLECTIONS)
     except AssertionError as e:
         _, _, tb = sys.exc_info()
         traceback.print_tb(tb)  # Fixed format
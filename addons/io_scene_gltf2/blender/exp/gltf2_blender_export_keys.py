@@ -37,6 +37,7 @@ FORMAT = 'gltf_format'
 FILE_DIRECTORY = 'gltf_filedirectory'
 TEXTURE_DIRECTORY = 'gltf_texturedirectory'
 BINARY_FILENAME = 'gltf_binaryfilename'
+SPILL_BUFFERS = 'gltf_spill_buffers'
 YUP = 'gltf_yup'
 MORPH = 'gltf_morph'
 TEX_COORDS = 'gltf_texcoords'
@@ -54,6 +55,11 @@ EMBED_IMAGES = 'gltf_embed_images'
 BINARY = 'gltf_binary'
 EMBED_BUFFERS = 'gltf_embed_buffers'
 USE_NO_COLOR = 'gltf_use_no_color'
+LEGACY_EXTRACTION = 'gltf_legacy_extraction'
+EXTRACTION_CHUNK_SIZE = 'gltf_extraction_chunk_size'
+MESH_BOUNDS = 'gltf_mesh_bounds'
+NODE_BOUNDS = 'gltf_node_bounds'
+QUANTIZATION_ERRORS = 'gltf_quantization_errors'
 
 METALLIC_ROUGHNESS_IMAGE = "metallic_roughness_image"
 GROUP_INDEX = 'group_index'
@@ -16,14 +16,18 @@
 # Imports
 #
 
+import numpy as np
 from mathutils import Vector, Quaternion, Matrix
 from mathutils.geometry import tessellate_polygon
 from operator import attrgetter
 
 from . import gltf2_blender_export_keys
 from ...io.com.gltf2_io_debug import print_console
-from ...io.com.gltf2_io_color_management import color_srgb_to_scene_linear
+from ...io.com.gltf2_io_color_management import colors_srgb_to_scene_linear
+from ...io.exp.gltf2_io_asobo_vertex import VERTEX_DTYPES, VertexData
+from ...io.exp import gltf2_io_quantization
 from io_scene_gltf2.blender.exp import gltf2_blender_gather_skins
+from io_scene_gltf2.blender.exp.gltf2_blender_gather_cache import cached
 
 #
 # Globals
@@ -152,11 +156,23 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
     """
     Extract primitives from a mesh. Polygons are triangulated and sorted by material.
 
-    Furthermore, primitives are split up, if the indices range is exceeded.
-    Finally, triangles are also split up/duplicated, if face normals are used instead of vertex normals.
+    Mesh data is read in bulk into NumPy arrays, unless the legacy extraction is requested in the export settings.
     """
     print_console('INFO', 'Extracting primitive: ' + blender_mesh.name)
 
+    if export_settings[gltf2_blender_export_keys.LEGACY_EXTRACTION]:
+        return __extract_primitives_legacy(blender_mesh, blender_object, blender_vertex_groups, modifiers, export_settings)
+
+    return __extract_primitives_numpy(blender_mesh, blender_object, blender_vertex_groups, modifiers, export_settings)
+
+
+def __extract_primitives_legacy(blender_mesh, blender_object, blender_vertex_groups, modifiers, export_settings):
+    """
+    Extract primitives from a mesh, one loop at a time.
+
+    Furthermore, primitives are split up, if the indices range is exceeded.
+    Finally, triangles are also split up/duplicated, if face normals are used instead of vertex normals.
+    """
     if blender_mesh.has_custom_normals:
         # Custom normals are all (0, 0, 0) until calling calc_normals_split() or calc_tangents().
         blender_mesh.calc_normals_split()
@@ -190,16 +206,17 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
     no_material_primitives = {
         MATERIAL_ID: 0,
         INDICES_ID: [],
-        ATTRIBUTES_ID: no_material_attributes
+        ATTRIBUTES_ID: no_material_attributes,
+        'BaseVertexIndex': None,
     }
 
     material_idx_to_primitives = {0: no_material_primitives}
 
     #
 
-    vertex_index_to_new_indices = {}
+    vertex_key_to_new_index = {}
 
-    material_map[0] = vertex_index_to_new_indices
+    material_map[0] = vertex_key_to_new_index
 
     #
     # Create primitive for each material.
@@ -217,7 +234,6 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
             MATERIAL_ID: mat_idx,
             INDICES_ID: [],
             ATTRIBUTES_ID: attributes,
-            'VertexType': 'VTX',
             'BaseVertexIndex': None,
         }
 
@@ -225,9 +241,9 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
 
         #
 
-        vertex_index_to_new_indices = {}
+        vertex_key_to_new_index = {}
 
-        material_map[mat_idx] = vertex_index_to_new_indices
+        material_map[mat_idx] = vertex_key_to_new_index
 
     tex_coord_max = 0
     if blender_mesh.uv_layers.active:
@@ -235,29 +251,22 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
 
     #
 
-    vertex_colors = {}
+    # Colors of all loops are converted to linear at once
+    linear_colors = __get_colors(blender_mesh)
+    color_max = len(linear_colors)
 
-    color_index = 0
-    for vertex_color in blender_mesh.vertex_colors:
-        vertex_color_name = COLOR_PREFIX + str(color_index)
-        vertex_colors[vertex_color_name] = vertex_color
+    #
 
-        color_index += 1
-        if color_index >= GLTF_MAX_COLORS:
-            break
-    color_max = color_index
+    # Influence counts of all vertices are read once, for bone_max and the vertex type of each primitive
+    loop_vidxs, loop_starts, loop_totals, poly_mats = __get_polygons(blender_mesh, export_settings)
+    group_counts, weight_counts, _, _ = __get_vertex_influences(blender_mesh)
 
-    #
+    bone_max = int(((group_counts[loop_vidxs] + 3) // 4).max(initial=0))
 
-    bone_max = 0
-    for blender_polygon in blender_mesh.polygons:
-        for loop_index in blender_polygon.loop_indices:
-            vertex_index = blender_mesh.loops[loop_index].vertex_index
-            bones_count = len(blender_mesh.vertices[vertex_index].groups)
-            if bones_count > 0:
-                if bones_count % 4 == 0:
-                    bones_count -= 1
-                bone_max = max(bone_max, bones_count // 4 + 1)
+    vertex_types = __get_vertex_types(weight_counts, loop_vidxs, loop_starts, loop_totals, poly_mats,
+                                      len(material_idx_to_primitives))
+    for mat_idx, primitive in material_idx_to_primitives.items():
+        primitive['VertexType'] = vertex_types[mat_idx]
 
     #
 
@@ -283,28 +292,9 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
             modifier = modifiers_dict["ARMATURE"]
             armature = modifier.object
 
-    for blender_polygon in blender_mesh.polygons:
-        if export_settings['gltf_materials'] is False:
-            primitive = material_idx_to_primitives[0]
-            vertex_index_to_new_indices = material_map[0]
-        elif not blender_polygon.material_index in material_idx_to_primitives:
-            primitive = material_idx_to_primitives[0]
-            vertex_index_to_new_indices = material_map[0]
-        else:
-            primitive = material_idx_to_primitives[blender_polygon.material_index]
-            vertex_index_to_new_indices = material_map[blender_polygon.material_index]
-        
-        if primitive['VertexType'] == 'BLEND4':
-            continue
-        else:
-            for vertex_index in blender_polygon.vertices:
-                vertex = blender_mesh.vertices[vertex_index]
-                weight_count = len(list(filter(lambda x: x.weight > 0, vertex.groups)))
-                if weight_count > 1:
-                    primitive['VertexType'] = 'BLEND4'
-                    break
-                elif weight_count == 1 and primitive['VertexType'] == 'VTX':
-                    primitive['VertexType'] = 'BLEND1'
+    group_joints = None
+    if armature and blender_vertex_groups is not None and export_settings[gltf2_blender_export_keys.SKINS]:
+        group_joints = __get_vertex_group_joints(blender_object, armature, export_settings)
 
     #
     # Convert polygon to primitive indices and eliminate invalid ones. Assign to material.
@@ -316,13 +306,13 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
 
         if export_settings['gltf_materials'] is False:
             primitive = material_idx_to_primitives[0]
-            vertex_index_to_new_indices = material_map[0]
+            vertex_key_to_new_index = material_map[0]
         elif not blender_polygon.material_index in material_idx_to_primitives:
             primitive = material_idx_to_primitives[0]
-            vertex_index_to_new_indices = material_map[0]
+            vertex_key_to_new_index = material_map[0]
         else:
             primitive = material_idx_to_primitives[blender_polygon.material_index]
-            vertex_index_to_new_indices = material_map[blender_polygon.material_index]
+            vertex_key_to_new_index = material_map[blender_polygon.material_index]
         #
 
         attributes = primitive[ATTRIBUTES_ID]
@@ -368,11 +358,6 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
         for loop_index in loop_index_list:
             vertex_index = blender_mesh.loops[loop_index].vertex_index
 
-            if vertex_index_to_new_indices.get(vertex_index) is None:
-                vertex_index_to_new_indices[vertex_index] = []
-
-            #
-
             v = None
             n = None
             # t = None
@@ -390,12 +375,6 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
             vertex = blender_mesh.vertices[vertex_index]
 
             v = convert_swizzle_location(vertex.co, armature, blender_object, export_settings)
-            export_settings['bounding_box_max_x'] = max(v.x, export_settings['bounding_box_max_x'])
-            export_settings['bounding_box_max_y'] = max(v.y, export_settings['bounding_box_max_y'])
-            export_settings['bounding_box_max_z'] = max(v.z, export_settings['bounding_box_max_z'])
-            export_settings['bounding_box_min_x'] = min(v.x, export_settings['bounding_box_min_x'])
-            export_settings['bounding_box_min_y'] = min(v.y, export_settings['bounding_box_min_y'])
-            export_settings['bounding_box_min_z'] = min(v.z, export_settings['bounding_box_min_z'])
             # if blender_polygon.use_smooth or blender_mesh.use_auto_smooth:
             # if blender_mesh.has_custom_normals:
             #     n = convert_swizzle_normal(blender_mesh.loops[loop_index].normal, armature, blender_object, export_settings)
@@ -427,14 +406,7 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
 
             if color_max > 0 and export_color:
                 for color_index in range(0, color_max):
-                    color_name = COLOR_PREFIX + str(color_index)
-                    color = vertex_colors[color_name].data[loop_index].color
-                    colors.append([
-                        color_srgb_to_scene_linear(color[0]),
-                        color_srgb_to_scene_linear(color[1]),
-                        color_srgb_to_scene_linear(color[2]),
-                        color[3]
-                    ])
+                    colors.append(linear_colors[color_index][loop_index].tolist())
 
             #
 
@@ -468,16 +440,13 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
 
                     if vertex_group_index < 0 or vertex_group_index >= len(blender_vertex_groups):
                         continue
-                    vertex_group_name = blender_vertex_groups[vertex_group_index].name
 
                     joint_index = None
 
                     if armature:
-                        skin = gltf2_blender_gather_skins.gather_skin(blender_object, export_settings)
-                        for index, j in enumerate(skin.joints):
-                            if j.name == vertex_group_name:
-                                joint_index = index
-                                break
+                        joint_index = int(group_joints[vertex_group_index])
+                        if joint_index < 0:
+                            joint_index = None
 
                     #
                     if joint_index is not None:
@@ -552,105 +521,26 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
             #
             #
 
-            create = True
-
-            for current_new_index in vertex_index_to_new_indices[vertex_index]:
-                found = True
-
-                for i in range(0, 3):
-                    if attributes[POSITION_ATTRIBUTE][current_new_index * 3 + i] != v[i]:
-                        found = False
-                        break
-
-                    # if attributes[NORMAL_ATTRIBUTE][current_new_index * 3 + i] != n[i]:
-                        # found = False
-                        # break
-
-                if found:
-                    for i in range(0, 3):
-                        if attributes[NORMAL_ATTRIBUTE][current_new_index * 4 + i] != n[i]:
-                            found = False
-                            break
-
-                if found and use_tangents:
-                    for i in range(0, 4):
-                        if attributes[TANGENT_ATTRIBUTE][current_new_index * 4 + i] != t[i]:
-                            found = False
-                            break
-
-                if not found:
-                    continue
-
-                for tex_coord_index in range(0, tex_coord_max):
-                    uv = uvs[tex_coord_index]
-
-                    tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-                    for i in range(0, 2):
-                        if attributes[tex_coord_id][current_new_index * 2 + i] != uv[i]:
-                            found = False
-                            break
-
-                if export_color:
-                    for color_index in range(0, color_max):
-                        color = colors[color_index]
-
-                        color_id = COLOR_PREFIX + str(color_index)
-                        for i in range(0, 3):
-                            # Alpha is always 1.0 - see above.
-                            current_color = attributes[color_id][current_new_index * 4 + i]
-                            if color_srgb_to_scene_linear(current_color) != color[i]:
-                                found = False
-                                break
-
-                if export_settings[gltf2_blender_export_keys.SKINS]:
-                    for bone_index in range(0, bone_max):
-                        joint = joints[bone_index]
-                        weight = weights[bone_index]
-
-                        joint_id = JOINTS_PREFIX + str(bone_index)
-                        weight_id = WEIGHTS_PREFIX + str(bone_index)
-                        for i in range(0, 4):
-                            if attributes[joint_id][current_new_index * 4 + i] != joint[i]:
-                                found = False
-                                break
-                            if primitive['VertexType'] == 'BLEND1':
-                                if attributes[weight_id][current_new_index] != weight[0]:
-                                    found = False
-                                    break
-                            else:
-                                if attributes[weight_id][current_new_index * 4 + i] != weight[i]:
-                                    found = False
-                                    break
-
-                if export_settings[gltf2_blender_export_keys.MORPH]:
-                    for morph_index in range(0, morph_max):
-                        target_position = target_positions[morph_index]
-                        target_normal = target_normals[morph_index]
-                        if use_tangents:
-                            target_tangent = target_tangents[morph_index]
-
-                        target_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-                        target_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-                        target_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
-                        for i in range(0, 3):
-                            if attributes[target_position_id][current_new_index * 3 + i] != target_position[i]:
-                                found = False
-                                break
-                            if attributes[target_normal_id][current_new_index * 3 + i] != target_normal[i]:
-                                found = False
-                                break
-                            if use_tangents:
-                                if attributes[target_tangent_id][current_new_index * 3 + i] != target_tangent[i]:
-                                    found = False
-                                    break
-
-                if found:
-                    indices.append(current_new_index)
-
-                    create = False
-                    break
-
-            if not create:
+            # The key covers every attribute written for the vertex, so that equal vertices share one dict slot.
+            # It starts with the source vertex index: only loops of the same Blender vertex are welded together.
+            vertex_key = (vertex_index, tuple(v), tuple(n))
+            if use_tangents:
+                vertex_key += (tuple(t),)
+            vertex_key += tuple(tuple(uv) for uv in uvs)
+            if export_color:
+                vertex_key += tuple(tuple(color) for color in colors)
+            if export_settings[gltf2_blender_export_keys.SKINS]:
+                vertex_key += tuple(tuple(joint) for joint in joints)
+                vertex_key += tuple(tuple(weight) for weight in weights)
+            if export_settings[gltf2_blender_export_keys.MORPH]:
+                vertex_key += tuple(tuple(target_position) for target_position in target_positions)
+                vertex_key += tuple(tuple(target_normal) for target_normal in target_normals)
+                if use_tangents:
+                    vertex_key += tuple(tuple(target_tangent) for target_tangent in target_tangents)
+
+            current_new_index = vertex_key_to_new_index.get(vertex_key)
+            if current_new_index is not None:
+                indices.append(current_new_index)
                 continue
 
             new_index = 0
@@ -660,7 +550,7 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
 
             primitive['max_index'] = new_index
 
-            vertex_index_to_new_indices[vertex_index].append(new_index)
+            vertex_key_to_new_index[vertex_key] = new_index
 
             #
             #
@@ -743,7 +633,667 @@ def extract_primitives(glTF, blender_mesh, library, blender_object, blender_vert
         for primitive in material_idx_to_primitives.values()
         if len(primitive[INDICES_ID]) != 0
     ]
+    for primitive in result_primitives:
+        primitive[INDICES_ID] = np.array(primitive[INDICES_ID], dtype=np.uint32)
 
     print_console('INFO', 'Primitives created: ' + str(len(result_primitives)))
 
     return result_primitives
+
+
+def __extract_primitives_numpy(blender_mesh, blender_object, blender_vertex_groups, modifiers, export_settings):
+    """
+    Extract primitives from a mesh with bulk array operations.
+
+    Vertex, loop and polygon data is read with foreach_get, and every step works on whole arrays.
+    The primitives hold the same attributes as the ones of the legacy extraction. Polygons with more than 3 sides
+    are triangulated by Blender, which may split quads along the other diagonal.
+
+    When an extraction chunk size is set, primitives of meshes without morph targets are instead extracted by
+    chunks of triangles, as interleaved vertices (see __extract_primitive_chunks).
+    """
+    if blender_mesh.has_custom_normals:
+        # Custom normals are all (0, 0, 0) until calling calc_normals_split() or calc_tangents().
+        blender_mesh.calc_normals_split()
+
+    use_tangents = False
+    if blender_mesh.uv_layers.active and len(blender_mesh.uv_layers) > 0:
+        try:
+            blender_mesh.calc_tangents()
+            use_tangents = True
+        except Exception:
+            print_console('WARNING', 'Could not calculate tangents. Please try to triangulate the mesh first.')
+
+    armature = __get_armature(modifiers)
+
+    num_polys = len(blender_mesh.polygons)
+    loop_vidxs, loop_starts, loop_totals, poly_mats = __get_polygons(blender_mesh, export_settings)
+    material_idxs = range(max(len(blender_mesh.materials), 1))
+
+    #
+    # Per vertex and per loop data
+    #
+
+    skinned_matrices = None
+    if armature and blender_object:
+        skinned_matrices = __get_skinned_matrices(armature, blender_object, export_settings)
+
+    vert_cos = __get_vertex_cos(blender_mesh)
+    locs = __get_positions(vert_cos, skinned_matrices, export_settings)
+    normals = __get_normals(blender_mesh, skinned_matrices, export_settings)
+    uvs = __get_uvs(blender_mesh)
+    colors = __get_colors(blender_mesh)
+
+    morph_keys = __get_morph_keys(blender_mesh, export_settings)
+    if morph_keys:
+        morph_locs, morph_vertex_normals, morph_polygon_normals = __get_morph_data(
+            blender_mesh, morph_keys, skinned_matrices, export_settings)
+        # Position deltas only depend on the vertex. Normals depend on the polygon for flat shaded ones.
+        morph_loc_deltas = morph_locs - locs
+        poly_smooth = np.empty(num_polys, dtype=bool)
+        blender_mesh.polygons.foreach_get('use_smooth', poly_smooth)
+
+    group_counts, weight_counts, influence_groups, influence_weights = __get_vertex_influences(blender_mesh)
+    vertex_types = __get_vertex_types(weight_counts, loop_vidxs, loop_starts, loop_totals, poly_mats,
+                                      len(material_idxs))
+    bone_max = int(((group_counts[loop_vidxs] + 3) // 4).max(initial=0))
+    if not export_settings['gltf_all_vertex_influences']:
+        # Only the 4 strongest influences of each vertex are kept
+        bone_max = min(bone_max, 1)
+    export_skins = export_settings[gltf2_blender_export_keys.SKINS]
+    joints = weights = None
+    if export_skins:
+        joints, weights = __get_bone_data(blender_mesh, blender_object, blender_vertex_groups, armature, bone_max,
+                                          group_counts, influence_groups, influence_weights, export_settings)
+
+    #
+    # Triangulate, and split the triangles by material
+    #
+
+    tri_loops, tri_polys = __get_triangles(blender_mesh)
+    tri_mats = poly_mats[tri_polys]
+
+    chunk_size = export_settings[gltf2_blender_export_keys.EXTRACTION_CHUNK_SIZE]
+    if morph_keys:
+        # Morph targets are not part of the interleaved vertices
+        chunk_size = 0
+    # All primitives of a skinned mesh go in the blend buffer views
+    is_skinned_mesh = any('BLEND' in vertex_types[material_idx] for material_idx in np.unique(tri_mats))
+
+    primitives = []
+
+    for material_idx in material_idxs:
+        prim_tris = tri_mats == material_idx
+        prim_loops = tri_loops[prim_tris].reshape(-1)
+        if len(prim_loops) == 0:
+            continue
+
+        vertex_type = vertex_types[material_idx]
+
+        if chunk_size:
+            layout = 'BLEND4' if vertex_type == 'BLEND4' else 'BLEND1' if is_skinned_mesh else 'VTX'
+            primitives.append(__extract_primitive_chunks(
+                material_idx, vertex_type, layout, prim_loops.reshape(-1, 3), chunk_size, loop_vidxs, locs, normals,
+                use_tangents, uvs, colors, joints, weights, export_settings))
+            continue
+
+        loop_attributes = [uv[prim_loops] for uv in uvs] + [color[prim_loops] for color in colors]
+        if morph_keys:
+            prim_polys = np.repeat(tri_polys[prim_tris], 3)
+            morph_normal_deltas = __get_morph_normal_deltas(loop_vidxs[prim_loops], prim_polys, poly_smooth, normals,
+                                                            morph_vertex_normals, morph_polygon_normals)
+            loop_attributes.append(morph_normal_deltas.transpose(1, 0, 2))
+
+        indices, first_loops = __deduplicate_vertices(loop_vidxs[prim_loops], loop_attributes)
+        vertex_loops = prim_loops[first_loops]
+        vidxs = loop_vidxs[vertex_loops]
+        num_vertices = len(vidxs)
+
+        attributes = {
+            POSITION_ATTRIBUTE: locs[vidxs],
+            # glTF exports a Vec4 normal, with the 4th component set to 0
+            NORMAL_ATTRIBUTE: np.hstack((normals[vidxs], np.zeros((num_vertices, 1), dtype=np.float32)))
+        }
+
+        if use_tangents:
+            # Same placeholder tangent as the legacy extraction
+            attributes[TANGENT_ATTRIBUTE] = np.tile(np.array([1.0, 1.0, 1.0, -1.0], dtype=np.float32),
+                                                    (num_vertices, 1))
+
+        for tex_coord_index, uv in enumerate(uvs):
+            attributes[TEXCOORD_PREFIX + str(tex_coord_index)] = uv[vertex_loops]
+
+        for color_index, color in enumerate(colors):
+            attributes[COLOR_PREFIX + str(color_index)] = color[vertex_loops]
+
+        if export_skins:
+            for bone_index in range(bone_max):
+                bone_set = slice(bone_index * 4, bone_index * 4 + 4)
+                attributes[JOINTS_PREFIX + str(bone_index)] = joints[vidxs, bone_set]
+                if vertex_type == 'BLEND4':
+                    attributes[WEIGHTS_PREFIX + str(bone_index)] = weights[vidxs, bone_set]
+                else:
+                    # Only BLEND4 primitives carry all four weights
+                    attributes[WEIGHTS_PREFIX + str(bone_index)] = weights[vidxs, bone_index * 4]
+
+        for morph_index in range(len(morph_keys)):
+            attributes[MORPH_POSITION_PREFIX + str(morph_index)] = morph_loc_deltas[morph_index, vidxs]
+            morph_normal_delta = morph_normal_deltas[morph_index, first_loops]
+            attributes[MORPH_NORMAL_PREFIX + str(morph_index)] = morph_normal_delta
+            if use_tangents:
+                attributes[MORPH_TANGENT_PREFIX + str(morph_index)] = __get_morph_tangents(morph_normal_delta,
+                                                                                          normals[vidxs])
+
+        primitives.append({
+            MATERIAL_ID: material_idx,
+            INDICES_ID: indices,
+            ATTRIBUTES_ID: {name: data.reshape(-1) for name, data in attributes.items()},
+            'VertexType': vertex_type,
+            'BaseVertexIndex': None,
+        })
+
+    print_console('INFO', 'Primitives created: ' + str(len(primitives)))
+
+    return primitives
+
+
+def __extract_primitive_chunks(material_idx, vertex_type, layout, prim_tri_loops, chunk_size, loop_vidxs, locs,
+                               normals, use_tangents, uvs, colors, joints, weights, export_settings):
+    """
+    Extract a primitive by chunks of triangles, as interleaved vertices in the layout of its Asobo buffer view.
+
+    Only the corners of one chunk are expanded at a time, and its vertices are quantized as soon as they are
+    merged, so the memory used on top of the mesh data is bounded by the chunk size. Corners are only merged
+    within a chunk: vertices used by several chunks are duplicated.
+
+    The primitive holds its vertices as VertexData instead of attribute lists.
+    """
+    vertices = VertexData(layout)
+    indices = []
+    num_vertices = 0
+
+    for start in range(0, len(prim_tri_loops), chunk_size):
+        chunk_loops = prim_tri_loops[start:start + chunk_size].reshape(-1)
+        # Vertex colors are written as constants, but still split vertices as in the other extractions
+        loop_attributes = [uv[chunk_loops] for uv in uvs] + [color[chunk_loops] for color in colors]
+        chunk_indices, first_loops = __deduplicate_vertices(loop_vidxs[chunk_loops], loop_attributes)
+        vertex_loops = chunk_loops[first_loops]
+
+        indices.append(chunk_indices + np.uint32(num_vertices))
+        vertices.append(__get_interleaved_vertices(layout, loop_vidxs[vertex_loops], vertex_loops, locs, normals,
+                                                   use_tangents, uvs, joints, weights, export_settings))
+        num_vertices += len(vertex_loops)
+
+    return {
+        MATERIAL_ID: material_idx,
+        INDICES_ID: np.concatenate(indices),
+        ATTRIBUTES_ID: {},
+        'vertices': vertices,
+        'VertexType': vertex_type,
+        'BaseVertexIndex': None,
+    }
+
+
+def __get_interleaved_vertices(layout, vidxs, vertex_loops, locs, normals, use_tangents, uvs, joints, weights,
+                               export_settings):
+    """
+    Quantized vertices, in an Asobo vertex layout.
+
+    Values are encoded as gather_primitive_attributes and the exporter encode the extracted attributes.
+    """
+    errors = export_settings[gltf2_blender_export_keys.QUANTIZATION_ERRORS]
+    vertices = np.zeros(len(vidxs), dtype=VERTEX_DTYPES[layout])
+
+    vertices['POSITION'] = locs[vidxs]
+
+    if export_settings[gltf2_blender_export_keys.NORMALS]:
+        # Signed normalized bytes, the 4th component is 0
+        vertices['NORMAL'][:, :3] = gltf2_io_quantization.to_snorm8(normals[vidxs], errors, NORMAL_ATTRIBUTE)
+        if export_settings[gltf2_blender_export_keys.TANGENTS] and use_tangents:
+            # Placeholder tangent (1, 1, 1, -1)
+            vertices['TANGENT'] = (127, 127, 127, -127)
+
+    if export_settings[gltf2_blender_export_keys.TEX_COORDS]:
+        for tex_coord_index, uv in enumerate(uvs[:2]):
+            tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
+            vertices[tex_coord_id] = gltf2_io_quantization.to_half(uv[vertex_loops], errors, tex_coord_id)
+
+    # All vertex colors of the vanilla Asobo models are 1.0 as a half float, or -1 as a byte
+    vertices['COLOR_0'] = 15360 if layout == 'VTX' else -1
+
+    if layout != 'VTX' and joints is not None and joints.shape[1] != 0:
+        vertices['JOINTS_0'] = joints[vidxs, :4]
+        if layout == 'BLEND4':
+            vertex_weights = weights[vidxs, :4].astype(np.float64)
+            if not export_settings['gltf_all_vertex_influences']:
+                totals = vertex_weights[:, 0] + vertex_weights[:, 1] + vertex_weights[:, 2] + vertex_weights[:, 3]
+                factors = np.divide(1.0, totals, out=np.ones(totals.shape), where=totals > 0.0)
+                vertex_weights *= factors[:, np.newaxis]
+            vertices['WEIGHTS_0'] = gltf2_io_quantization.to_unorm16(vertex_weights, errors, WEIGHTS_PREFIX + '0')
+        else:
+            vertices['WEIGHTS_0'] = weights[vidxs, 0]
+
+    return vertices
+
+
+def __get_armature(modifiers):
+    if modifiers is None:
+        return None
+    modifiers_dict = {m.type: m for m in modifiers}
+    if "ARMATURE" in modifiers_dict:
+        return modifiers_dict["ARMATURE"].object
+    return None
+
+
+def __get_vertex_cos(blender_mesh):
+    vert_cos = np.empty(len(blender_mesh.vertices) * 3, dtype=np.float32)
+    blender_mesh.vertices.foreach_get('co', vert_cos)
+    return vert_cos.reshape(-1, 3)
+
+
+def __get_skinned_matrices(armature, blender_object, export_settings):
+    """
+    Matrices applying the armature transforms and the glTF coordinate system conversion to a skinned mesh.
+
+    Same transforms as convert_swizzle_location and convert_swizzle_normal, computed once for the whole mesh.
+
+    :return: a 4x4 location matrix and a 3x3 normal matrix
+    """
+    apply_matrix = armature.matrix_world.inverted() @ blender_object.matrix_world
+    location_matrix = np.array(armature.matrix_world @ apply_matrix, dtype=np.float64)
+
+    normal_matrix = apply_matrix.to_3x3().inverted()
+    normal_matrix.transpose()
+    normal_matrix = np.array(armature.matrix_world.to_3x3() @ normal_matrix, dtype=np.float64)
+
+    if export_settings[gltf2_blender_export_keys.YUP]:
+        # x,y,z -> x,z,-y
+        swizzle = np.array(((1.0, 0.0, 0.0), (0.0, 0.0, 1.0), (0.0, -1.0, 0.0)))
+        location_matrix[:3] = swizzle @ location_matrix[:3]
+        normal_matrix = swizzle @ normal_matrix
+
+    return location_matrix, normal_matrix
+
+
+def __get_positions(vert_cos, skinned_matrices, export_settings):
+    """Convert an array of locations, of any shape ending with 3, to glTF coordinate system."""
+    if skinned_matrices is not None:
+        # Mesh is skined, we have to apply armature transforms on data
+        location_matrix, _ = skinned_matrices
+        return (vert_cos @ location_matrix[:3, :3].T + location_matrix[:3, 3]).astype(np.float32)
+
+    locs = vert_cos.copy()
+    if export_settings[gltf2_blender_export_keys.YUP]:
+        __swizzle_yup(locs)
+    return locs
+
+
+def __get_normals(blender_mesh, skinned_matrices, export_settings):
+    normals = np.empty(len(blender_mesh.vertices) * 3, dtype=np.float32)
+    blender_mesh.vertices.foreach_get('normal', normals)
+    return __convert_normals(normals.reshape(-1, 3), skinned_matrices, export_settings)
+
+
+def __convert_normals(normals, skinned_matrices, export_settings):
+    """Convert an array of normals, of any shape ending with 3, to glTF coordinate system."""
+    if skinned_matrices is not None:
+        # Mesh is skined, we have to apply armature transforms on data
+        _, normal_matrix = skinned_matrices
+        normals = normals @ normal_matrix.T
+        lengths = np.linalg.norm(normals, axis=-1, keepdims=True)
+        np.divide(normals, lengths, out=normals, where=lengths != 0.0)
+        return normals.astype(np.float32)
+
+    normals = normals.copy()
+    if export_settings[gltf2_blender_export_keys.YUP]:
+        __swizzle_yup(normals)
+    return normals
+
+
+def __swizzle_yup(vecs):
+    # x,y,z -> x,z,-y
+    vecs[..., [1, 2]] = vecs[..., [2, 1]]
+    vecs[..., 2] *= -1
+
+
+def __get_morph_keys(blender_mesh, export_settings):
+    """Shape keys exported as morph targets."""
+    if not export_settings[gltf2_blender_export_keys.MORPH] or blender_mesh.shape_keys is None:
+        return []
+    return [
+        blender_shape_key
+        for blender_shape_key in blender_mesh.shape_keys.key_blocks
+        if blender_shape_key != blender_shape_key.relative_key and blender_shape_key.mute is False
+    ]
+
+
+def __get_morph_data(blender_mesh, morph_keys, skinned_matrices, export_settings):
+    """
+    Locations, vertex normals and polygon normals of all shape keys, in glTF coordinate system.
+
+    :return: (key count, vertex count, 3), (key count, vertex count, 3) and (key count, polygon count, 3) arrays
+    """
+    num_verts = len(blender_mesh.vertices)
+    num_polys = len(blender_mesh.polygons)
+
+    morph_cos = np.empty((len(morph_keys), num_verts * 3), dtype=np.float32)
+    morph_vertex_normals = np.empty((len(morph_keys), num_verts * 3), dtype=np.float32)
+    morph_polygon_normals = np.empty((len(morph_keys), num_polys * 3), dtype=np.float32)
+    for morph_index, blender_shape_key in enumerate(morph_keys):
+        blender_shape_key.data.foreach_get('co', morph_cos[morph_index])
+        morph_vertex_normals[morph_index] = blender_shape_key.normals_vertex_get()
+        morph_polygon_normals[morph_index] = blender_shape_key.normals_polygon_get()
+
+    return (
+        __get_positions(morph_cos.reshape(len(morph_keys), num_verts, 3), skinned_matrices, export_settings),
+        __convert_normals(morph_vertex_normals.reshape(len(morph_keys), num_verts, 3), skinned_matrices,
+                          export_settings),
+        __convert_normals(morph_polygon_normals.reshape(len(morph_keys), num_polys, 3), skinned_matrices,
+                          export_settings),
+    )
+
+
+def __get_morph_normal_deltas(vidxs, polys, poly_smooth, normals, morph_vertex_normals, morph_polygon_normals):
+    """
+    Normal deltas of all shape keys for some triangle corners.
+
+    Smooth polygons use the vertex normals of the shape key, flat ones its polygon normal.
+
+    :return: a (key count, corner count, 3) array
+    """
+    smooth = poly_smooth[polys][:, np.newaxis]
+    morph_normals = np.where(smooth, morph_vertex_normals[:, vidxs], morph_polygon_normals[:, polys])
+    return morph_normals - normals[vidxs]
+
+
+def __get_morph_tangents(morph_normal_deltas, normals):
+    """
+    Morph tangents, as computed by the legacy extraction.
+
+    The placeholder tangent is rotated by the rotation from the normal delta to the normal
+    (Vector.rotation_difference), including its degenerate cases.
+    """
+    tangents = np.ones(normals.shape, dtype=np.float64)
+
+    def normalized(vecs):
+        lengths = np.linalg.norm(vecs, axis=-1, keepdims=True)
+        return np.divide(vecs, lengths, out=np.zeros(vecs.shape), where=lengths != 0.0)
+
+    start = normalized(morph_normal_deltas.astype(np.float64))
+    end = normalized(normals.astype(np.float64))
+    axis = np.cross(start, end)
+    sin_angle = np.linalg.norm(axis, axis=-1, keepdims=True)
+    cos_angle = np.sum(start * end, axis=-1, keepdims=True)
+
+    # Rodrigues' rotation formula
+    rotate = sin_angle[:, 0] > np.finfo(np.float32).eps
+    unit_axis = np.divide(axis, sin_angle, out=np.zeros(axis.shape), where=rotate[:, np.newaxis])
+    result = tangents * cos_angle + np.cross(unit_axis, tangents) * sin_angle + \
+        unit_axis * np.sum(unit_axis * tangents, axis=-1, keepdims=True) * (1.0 - cos_angle)
+
+    # Colinear but opposed vectors, 180 degrees rotation around an orthogonal axis
+    opposed = ~rotate & (cos_angle[:, 0] < 0.0)
+    if np.any(opposed):
+        ortho_axis = __ortho_vectors(start[opposed])
+        ortho_axis = normalized(ortho_axis)
+        result[opposed] = 2.0 * ortho_axis * np.sum(ortho_axis * tangents[opposed], axis=-1, keepdims=True) - \
+            tangents[opposed]
+
+    # Same vectors, or zero length ones: no rotation
+    result[~rotate & ~opposed] = tangents[~rotate & ~opposed]
+
+    return result.astype(np.float32)
+
+
+def __ortho_vectors(vecs):
+    """A vector orthogonal to each vector, picked like Blender does (ortho_v3_v3)."""
+    abs_vecs = np.abs(vecs)
+    x, y, z = vecs[:, 0], vecs[:, 1], vecs[:, 2]
+    dominant = np.where(abs_vecs[:, 0] > abs_vecs[:, 1],
+                        np.where(abs_vecs[:, 0] > abs_vecs[:, 2], 0, 2),
+                        np.where(abs_vecs[:, 1] > abs_vecs[:, 2], 1, 2))
+    return np.select(
+        [dominant[:, np.newaxis] == 0, dominant[:, np.newaxis] == 1],
+        [np.stack((-y - z, x, x), axis=-1), np.stack((y, -x - z, y), axis=-1)],
+        np.stack((z, z, -x - y), axis=-1))
+
+
+def __get_uvs(blender_mesh):
+    """UVs of each loop, for each UV layer. Flipped vertically, as glTF expects."""
+    if not blender_mesh.uv_layers.active:
+        return []
+
+    num_loops = len(blender_mesh.loops)
+    uvs = []
+    for uv_layer in blender_mesh.uv_layers:
+        uv = np.empty(num_loops * 2, dtype=np.float32)
+        uv_layer.data.foreach_get('uv', uv)
+        # u,v -> u,1-v (computed in double precision, like the legacy extraction)
+        uv = uv.reshape(-1, 2).astype(np.float64)
+        uv[:, 1] = 1.0 - uv[:, 1]
+        uvs.append(uv)
+    return uvs
+
+
+def __get_colors(blender_mesh):
+    """Linear colors of each loop, for the first GLTF_MAX_COLORS vertex color layers."""
+    num_loops = len(blender_mesh.loops)
+    colors = []
+    for vertex_color in blender_mesh.vertex_colors[:GLTF_MAX_COLORS]:
+        color = np.empty(num_loops * 4, dtype=np.float32)
+        vertex_color.data.foreach_get('color', color)
+        color = color.reshape(-1, 4).astype(np.float64)
+        # Alpha is not converted
+        colors_srgb_to_scene_linear(color[:, :3])
+        colors.append(color)
+    return colors
+
+
+def __get_vertex_influences(blender_mesh):
+    """
+    All vertex group influences of the mesh, flattened in vertex order.
+
+    Vertex groups are not available through foreach_get, so this is a single pass over the vertices.
+
+    :return: the number of vertex groups of each vertex, how many of them have a weight above zero,
+             and the vertex group index and weight of each influence
+    """
+    num_verts = len(blender_mesh.vertices)
+    group_counts = np.zeros(num_verts, dtype=np.uint32)
+    influence_groups = []
+    influence_weights = []
+    for vertex_index, vertex in enumerate(blender_mesh.vertices):
+        groups = vertex.groups
+        if len(groups) == 0:
+            continue
+        group_counts[vertex_index] = len(groups)
+        for group_element in groups:
+            influence_groups.append(group_element.group)
+            influence_weights.append(group_element.weight)
+
+    influence_groups = np.array(influence_groups, dtype=np.int64)
+    influence_weights = np.array(influence_weights, dtype=np.float32)
+    influence_vidxs = np.repeat(np.arange(num_verts), group_counts)
+    weight_counts = np.bincount(influence_vidxs[influence_weights > 0.0], minlength=num_verts)
+
+    return group_counts, weight_counts, influence_groups, influence_weights
+
+
+def __get_vertex_types(weight_counts, loop_vidxs, loop_starts, loop_totals, poly_mats, num_primitives):
+    """
+    Asobo VertexType of the primitive of each material.
+
+    A primitive is BLEND4 if a vertex of its polygons has more than one weighted influence, BLEND1 if one has a
+    single one, and VTX otherwise.
+    """
+    max_weight_counts = np.zeros(num_primitives, dtype=np.int64)
+
+    if len(loop_starts) != 0:
+        # Group the loops by material, and take the max weight count of each group
+        poly_loops, loop_mats = __get_polygon_loops(loop_starts, loop_totals, poly_mats)
+        order = np.argsort(loop_mats, kind='stable')
+        sorted_mats = loop_mats[order]
+        group_starts = np.flatnonzero(np.concatenate(([True], sorted_mats[1:] != sorted_mats[:-1])))
+        max_weight_counts[sorted_mats[group_starts]] = np.maximum.reduceat(
+            weight_counts[loop_vidxs[poly_loops[order]]], group_starts)
+
+    return [
+        'BLEND4' if max_weight_count > 1 else 'BLEND1' if max_weight_count == 1 else 'VTX'
+        for max_weight_count in max_weight_counts
+    ]
+
+
+@cached
+def __get_vertex_group_joints(blender_object, armature, export_settings):
+    """
+    Joint index of each vertex group of a skinned object, -1 for vertex groups that are not joints of its skin.
+
+    Built once per object and armature, so that influences are remapped to joints with a single array lookup.
+    """
+    group_joints = np.full(len(blender_object.vertex_groups), -1, dtype=np.int64)
+
+    skin = gltf2_blender_gather_skins.gather_skin(blender_object, export_settings)
+    if skin is None:
+        return group_joints
+
+    joint_indices = {}
+    for index, joint in enumerate(skin.joints):
+        joint_indices.setdefault(joint.name, index)
+    for group_index, group in enumerate(blender_object.vertex_groups):
+        group_joints[group_index] = joint_indices.get(group.name, -1)
+
+    return group_joints
+
+
+def __get_bone_data(blender_mesh, blender_object, blender_vertex_groups, armature, bone_max, group_counts,
+                    influence_groups, influence_weights, export_settings):
+    """
+    Joints and weights of each vertex, as bone_max sets of 4 influences.
+
+    Influences are ordered by decreasing weight, unless all influences are exported. Weights are not normalized
+    here: as in the legacy extraction, only the 4 weights of BLEND4 vertices are, when they are encoded and unless
+    all influences are exported. Unused slots are 0.
+    """
+    num_verts = len(blender_mesh.vertices)
+    joints = np.zeros((num_verts, 4 * bone_max), dtype=np.uint32)
+    weights = np.zeros((num_verts, 4 * bone_max), dtype=np.float32)
+
+    if blender_vertex_groups is None or not armature or bone_max == 0:
+        return joints, weights
+
+    group_joints = __get_vertex_group_joints(blender_object, armature, export_settings)
+
+    influence_vidxs = np.repeat(np.arange(num_verts), group_counts)
+    influence_joints = np.full(len(influence_groups), -1, dtype=np.int64)
+    known_groups = (influence_groups >= 0) & (influence_groups < len(group_joints))
+    influence_joints[known_groups] = group_joints[influence_groups[known_groups]]
+
+    # Drop influences that are not joints, or without weight
+    valid = (influence_joints >= 0) & (influence_weights > 0.0)
+    influence_vidxs = influence_vidxs[valid]
+    influence_joints = influence_joints[valid]
+    influence_weights = influence_weights[valid]
+
+    if not export_settings['gltf_all_vertex_influences']:
+        # Sort influences of each vertex by weight descending. lexsort is stable, ties keep the vertex group order.
+        order = np.lexsort((-influence_weights, influence_vidxs))
+        influence_vidxs = influence_vidxs[order]
+        influence_joints = influence_joints[order]
+        influence_weights = influence_weights[order]
+
+    # Slot of each influence among the ones of its vertex. Only the first bone_max sets of 4 are kept.
+    slots = np.arange(len(influence_vidxs)) - np.searchsorted(influence_vidxs, influence_vidxs)
+    kept = slots < 4 * bone_max
+    joints[influence_vidxs[kept], slots[kept]] = influence_joints[kept]
+    weights[influence_vidxs[kept], slots[kept]] = influence_weights[kept]
+
+    return joints, weights
+
+
+def __get_polygons(blender_mesh, export_settings):
+    """
+    Vertex index of each loop, and first loop, loop count and material of each polygon.
+
+    Polygons without a valid material slot go to the first primitive, as do all polygons when materials are
+    not exported.
+    """
+    num_loops = len(blender_mesh.loops)
+    num_polys = len(blender_mesh.polygons)
+
+    loop_vidxs = np.empty(num_loops, dtype=np.uint32)
+    blender_mesh.loops.foreach_get('vertex_index', loop_vidxs)
+
+    loop_starts = np.empty(num_polys, dtype=np.uint32)
+    loop_totals = np.empty(num_polys, dtype=np.uint32)
+    poly_mats = np.empty(num_polys, dtype=np.uint32)
+    blender_mesh.polygons.foreach_get('loop_start', loop_starts)
+    blender_mesh.polygons.foreach_get('loop_total', loop_totals)
+    blender_mesh.polygons.foreach_get('material_index', poly_mats)
+
+    num_materials = len(blender_mesh.materials)
+    if export_settings['gltf_materials'] is False or num_materials == 0:
+        poly_mats[:] = 0
+    else:
+        poly_mats[poly_mats >= num_materials] = 0
+
+    return loop_vidxs, loop_starts, loop_totals, poly_mats
+
+
+def __get_triangles(blender_mesh):
+    """
+    Triangulate all polygons.
+
+    Triangles keep the winding of their polygon, and come in polygon order.
+
+    :return: the loop indices of the corners of each triangle, and the polygon of each triangle
+    """
+    blender_mesh.calc_loop_triangles()
+    num_tris = len(blender_mesh.loop_triangles)
+
+    tri_loops = np.empty(num_tris * 3, dtype=np.uint32)
+    blender_mesh.loop_triangles.foreach_get('loops', tri_loops)
+    tri_polys = np.empty(num_tris, dtype=np.uint32)
+    blender_mesh.loop_triangles.foreach_get('polygon_index', tri_polys)
+
+    return tri_loops.reshape(-1, 3), tri_polys
+
+
+def __get_polygon_loops(loop_starts, loop_totals, poly_mats):
+    """All loop indices, in polygon order, and the material of the polygon of each of them."""
+    loop_starts = loop_starts.astype(np.int64)
+    loop_totals = loop_totals.astype(np.int64)
+    offsets = np.cumsum(loop_totals) - loop_totals
+    poly_loops = np.repeat(loop_starts - offsets, loop_totals) + np.arange(loop_totals.sum())
+    loop_mats = np.repeat(poly_mats, loop_totals)
+    return poly_loops, loop_mats
+
+
+def __deduplicate_vertices(loop_vidxs, loop_attributes):
+    """
+    Merge the triangle corners that produce the same vertex.
+
+    Corners are merged when they share a Blender vertex and all their per loop attributes (UVs, colors,
+    morph normals). New vertices are numbered in order of first use, as in the legacy extraction.
+
+    :param loop_vidxs: Blender vertex index of each corner
+    :param loop_attributes: list of float arrays, with one row per corner
+    :return: the index of the new vertex of each corner, and the first corner of each new vertex
+    """
+    num_corners = len(loop_vidxs)
+
+    # Each corner is keyed by the bytes of all its values. Adding 0.0 turns -0.0 into 0.0, so both still match.
+    columns = [loop_vidxs.astype(np.uint32).reshape(num_corners, 1).view(np.uint8)]
+    for attribute in loop_attributes:
+        attribute = np.ascontiguousarray(attribute.reshape(num_corners, -1) + 0.0)
+        columns.append(attribute.view(np.uint8))
+    keys = np.ascontiguousarray(np.hstack(columns))
+    keys = keys.view(np.dtype((np.void, keys.shape[1]))).reshape(-1)
+
+    _, first_corners, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    # np.unique numbers vertices in sort order, renumber them in order of first use
+    order = np.argsort(first_corners, kind='stable')
+    new_indices = np.empty(len(order), dtype=np.uint32)
+    new_indices[order] = np.arange(len(order), dtype=np.uint32)
+
+    return new_indices[inverse.reshape(-1)], first_corners[order]
@@ -23,6 +23,7 @@ from io_scene_gltf2.io.com import gltf2_io
 from io_scene_gltf2.io.com import gltf2_io_constants
 from io_scene_gltf2.io.exp import gltf2_io_binary_data
 from io_scene_gltf2.blender.exp import gltf2_blender_export_keys
+from io_scene_gltf2.blender.exp import gltf2_blender_utils
 from io_scene_gltf2.io.com.gltf2_io_debug import print_console
 from ..com.gltf2_blender_extras import generate_extras
 
@@ -64,15 +65,15 @@ def __gather_animation(pre_anim, nodes, export_settings):
     # track are considered unanimated. Star the empty temp track for those.
     anim_nodes = []
     for node in nodes:
-        if node.__blender_data[0] != 'OBJECT' and node.__blender_data[0] != 'BONE':
+        if node.blender_data[0] != 'OBJECT' and node.blender_data[0] != 'BONE':
             continue
-        ob = node.__blender_data[1]
+        ob = node.blender_data[1]
         if not ob.animation_data:
             continue
         for track in ob.animation_data.nla_tracks:
             if track.name == anim_name:
                 track.is_solo = True
-                if ob.type == 'ARMATURE' and node.__blender_data[0] == 'BONE':
+                if ob.type == 'ARMATURE' and node.blender_data[0] == 'BONE':
                     # only append bones that are animated in current anim
                     actions = __get_blender_actions(ob)
                     for action in actions:
@@ -87,8 +88,8 @@ def __gather_animation(pre_anim, nodes, export_settings):
                     anim_nodes.append(node)
                 break
         else:
-            if node.__blender_data[0] == 'OBJECT':
-                node.__temp_nla_track.is_solo = True
+            if node.blender_data[0] == 'OBJECT':
+                node.temp_nla_track.is_solo = True
 
     f_start = math.floor(frame_start)
     f_end = math.ceil(frame_end) + 1
@@ -103,11 +104,11 @@ def __gather_animation(pre_anim, nodes, export_settings):
     for f in range(f_start, f_end, f_step):
         bpy.context.scene.frame_set(f)
         for i, node in enumerate(anim_nodes):
-            if node.__blender_data[0] == 'OBJECT':
-                t, r, s = __get_gltf_trs_from_object(node.__blender_data[1], export_settings)
-            elif node.__blender_data[0] == 'BONE':
-                arma_ob = node.__blender_data[1]
-                pbone = arma_ob.pose.bones[node.__blender_data[2]]
+            if node.blender_data[0] == 'OBJECT':
+                t, r, s = __get_gltf_trs_from_object(node.blender_data[1], export_settings)
+            elif node.blender_data[0] == 'BONE':
+                arma_ob = node.blender_data[1]
+                pbone = arma_ob.pose.bones[node.blender_data[2]]
                 t, r, s = __get_gltf_trs_from_bone(pbone, export_settings)
             else:
                 assert False
@@ -122,7 +123,7 @@ def __gather_animation(pre_anim, nodes, export_settings):
 
     for i, node in enumerate(anim_nodes):
         # Get paths used in the NLA track
-        actions = __get_blender_actions(node.__blender_data[1])
+        actions = __get_blender_actions(node.blender_data[1])
         paths = []
 
         pathTypes = {
@@ -139,7 +140,7 @@ def __gather_animation(pre_anim, nodes, export_settings):
             if action[1] == anim_name:
                 for fcurve in action[0].fcurves:
                     data_path = fcurve.data_path
-                    if node.__blender_data[0] == 'OBJECT':
+                    if node.blender_data[0] == 'OBJECT':
                         paths.append(pathTypes.get(data_path))
                     else: # for armatures
                         paths.append(pathTypes.get(data_path.rpartition('.')[2]))
@@ -215,12 +216,12 @@ def __get_gltf_trs_from_bone(pbone, export_settings):
 
 def __get_blender_nodes(scene):
     # Get a list of all nodes that came from Blender objects or bones. These
-    # have a __blender_data field that records what they came from.
+    # have a blender_data field that records what they came from.
     nodes = []
 
     def visit(node):
         nonlocal nodes
-        if hasattr(node, '__blender_data'):
+        if hasattr(node, 'blender_data'):
             nodes.append(node)
         for child in node.children:
             visit(child)
@@ -239,9 +240,9 @@ def __gather_pre_anims(nodes):
     pre_anims = {}
 
     for node in nodes:
-        if node.__blender_data[0] != 'OBJECT' and node.__blender_data[0] != 'BONE':
+        if node.blender_data[0] != 'OBJECT' and node.blender_data[0] != 'BONE':
             continue
-        ob = node.__blender_data[1]
+        ob = node.blender_data[1]
         if not ob.animation_data:
             continue
         for track in ob.animation_data.nla_tracks:
@@ -261,50 +262,50 @@ def __prepare_nla_tracks(nodes):
     # create empty temp tracks (we star these to make an object
     # "unanimated").
     for node in nodes:
-        if node.__blender_data[0] != 'OBJECT' and node.__blender_data[0] != 'BONE':
+        if node.blender_data[0] != 'OBJECT' and node.blender_data[0] != 'BONE':
             continue
-        ob = node.__blender_data[1]
+        ob = node.blender_data[1]
         if not ob.animation_data:
             continue
 
-        node.__original_use_nla = ob.animation_data.use_nla
+        node.original_use_nla = ob.animation_data.use_nla
         ob.animation_data.use_nla = True
 
-        node.__temp_nla_track = ob.animation_data.nla_tracks.new()
+        node.temp_nla_track = ob.animation_data.nla_tracks.new()
 
         for track in ob.animation_data.nla_tracks:
             if track.is_solo:
-                node.__original_solo_track = track
+                node.original_solo_track = track
                 break
         else:
-            node.__original_solo_track = None
+            node.original_solo_track = None
 
 
 def __restore_original_nla_track_state(nodes):
     # Undoes the NLA track changes __prepare_nodes did.
     for node in nodes:
-        if node.__blender_data[0] != 'OBJECT' and node.__blender_data[0] != 'BONE':
+        if node.blender_data[0] != 'OBJECT' and node.blender_data[0] != 'BONE':
             continue
-        ob = node.__blender_data[1]
+        ob = node.blender_data[1]
         if not ob.animation_data:
             continue
 
         # Restore original use_nla
-        if hasattr(node, '__original_use_nla'):
-            ob.animation_data.use_nla = node.__original_use_nla
+        if hasattr(node, 'original_use_nla'):
+            ob.animation_data.use_nla = node.original_use_nla
 
         # Restore original starred track
-        if hasattr(node, '__original_solo_track'):
-            if node.__original_solo_track is None:
+        if hasattr(node, 'original_solo_track'):
+            if node.original_solo_track is None:
                 # Unstar tracks
                 ob.animation_data.nla_tracks[0].is_solo = True
                 ob.animation_data.nla_tracks[0].is_solo = False
             else:
-                node.__original_solo_track.is_solo = True
+                node.original_solo_track.is_solo = True
 
         # Delete the temp track
-        if hasattr(node, '__temp_nla_track'):
-            ob.animation_data.nla_tracks.remove(node.__temp_nla_track)
+        if hasattr(node, 'temp_nla_track'):
+            ob.animation_data.nla_tracks.remove(node.temp_nla_track)
 
 
 def __get_frame_range_for_nla_track(track):
@@ -323,8 +324,8 @@ def __get_keyframe_accessor(frame_start, frame_end, frame_step):
         component_type=gltf2_io_constants.ComponentType.Float,
         type=gltf2_io_constants.DataType.Scalar,
         count=len(keyframes),
-        min=[keyframes[0]],
-        max=[keyframes[-1]],
+        min=gltf2_blender_utils.min_components(keyframes, gltf2_io_constants.DataType.Scalar),
+        max=gltf2_blender_utils.max_components(keyframes, gltf2_io_constants.DataType.Scalar),
         byte_offset=None,
         extensions=None,
         extras=None,
@@ -12,11 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
+
 from . import gltf2_blender_export_keys
 from io_scene_gltf2.io.com import gltf2_io
 from io_scene_gltf2.io.com import gltf2_io_constants
 from io_scene_gltf2.io.com import gltf2_io_debug
 from io_scene_gltf2.io.exp import gltf2_io_binary_data
+from io_scene_gltf2.io.exp import gltf2_io_quantization
+from io_scene_gltf2.io.exp.gltf2_io_asobo_vertex import VertexData
 from io_scene_gltf2.blender.exp import gltf2_blender_utils
 
 
@@ -26,6 +30,9 @@ def gather_primitive_attributes(blender_primitive, export_settings, asobo_vertex
 
     :return: a dictionary of attributes
     """
+    if blender_primitive.get('vertices') is not None:
+        return __gather_interleaved(blender_primitive['vertices'], export_settings)
+
     attributes = {}
     attributes.update(__gather_position(blender_primitive, export_settings))
     attributes.update(__gather_tangent(blender_primitive, export_settings))
@@ -36,6 +43,49 @@ def gather_primitive_attributes(blender_primitive, export_settings, asobo_vertex
     return attributes
 
 
+def __gather_interleaved(vertices: VertexData, export_settings):
+    """
+    Gathers the attributes of interleaved vertices, one for each field of their layout.
+
+    All accessors hold the VertexData as buffer view, the exporter writes it as is.
+    """
+    # Same component types as the other attributes, half floats are declared as shorts
+    component_types = {
+        'f4': gltf2_io_constants.ComponentType.Float,
+        'f2': gltf2_io_constants.ComponentType.Short,
+        'i1': gltf2_io_constants.ComponentType.Byte,
+        'u2': gltf2_io_constants.ComponentType.UnsignedShort,
+    }
+    data_types = {
+        (): gltf2_io_constants.DataType.Scalar,
+        (2,): gltf2_io_constants.DataType.Vec2,
+        (3,): gltf2_io_constants.DataType.Vec3,
+        (4,): gltf2_io_constants.DataType.Vec4,
+    }
+
+    bounds = vertices.position_bounds()
+
+    attributes = {}
+    for name in vertices.dtype.names:
+        field_dtype = vertices.dtype.fields[name][0]
+        component_type = component_types[field_dtype.base.kind + str(field_dtype.base.itemsize)]
+        attributes[name] = gltf2_io.Accessor(
+            buffer_view=vertices,
+            byte_offset=None,
+            component_type=component_type,
+            count=vertices.count,
+            extensions=None,
+            extras=None,
+            max=bounds[1] if name == 'POSITION' and bounds is not None else None,
+            min=bounds[0] if name == 'POSITION' and bounds is not None else None,
+            name=None,
+            normalized=True if name.startswith('WEIGHTS_') and component_type == 5123 else None,
+            sparse=None,
+            type=data_types[field_dtype.shape]
+        )
+    return attributes
+
+
 def __gather_position(blender_primitive, export_settings):
     position = blender_primitive["attributes"]["POSITION"]
     componentType = gltf2_io_constants.ComponentType.Float
@@ -60,9 +110,10 @@ def __gather_position(blender_primitive, export_settings):
 def __gather_normal(blender_primitive, export_settings):
     if export_settings[gltf2_blender_export_keys.NORMALS]:
         normal = blender_primitive["attributes"]['NORMAL']
+        errors = export_settings[gltf2_blender_export_keys.QUANTIZATION_ERRORS]
         return {
             "NORMAL": gltf2_io.Accessor(
-                buffer_view=list(map(lambda x: round(x * 127.0), normal)),
+                buffer_view=gltf2_io_quantization.to_snorm8(normal, errors, 'NORMAL'),
                 byte_offset=None,
                 # component_type=gltf2_io_constants.ComponentType.Float,
                 component_type=gltf2_io_constants.ComponentType.Byte,
@@ -89,9 +140,10 @@ def __gather_tangent(blender_primitive, export_settings):
     if export_settings[gltf2_blender_export_keys.TANGENTS]:
         if blender_primitive["attributes"].get('TANGENT') is not None:
             tangent = blender_primitive["attributes"]['TANGENT']
+            errors = export_settings[gltf2_blender_export_keys.QUANTIZATION_ERRORS]
             return {
                 "TANGENT": gltf2_io.Accessor(
-                    buffer_view=list(map(lambda x: round(x * 127.0), tangent)),
+                    buffer_view=gltf2_io_quantization.to_snorm8(tangent, errors, 'TANGENT'),
                     byte_offset=None,
                     # component_type=gltf2_io_constants.ComponentType.Float,
                     component_type=gltf2_io_constants.ComponentType.Byte,
@@ -113,12 +165,13 @@ def __gather_tangent(blender_primitive, export_settings):
 def __gather_texcoord(blender_primitive, export_settings):
     attributes = {}
     if export_settings[gltf2_blender_export_keys.TEX_COORDS]:
+        errors = export_settings[gltf2_blender_export_keys.QUANTIZATION_ERRORS]
         tex_coord_index = 0
         tex_coord_id = 'TEXCOORD_' + str(tex_coord_index)
         while blender_primitive["attributes"].get(tex_coord_id) is not None:
             tex_coord = blender_primitive["attributes"][tex_coord_id]
             attributes[tex_coord_id] = gltf2_io.Accessor(
-                buffer_view=tex_coord,
+                buffer_view=gltf2_io_quantization.to_half(tex_coord, errors, tex_coord_id),
                 byte_offset=None,
                 # component_type=gltf2_io_constants.ComponentType.Float,
                 component_type=gltf2_io_constants.ComponentType.Short, # (e) 2 byte float
@@ -143,13 +196,13 @@ def __gather_colors(blender_primitive, export_settings, asobo_vertex_type):
         color_index = 0
         color_id = 'COLOR_' + str(color_index)
         component_type = gltf2_io_constants.ComponentType.UnsignedShort if asobo_vertex_type == 'VTX' else gltf2_io_constants.ComponentType.Byte
-        # converter = (lambda x: round(x * 65535.0)) if asobo_vertex_type == 'VTX' else (lambda x: round(x * 127.0))
         # All the colors in the vanilla gltf are 15360
-        converter = (lambda x: 15360) if asobo_vertex_type == 'VTX' else (lambda x: -1)
+        color_value = 15360 if asobo_vertex_type == 'VTX' else -1
         while blender_primitive["attributes"].get(color_id) is not None:
             internal_color = blender_primitive["attributes"][color_id]
             attributes[color_id] = gltf2_io.Accessor(
-                buffer_view=list(map(converter, internal_color)),
+                buffer_view=np.full(len(internal_color), color_value,
+                                    dtype=gltf2_io_constants.ComponentType.to_type_code(component_type)),
                 byte_offset=None,
                 # component_type=gltf2_io_constants.ComponentType.Float,
                 component_type=component_type,
@@ -174,7 +227,7 @@ def __gather_skins(blender_primitive, export_settings, asobo_vertex_type):
         bone_set_index = 0
         joint_id = 'JOINTS_' + str(bone_set_index)
         weight_id = 'WEIGHTS_' + str(bone_set_index)
-        while blender_primitive["attributes"].get(joint_id) and blender_primitive["attributes"].get(weight_id):
+        while __has_values(blender_primitive, joint_id) and __has_values(blender_primitive, weight_id):
             if bone_set_index >= 1:
                 if not export_settings['gltf_all_vertex_influences']:
                     gltf2_io_debug.print_console("WARNING", "There are more than 4 joint vertex influences."
@@ -203,16 +256,15 @@ def __gather_skins(blender_primitive, export_settings, asobo_vertex_type):
             internal_weight = blender_primitive["attributes"][weight_id]
             # normalize first 4 weights, when not exporting all influences, except BLEND1 since it's already technically normalized
             if not export_settings['gltf_all_vertex_influences'] and not asobo_vertex_type == 'BLEND1':
-                for idx in range(0, len(internal_weight), 4):
-                    weight_slice = internal_weight[idx:idx + 4]
-                    total = sum(weight_slice)
-                    if total > 0:
-                        factor = 1.0 / total
-                        internal_weight[idx:idx + 4] = [w * factor for w in weight_slice]
+                vertex_weights = np.array(internal_weight, dtype=np.float64).reshape(-1, 4)
+                totals = vertex_weights[:, 0] + vertex_weights[:, 1] + vertex_weights[:, 2] + vertex_weights[:, 3]
+                factors = np.divide(1.0, totals, out=np.ones(totals.shape), where=totals > 0.0)
+                internal_weight = (vertex_weights * factors[:, np.newaxis]).reshape(-1)
             weight_data_type = gltf2_io_constants.DataType.Scalar if asobo_vertex_type == 'BLEND1' else gltf2_io_constants.DataType.Vec4
             component_type = gltf2_io_constants.ComponentType.Float if asobo_vertex_type == 'BLEND1' else gltf2_io_constants.ComponentType.UnsignedShort
             weight = gltf2_io.Accessor(
-                buffer_view=internal_weight if asobo_vertex_type == 'BLEND1' else [round(x * 65535.0) for x in internal_weight],
+                buffer_view=internal_weight if asobo_vertex_type == 'BLEND1' else gltf2_io_quantization.to_unorm16(
+                    internal_weight, export_settings[gltf2_blender_export_keys.QUANTIZATION_ERRORS], weight_id),
                 byte_offset=None,
                 component_type=component_type,
                 count=len(internal_weight) // gltf2_io_constants.DataType.num_elements(
@@ -232,3 +284,8 @@ def __gather_skins(blender_primitive, export_settings, asobo_vertex_type):
             joint_id = 'JOINTS_' + str(bone_set_index)
             weight_id = 'WEIGHTS_' + str(bone_set_index)
     return attributes
+
+
+def __has_values(blender_primitive, attribute):
+    values = blender_primitive["attributes"].get(attribute)
+    return values is not None and len(values) != 0
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import bpy
+import numpy as np
 from typing import List, Optional, Tuple
 
 from .gltf2_blender_export_keys import NORMALS, MORPH_NORMAL, TANGENTS, MORPH_TANGENT, MORPH
@@ -26,9 +27,13 @@ from io_scene_gltf2.blender.exp import gltf2_blender_gather_materials
 
 from io_scene_gltf2.io.com import gltf2_io
 from io_scene_gltf2.io.exp import gltf2_io_binary_data
+from io_scene_gltf2.io.exp.gltf2_io_asobo_vertex import VertexData
 from io_scene_gltf2.io.com import gltf2_io_constants
 from io_scene_gltf2.io.com.gltf2_io_debug import print_console
 
+# Vertices a primitive can address with its 16 bit indices, kept below the 65535 primitive restart value
+MAX_PRIMITIVE_VERTEX_COUNT = 65530
+
 
 @cached
 def gather_primitives(
@@ -98,76 +103,25 @@ def __gather_cache_primitives(
     is_skinned_mesh = any('BLEND' in x['VertexType'] for x in blender_primitives)
 
     for prim in blender_primitives:
-        max_index = max(prim['indices'])
-        assert (max_index + 1) == len(prim['attributes']['POSITION']) // 3
+        max_index = int(prim['indices'].max())
+        assert (max_index + 1) == __get_vertex_count(prim)
     
-    if not is_skinned_mesh:
-        max_index = 0
-        for internal_primitive in blender_primitives:
-            indices = internal_primitive['indices']
-            indices = [x + max_index for x in indices]
-            internal_primitive['indices'] = indices
-            max_index = max(indices) + 1
-
+    # Primitives with more vertices than 16 bit indices can address are split in parts with their own vertices
     split_primitives = []
-
-    base_vertex_index = None
+    for internal_primitive in blender_primitives:
+        split_primitives.extend(__split_primitive(internal_primitive))
+    blender_primitives = split_primitives
 
     if not is_skinned_mesh:
-        for internal_primitive in blender_primitives:
-            indices = internal_primitive['indices']
-            if base_vertex_index is not None:
-                internal_primitive['BaseVertexIndex'] = base_vertex_index
-                indices = [x - base_vertex_index for x in indices]
-                internal_primitive['indices'] = indices
-            max_index = max(indices)
-            if max_index >= 65530:
-                first_big_index = indices.index(65530)
-                mod3 = first_big_index % 3
-                start = first_big_index - mod3
-
-                indices1 = internal_primitive['indices'][:start]
-                new_primitive1 = {
-                    'VertexType': internal_primitive['VertexType'],
-                    'material': internal_primitive['material'],
-                    'attributes': internal_primitive['attributes'],
-                    'indices': indices1,
-                    'BaseVertexIndex': base_vertex_index,
-                }
-                split_primitives.append(new_primitive1)
-
-                indices2 = internal_primitive['indices'][start:]
-                min_index2 = min(indices2)
-                indices2 = [x - min_index2 for x in indices2]
-                if base_vertex_index is not None:
-                    base_vertex_index += min_index2
-                else:
-                    base_vertex_index = min_index2
-                new_primitive2 = {
-                    'VertexType': internal_primitive['VertexType'],
-                    'material': internal_primitive['material'],
-                    'attributes': {},
-                    'indices': indices2,
-                    'BaseVertexIndex': base_vertex_index,
-                }
-                for attr in new_primitive1['attributes']:
-                    # Empty list, since its all gonna get combined later anyways
-                    new_primitive2['attributes'][attr] = []
-
-                # TODO Handle mesh primitive that needs to be split into more than parts
-                assert max(indices2) < 65530
-                split_primitives.append(new_primitive2)
-            else:
-                split_primitives.append(internal_primitive)
-        blender_primitives = split_primitives
+        __rebase_indices(blender_primitives)
 
     if not is_skinned_mesh:
-        max_index = max([max(x['indices']) + (x['BaseVertexIndex'] or 0) for x in blender_primitives]) + 1
-        assert max_index == sum([len(x['attributes']['POSITION']) // 3 for x in blender_primitives])
+        max_index = max([int(x['indices'].max()) + (x['BaseVertexIndex'] or 0) for x in blender_primitives]) + 1
+        assert max_index == sum([__get_vertex_count(x) for x in blender_primitives])
     else:
         for prim in blender_primitives:
-            max_index = max(prim['indices'])
-            assert (max_index + 1) == len(prim['attributes']['POSITION']) // 3
+            max_index = int(prim['indices'].max())
+            assert (max_index + 1) == __get_vertex_count(prim)
 
     for internal_primitive in blender_primitives:
         asobo_vertex_type = internal_primitive['VertexType']
@@ -188,31 +142,146 @@ def __gather_cache_primitives(
         primitives.append(primitive)
 
     if not is_skinned_mesh:
-        foo(primitives)
-        max_index = max([max(x['indices'].buffer_view) + (x['extras']['ASOBO_primitive']['BaseVertexIndex'] or 0) for x in primitives])
+        __merge_shared_vertices(primitives)
+        max_index = max([int(x['indices'].buffer_view.max()) + (x['extras']['ASOBO_primitive']['BaseVertexIndex'] or 0) for x in primitives])
         assert (max_index + 1) == primitives[0]['attributes']['POSITION'].count
     else:
         for prim in primitives:
-            max_index = max(prim['indices'].buffer_view)
+            max_index = int(prim['indices'].buffer_view.max())
             assert (max_index + 1) == prim['attributes']['POSITION'].count
 
 
     return primitives
 
-def foo(primitives):
+def __split_primitive(blender_primitive):
+    """
+    Split a primitive using too many vertices in parts of consecutive triangles, each with its own vertices.
+
+    Vertices are only duplicated when they are used by triangles of several parts.
+    """
+    vertex_count = __get_vertex_count(blender_primitive)
+    if vertex_count <= MAX_PRIMITIVE_VERTEX_COUNT:
+        return [blender_primitive]
+
+    vertices = blender_primitive.get('vertices')
+    if vertices is not None:
+        all_vertices = np.concatenate(vertices.chunks)
+    else:
+        attributes = {attr: np.asarray(values).reshape(vertex_count, -1)
+                      for attr, values in blender_primitive['attributes'].items()}
+
+    parts = []
+    for indices, vertex_indices in __partition_triangles(blender_primitive['indices'], vertex_count):
+        part = dict(blender_primitive)
+        part['indices'] = indices
+        part['BaseVertexIndex'] = None
+        if vertices is not None:
+            part['vertices'] = VertexData(vertices.vertex_type)
+            part['vertices'].append(all_vertices[vertex_indices])
+        else:
+            part['attributes'] = {attr: values[vertex_indices].reshape(-1) for attr, values in attributes.items()}
+        parts.append(part)
+
+    print_console('INFO', 'Primitive with ' + str(vertex_count) + ' vertices split in ' + str(len(parts)) + ' parts')
+    return parts
+
+def __partition_triangles(indices, vertex_count):
+    """
+    Partition triangles in runs using at most MAX_PRIMITIVE_VERTEX_COUNT vertices, in linear time.
+
+    Yields the indices of each run, renumbered in the order their vertices are first used, along with the original
+    index of each of these vertices.
+    """
+    triangle_count = len(indices) // 3
+    # position in the scanned corners of the first use of each vertex, only read for the vertices just written
+    first_use = np.empty(vertex_count, dtype=np.intp)
+
+    start = 0
+    window = MAX_PRIMITIVE_VERTEX_COUNT
+    while start < triangle_count:
+        # Scan a window of triangles, doubled until the run ends within it, which keeps the scan linear
+        while True:
+            end = min(start + window, triangle_count)
+            corners = indices[3 * start:3 * end]
+            positions = np.arange(len(corners))
+            # the first use is the one written last
+            first_use[corners[::-1]] = positions[::-1]
+            is_first_use = first_use[corners] == positions
+            used_vertex_counts = np.cumsum(is_first_use)
+            if used_vertex_counts[-1] <= MAX_PRIMITIVE_VERTEX_COUNT and end != triangle_count:
+                window *= 2
+                continue
+            # triangles until the last one with all its vertices within the limit
+            end = start + int(np.searchsorted(used_vertex_counts[2::3], MAX_PRIMITIVE_VERTEX_COUNT, side='right'))
+            break
+
+        corner_count = 3 * (end - start)
+        corners = corners[:corner_count]
+        local_indices = (used_vertex_counts[:corner_count] - 1).astype(np.uint32)
+        yield local_indices[first_use[corners]], corners[is_first_use[:corner_count]]
+
+        start = end
+        window = MAX_PRIMITIVE_VERTEX_COUNT
+
+def __rebase_indices(blender_primitives):
+    """
+    Offset the indices of primitives sharing their vertices, which are laid out one primitive after the other.
+
+    The base vertex index only changes when the indices would overflow, it is then the first vertex of the primitive.
+    """
+    vertex_offset = 0
+    base_vertex_index = None
+    for internal_primitive in blender_primitives:
+        indices = internal_primitive['indices'] + np.uint32(vertex_offset)
+        vertex_count = __get_vertex_count(internal_primitive)
+        if vertex_offset + vertex_count - (base_vertex_index or 0) > MAX_PRIMITIVE_VERTEX_COUNT:
+            base_vertex_index = vertex_offset
+        if base_vertex_index is not None:
+            indices = indices - np.uint32(base_vertex_index)
+        internal_primitive['indices'] = indices
+        internal_primitive['BaseVertexIndex'] = base_vertex_index
+        vertex_offset += vertex_count
+
+def __get_vertex_count(blender_primitive):
+    if blender_primitive.get('vertices') is not None:
+        return blender_primitive['vertices'].count
+    return len(blender_primitive['attributes']['POSITION']) // 3
+
+def __merge_shared_vertices(primitives):
+    """Merge the vertices of the primitives of an unskinned mesh, which share all their attribute accessors."""
     for attr in primitives[0]['attributes']:
-        bar(primitives, attr)
+        __merge_shared_attribute(primitives, attr)
 
-def bar(primitives, attr):
+def __merge_shared_attribute(primitives, attr):
     acc = primitives[0]['attributes'][attr]
-    all = []
+    if isinstance(acc.buffer_view, VertexData):
+        # Interleaved vertices are not copied, only their chunks are gathered
+        all = VertexData(acc.buffer_view.vertex_type)
+        for prim in primitives:
+            all.extend(prim['attributes'][attr].buffer_view)
+        acc.buffer_view = all
+        acc.count = all.count
+        if attr == 'POSITION':
+            acc.min, acc.max = all.position_bounds()
+
+        for primitive in primitives:
+            primitive['attributes'][attr] = acc
+        return
+
+    # The merged attribute is allocated once, in the type of its components, and each primitive is copied in place
+    num_elements = gltf2_io_constants.DataType.num_elements(acc.type)
+    all = np.empty(sum(len(prim['attributes'][attr].buffer_view) for prim in primitives),
+                   dtype=gltf2_io_constants.ComponentType.to_type_code(acc.component_type))
+    offset = 0
     for prim in primitives:
-        all.extend(prim['attributes'][attr].buffer_view)
+        data = prim['attributes'][attr].buffer_view
+        all[offset:offset + len(data)] = data
+        offset += len(data)
     acc.buffer_view = all
-    acc.count = len(all) // gltf2_io_constants.DataType.num_elements(acc.type)
+    acc.count = len(all) // num_elements
     if attr == 'POSITION':
-        acc.max = list(map(float, gltf2_blender_utils.max_components(all, acc.type)))
-        acc.min = list(map(float, gltf2_blender_utils.min_components(all, acc.type)))
+        acc.max = gltf2_blender_utils.max_components(all, acc.type)
+        acc.min = gltf2_blender_utils.min_components(all, acc.type)
 
     for primitive in primitives:
         primitive['attributes'][attr] = acc
@@ -220,23 +289,13 @@ def bar(primitives, attr):
 def __gather_indices(blender_primitive, blender_mesh, modifiers, export_settings):
     indices = blender_primitive['indices']
 
-    new_indices = []
-
-    # Reverse order of indices so game will render the proper front face
-    for i in range(0, len(indices), 3):
-        new_indices.append(indices[i + 2])
-        new_indices.append(indices[i + 1])
-        new_indices.append(indices[i + 0])
-    
-    indices = new_indices
-
     # NOTE: Values used by some graphics APIs as "primitive restart" values are disallowed.
     # Specifically, the values 65535 (in UINT16) and 4294967295 (in UINT32) cannot be used as indices.
     # https://github.com/KhronosGroup/glTF/issues/1142
     # https://github.com/KhronosGroup/glTF/pull/1476/files
     # Also, UINT8 mode is not supported:
     # https://github.com/KhronosGroup/glTF/issues/1471
-    max_index = max(indices)
+    max_index = int(indices.max())
     assert max_index < 65535
 
     # if max_index >= 65530:
@@ -251,6 +310,9 @@ def __gather_indices(blender_primitive, blender_mesh, modifiers, export_settings
     #     print_console('ERROR', 'A mesh contains too many vertices (' + str(max_index) + ') and needs to be split before export.')
     #     return None
 
+    # Reverse order of indices so game will render the proper front face
+    indices = indices.reshape(-1, 3)[:, ::-1].astype(np.uint16).reshape(-1)
+
     element_type = gltf2_io_constants.DataType.Scalar
     return gltf2_io.Accessor(
         buffer_view=indices,
@@ -288,10 +350,10 @@ def __gather_targets(blender_primitive, blender_mesh, modifiers, export_settings
                 target_normal_id = 'MORPH_NORMAL_' + str(morph_index)
                 target_tangent_id = 'MORPH_TANGENT_' + str(morph_index)
 
-                if blender_primitive["attributes"].get(target_position_id):
+                if len(blender_primitive["attributes"].get(target_position_id, ())) != 0:
                     target = {}
                     internal_target_position = blender_primitive["attributes"][target_position_id]
-                    binary_data = gltf2_io_binary_data.BinaryData.from_list(
+                    binary_data = gltf2_io_binary_data.BinaryData.from_array(
                         internal_target_position,
                         gltf2_io_constants.ComponentType.Float
                     )
@@ -315,10 +377,10 @@ def __gather_targets(blender_primitive, blender_mesh, modifiers, export_settings
 
                     if export_settings[NORMALS] \
                             and export_settings[MORPH_NORMAL] \
-                            and blender_primitive["attributes"].get(target_normal_id):
+                            and len(blender_primitive["attributes"].get(target_normal_id, ())) != 0:
 
                         internal_target_normal = blender_primitive["attributes"][target_normal_id]
-                        binary_data = gltf2_io_binary_data.BinaryData.from_list(
+                        binary_data = gltf2_io_binary_data.BinaryData.from_array(
                             internal_target_normal,
                             gltf2_io_constants.ComponentType.Float,
                         )
@@ -340,9 +402,9 @@ def __gather_targets(blender_primitive, blender_mesh, modifiers, export_settings
 
                     if export_settings[TANGENTS] \
                             and export_settings[MORPH_TANGENT] \
-                            and blender_primitive["attributes"].get(target_tangent_id):
+                            and len(blender_primitive["attributes"].get(target_tangent_id, ())) != 0:
                         internal_target_tangent = blender_primitive["attributes"][target_tangent_id]
-                        binary_data = gltf2_io_binary_data.BinaryData.from_list(
+                        binary_data = gltf2_io_binary_data.BinaryData.from_array(
                             internal_target_tangent,
                             gltf2_io_constants.ComponentType.Float,
                         )
@@ -365,3 +427,4 @@ def __gather_targets(blender_primitive, blender_mesh, modifiers, export_settings
                     morph_index += 1
         return targets
     return None
+
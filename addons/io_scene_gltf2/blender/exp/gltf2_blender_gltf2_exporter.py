@@ -14,10 +14,10 @@
 import re
 import os
 import urllib.parse
-import ctypes
-import struct
 from typing import List
 
+import numpy as np
+
 from ... import get_version_string
 from io_scene_gltf2.io.com import gltf2_io
 from io_scene_gltf2.io.com import gltf2_io_extensions
@@ -25,52 +25,12 @@ from io_scene_gltf2.io.com import gltf2_io_extensions
 from io_scene_gltf2.io.exp import gltf2_io_binary_data
 from io_scene_gltf2.io.exp import gltf2_io_buffer
 from io_scene_gltf2.io.exp import gltf2_io_asobo_buffer
+from io_scene_gltf2.io.exp.gltf2_io_asobo_vertex import VertexData
 from io_scene_gltf2.io.exp import gltf2_io_image_data
+from io_scene_gltf2.io.exp.gltf2_io_export import replace_on_success
 from io_scene_gltf2.blender.exp import gltf2_blender_export_keys
 
 
-STRUCT_POSITION = struct.Struct('fff')
-STRUCT_TANGENT = struct.Struct('bbbb')
-STRUCT_NORMAL = struct.Struct('bbbb')
-STRUCT_UV = struct.Struct('ee')
-STRUCT_JOINT = struct.Struct('HHHH')
-STRUCT_WEIGHT1 = struct.Struct('f')
-STRUCT_WEIGHT4 = struct.Struct('HHHH')
-STRUCT_COLOR_VTX = struct.Struct('HHHH')
-STRUCT_COLOR_BLEND = struct.Struct('bbbb')
-
-# attr_to_struct_vtx = {
-#     "POSITION": STRUCT_POSITION,
-#     "TANGENT": STRUCT_TANGENT,
-#     "NORMAL": STRUCT_NORMAL,
-#     "TEXCOORD_0": STRUCT_UV,
-#     "TEXCOORD_1": STRUCT_UV,
-#     "COLOR_0": STRUCT_COLOR_VTX,
-# }
-
-# attr_to_struct_blend1 = {
-#     "POSITION": STRUCT_POSITION,
-#     "TANGENT": STRUCT_TANGENT,
-#     "NORMAL": STRUCT_NORMAL,
-#     "TEXCOORD_0": STRUCT_UV,
-#     "TEXCOORD_1": STRUCT_UV,
-#     "JOINTS_0": STRUCT_JOINT,
-#     "WEIGHTS_0": STRUCT_WEIGHT1,
-#     "COLOR_0": STRUCT_COLOR_BLEND,
-# }
-
-# attr_to_struct_blend4 = {
-#     "POSITION": STRUCT_POSITION,
-#     "TANGENT": STRUCT_TANGENT,
-#     "NORMAL": STRUCT_NORMAL,
-#     "TEXCOORD_0": STRUCT_UV,
-#     "TEXCOORD_1": STRUCT_UV,
-#     "JOINTS_0": STRUCT_JOINT,
-#     "WEIGHTS_0": STRUCT_WEIGHT4,
-#     "COLOR_0": STRUCT_COLOR_BLEND,
-# }
-
-
 class GlTF2Exporter:
     """
     The glTF exporter flattens a scene graph to a glTF serializable format.
@@ -142,6 +102,9 @@ class GlTF2Exporter:
             gltf2_io.Texture: self.__gltf.textures
         }
 
+        # index of the properties already in their root level array, by id, so that each one is added only once
+        self.__childOfRootIndices = {property_type: {} for property_type in self.__childOfRootPropertyTypeLookup}
+
         self.__propertyTypeLookup = [
             gltf2_io.AccessorSparseIndices,
             gltf2_io.AccessorSparse,
@@ -159,8 +122,20 @@ class GlTF2Exporter:
             gltf2_io.MaterialOcclusionTextureInfoClass
         ]
 
+        # traversal of each glTF property type, by exact type. Other types are added on first use by __get_traverse
+        self.__traverse_by_type = {}
+        for property_type in self.__propertyTypeLookup:
+            self.__traverse_by_type[property_type] = self.__traverse_property
+        for property_type in self.__childOfRootPropertyTypeLookup:
+            self.__traverse_by_type[property_type] = self.__traverse_child_of_root
+        self.__traverse_by_type[gltf2_io.Mesh] = self.__traverse_mesh
+        self.__traverse_by_type[gltf2_io.Skin] = self.__traverse_skin
+        self.__traverse_by_type[gltf2_io.Animation] = self.__traverse_animation
+
         # These are the 8 predefined buffer views that asobo models use
         # No other buffer views should be created
+        # When spilling, each of them streams its data to a temporary file
+        spill = export_settings[gltf2_blender_export_keys.SPILL_BUFFERS]
         self.__asobo_buffer_views = {
             'bufferViewFloatMat4': None,
             'bufferViewAnimationFloatScalar': None,
@@ -173,7 +148,7 @@ class GlTF2Exporter:
         }
 
         self.__asobo_buffer_views['bufferViewFloatMat4'] = gltf2_io.BufferView(
-            buffer=gltf2_io_asobo_buffer.AsoboBuffer(),
+            buffer=gltf2_io_asobo_buffer.AsoboBuffer(spill=spill),
             byte_length=0,
             byte_offset=None,
             byte_stride=None,
@@ -182,10 +157,10 @@ class GlTF2Exporter:
             name='bufferViewFloatMat4',
             target=None
         )
-        self.__gltf.buffer_views.append(self.__asobo_buffer_views['bufferViewFloatMat4'])
+        self.__to_reference(self.__asobo_buffer_views['bufferViewFloatMat4'])
 
         self.__asobo_buffer_views['bufferViewAnimationFloatScalar'] = gltf2_io.BufferView(
-            buffer=gltf2_io_asobo_buffer.AsoboBuffer(),
+            buffer=gltf2_io_asobo_buffer.AsoboBuffer(spill=spill),
             byte_length=0,
             byte_offset=0,
             byte_stride=None,
@@ -194,10 +169,10 @@ class GlTF2Exporter:
             name='bufferViewAnimationFloatScalar',
             target=None
         )
-        self.__gltf.buffer_views.append(self.__asobo_buffer_views['bufferViewAnimationFloatScalar'])
+        self.__to_reference(self.__asobo_buffer_views['bufferViewAnimationFloatScalar'])
 
         self.__asobo_buffer_views['bufferViewAnimationFloatVec3'] = gltf2_io.BufferView(
-            buffer=gltf2_io_asobo_buffer.AsoboBuffer(),
+            buffer=gltf2_io_asobo_buffer.AsoboBuffer(spill=spill),
             byte_length=0,
             byte_offset=0,
             byte_stride=None,
@@ -206,10 +181,10 @@ class GlTF2Exporter:
             name='bufferViewAnimationFloatVec3',
             target=None
         )
-        self.__gltf.buffer_views.append(self.__asobo_buffer_views['bufferViewAnimationFloatVec3'])
+        self.__to_reference(self.__asobo_buffer_views['bufferViewAnimationFloatVec3'])
 
         self.__asobo_buffer_views['bufferViewAnimationFloatVec4'] = gltf2_io.BufferView(
-            buffer=gltf2_io_asobo_buffer.AsoboBuffer(),
+            buffer=gltf2_io_asobo_buffer.AsoboBuffer(spill=spill),
             byte_length=0,
             byte_offset=0,
             byte_stride=None,
@@ -218,10 +193,10 @@ class GlTF2Exporter:
             name='bufferViewAnimationFloatVec4',
             target=None
         )
-        self.__gltf.buffer_views.append(self.__asobo_buffer_views['bufferViewAnimationFloatVec4'])
+        self.__to_reference(self.__asobo_buffer_views['bufferViewAnimationFloatVec4'])
 
         self.__asobo_buffer_views['BufferViewVertexND'] = gltf2_io.BufferView(
-            buffer=gltf2_io_asobo_buffer.AsoboBuffer(),
+            buffer=gltf2_io_asobo_buffer.AsoboBuffer(spill=spill),
             byte_length=0,
             byte_offset=0,
             byte_stride=36,
@@ -230,10 +205,10 @@ class GlTF2Exporter:
             name='BufferViewVertexND',
             target=34962
         )
-        self.__gltf.buffer_views.append(self.__asobo_buffer_views['BufferViewVertexND'])
+        self.__to_reference(self.__asobo_buffer_views['BufferViewVertexND'])
 
         self.__asobo_buffer_views['BufferViewIndex'] = gltf2_io.BufferView(
-            buffer=gltf2_io_asobo_buffer.AsoboBuffer(),
+            buffer=gltf2_io_asobo_buffer.AsoboBuffer(spill=spill),
             byte_length=0,
             byte_offset=0,
             byte_stride=None,
@@ -242,10 +217,10 @@ class GlTF2Exporter:
             name='BufferViewIndex',
             target=34963
         )
-        self.__gltf.buffer_views.append(self.__asobo_buffer_views['BufferViewIndex'])
+        self.__to_reference(self.__asobo_buffer_views['BufferViewIndex'])
 
         self.__asobo_buffer_views['BufferViewVertex4Blend'] = gltf2_io.BufferView(
-            buffer=gltf2_io_asobo_buffer.AsoboBuffer(),
+            buffer=gltf2_io_asobo_buffer.AsoboBuffer(spill=spill),
             byte_length=0,
             byte_offset=0,
             byte_stride=48,
@@ -254,10 +229,10 @@ class GlTF2Exporter:
             name='BufferViewVertex4Blend',
             target=34962
         )
-        self.__gltf.buffer_views.append(self.__asobo_buffer_views['BufferViewVertex4Blend'])
+        self.__to_reference(self.__asobo_buffer_views['BufferViewVertex4Blend'])
 
         self.__asobo_buffer_views['BufferViewVertex1Blend'] = gltf2_io.BufferView(
-            buffer=gltf2_io_asobo_buffer.AsoboBuffer(),
+            buffer=gltf2_io_asobo_buffer.AsoboBuffer(spill=spill),
             byte_length=0,
             byte_offset=0,
             byte_stride=44,
@@ -266,7 +241,7 @@ class GlTF2Exporter:
             name='BufferViewVertex1Blend',
             target=34962
         )
-        self.__gltf.buffer_views.append(self.__asobo_buffer_views['BufferViewVertex1Blend'])
+        self.__to_reference(self.__asobo_buffer_views['BufferViewVertex1Blend'])
 
     @property
     def glTF(self):
@@ -275,31 +250,44 @@ class GlTF2Exporter:
         return self.__gltf
 
     # Add data from all asobo buffers views into main buffer
-    def finalize_asobo_buffers(self): # i really really really hate this function - should find a way around this at some point. the reason it's needed is because not all hard-coded buffers are needed, and some will export without any data causing an error
-        newBufferViews = []
-        for x in self.__asobo_buffer_views:
-            asobo_buffer_view = self.__asobo_buffer_views[x]
-            binary_data = asobo_buffer_view.buffer.to_bytes()
-            if binary_data == b'': # the buffer won't be needed to be exported since there is no data associated with it
+    def finalize_asobo_buffers(self):
+        """
+        Add the data of the Asobo buffer views to the main buffer.
+
+        Not all predefined buffer views are used by a model, the ones without data are removed. Buffer view
+        indices of the accessors are remapped in place.
+        """
+        empty_buffer_views = set()
+        for asobo_buffer_view in self.__asobo_buffer_views.values():
+            if asobo_buffer_view.buffer.byte_length == 0:
+                # the buffer won't be needed to be exported since there is no data associated with it
+                empty_buffer_views.add(id(asobo_buffer_view))
                 continue
-            offset = self.__buffer.add(binary_data)
+            byte_length = asobo_buffer_view.buffer.byte_length
+            offset = self.__buffer.add_chunks(asobo_buffer_view.buffer.chunks())
             asobo_buffer_view.buffer = 0
-            asobo_buffer_view.byte_length = len(binary_data)
+            asobo_buffer_view.byte_length = byte_length
             asobo_buffer_view.byte_offset = offset
-            newBufferViews.append(asobo_buffer_view.to_dict())
-        old_buffers = self.__gltf.buffer_views
-        if len(old_buffers) != len(newBufferViews): # we don't need to re-index if nothing changed
-            data = self.__gltf.to_dict()
-            for accessor in data['accessors']:
-                bufferIndex = accessor['bufferView']
-                bufferName = old_buffers[bufferIndex].name
-                for index, buffer in enumerate(newBufferViews):
-                    if bufferName == buffer:
-                        data['accessors'][data['accessors'].index(accessor)]['bufferView'] = index
-                        break
-            data['bufferViews'] = newBufferViews
-            self.__gltf = gltf2_io.gltf_from_dict(data)
 
+        if len(empty_buffer_views) == 0: # we don't need to re-index if nothing changed
+            return
+
+        buffer_views = []
+        new_indices = {}
+        for old_index, buffer_view in enumerate(self.__gltf.buffer_views):
+            if id(buffer_view) not in empty_buffer_views:
+                new_indices[old_index] = len(buffer_views)
+                buffer_views.append(buffer_view)
+
+        for accessor in self.__gltf.accessors:
+            if accessor.buffer_view is not None:
+                accessor.buffer_view = new_indices[accessor.buffer_view]
+            if accessor.sparse is not None:
+                accessor.sparse.indices.buffer_view = new_indices[accessor.sparse.indices.buffer_view]
+                accessor.sparse.values.buffer_view = new_indices[accessor.sparse.values.buffer_view]
+
+        # the list is updated in place, it is also referenced by the root property lookup
+        self.__gltf.buffer_views[:] = buffer_views
 
     def finalize_buffer(self, output_path=None, buffer_name=None, is_glb=False):
         """Finalize the glTF and write buffers."""
@@ -312,8 +300,8 @@ class GlTF2Exporter:
             if is_glb:
                 uri = None
             elif output_path and buffer_name:
-                with open(output_path + buffer_name, 'wb') as f:
-                    f.write(self.__buffer.to_bytes())
+                with replace_on_success(output_path + buffer_name, 'wb') as f:
+                    self.__buffer.write(f)
                 uri = buffer_name
             else:
                 uri = self.__buffer.to_embed_string()
@@ -327,10 +315,15 @@ class GlTF2Exporter:
             )
             self.__gltf.buffers.append(buffer)
 
+            if not is_glb:
+                # the data has been written or embedded, release it along with the spill files
+                self.__buffer.clear()
+
         self.__finalized = True
 
         if is_glb:
-            return self.__buffer.to_bytes()
+            # the chunks are written one after the other in the binary chunk of the GLB, never joined
+            return self.__buffer.chunks()
 
     def add_draco_extension(self):
         """
@@ -416,7 +409,14 @@ class GlTF2Exporter:
             # The object is not of a child of root --> don't convert to reference
             return property
 
-        return self.__append_unique_and_get_index(gltf_list, property)
+        # The same object always gets the same index. Objects in the list are kept alive, so their id is not reused.
+        indices = self.__childOfRootIndices[type(property)]
+        index = indices.get(id(property))
+        if index is None:
+            index = len(gltf_list)
+            gltf_list.append(property)
+            indices[id(property)] = index
+        return index
 
     @staticmethod
     def __append_unique_and_get_index(target: list, obj):
@@ -474,91 +474,22 @@ class GlTF2Exporter:
                 is_blend4 = primitive.extras['ASOBO_primitive']['VertexType'] == 'BLEND4'
                 buffer_view_name = 'BufferViewVertex4Blend' if is_blend4 else 'BufferViewVertex1Blend'
                 blend_buffer_view = self.__asobo_buffer_views[buffer_view_name]
-                expected_byte_stride = 48 if is_blend4 else 44
-
-                the_buffer = ctypes.create_string_buffer(expected_byte_stride * primitive.attributes['POSITION'].count)
 
-                # for attr in primitive.attributes:
-                #     attr_accessor = primitive.attributes[attr]
-                #     attr_accessor.buffer_view = gltf2_io_binary_data.BinaryData.from_list(attr_accessor.buffer_view, attr_accessor.component_type)
-            
-                offset = blend_buffer_view.buffer.byte_length
-                
-                if offset + 0 == 0:
-                    primitive.attributes['POSITION'].byte_offset = None
-                else:
-                    primitive.attributes['POSITION'].byte_offset = offset + 0
-                primitive.attributes['TANGENT'].byte_offset = offset + 12
-                primitive.attributes['NORMAL'].byte_offset = offset + 16
-                primitive.attributes['TEXCOORD_0'].byte_offset = offset + 20
-                primitive.attributes['TEXCOORD_1'].byte_offset = offset + 24
-                primitive.attributes['JOINTS_0'].byte_offset = offset + 28
-                primitive.attributes['WEIGHTS_0'].byte_offset = offset + 36
-                if is_blend4:
-                    primitive.attributes['COLOR_0'].byte_offset = offset + 44
-                else:
-                    primitive.attributes['COLOR_0'].byte_offset = offset + 40
-
-
-                # actual_byte_stride = 0
-                for vidx in range(primitive.attributes['POSITION'].count):
-                
-                    start = vidx * expected_byte_stride
-                    
-                    STRUCT_POSITION.pack_into(the_buffer, start, *primitive.attributes['POSITION'].buffer_view[vidx * 3:vidx * 3 + 3])
-                    STRUCT_TANGENT.pack_into(the_buffer, start + 12, *primitive.attributes['TANGENT'].buffer_view[vidx * 4:vidx * 4 + 4])
-                    STRUCT_NORMAL.pack_into(the_buffer, start + 16, *primitive.attributes['NORMAL'].buffer_view[vidx * 4:vidx * 4 + 4])
-                    STRUCT_UV.pack_into(the_buffer, start + 20, *primitive.attributes['TEXCOORD_0'].buffer_view[vidx * 2:vidx * 2 + 2])
-                    STRUCT_UV.pack_into(the_buffer, start + 24, *primitive.attributes['TEXCOORD_1'].buffer_view[vidx * 2:vidx * 2 + 2])
-                    STRUCT_JOINT.pack_into(the_buffer, start + 28, *primitive.attributes['JOINTS_0'].buffer_view[vidx * 4:vidx * 4 + 4])
-                    if is_blend4:
-                        STRUCT_WEIGHT4.pack_into(the_buffer, start + 36, *primitive.attributes['WEIGHTS_0'].buffer_view[vidx * 4:vidx * 4 + 4])
-                        STRUCT_COLOR_BLEND.pack_into(the_buffer, start + 44, *primitive.attributes['COLOR_0'].buffer_view[vidx * 4:vidx * 4 + 4])
-                    else:
-                        STRUCT_WEIGHT1.pack_into(the_buffer, start + 36, *primitive.attributes['WEIGHTS_0'].buffer_view[vidx * 1:vidx * 1 + 1])
-                        STRUCT_COLOR_BLEND.pack_into(the_buffer, start + 40, *primitive.attributes['COLOR_0'].buffer_view[vidx * 4:vidx * 4 + 4])
-
-
-                    # for attr in primitive.attributes:
-                    #     attr_accessor = primitive.attributes[attr]
-
-                    #     # elements_to_pull = self.component_nb_dict[attr_accessor.type]
-                    #     # data_for_vertex = attr_accessor.buffer_view[vidx:vidx + elements_to_pull]
-                    #     # binary_data = gltf2_io_binary_data.BinaryData.from_list(data_for_vertex, attr_accessor.component_type)
-                    #     # offset = blend_buffer_view.buffer.append_data(binary_data, False, vidx == 0)
-
-
-                    #     elements_to_pull = self.component_nb_dict[attr_accessor.type]
-                    #     chunk_byte_size = gltf2_io_constants.ComponentType.get_size(attr_accessor.component_type) * elements_to_pull
-                    #     start = vidx * chunk_byte_size
-                    #     end = start + chunk_byte_size
-                    #     data_for_vertex = attr_accessor.buffer_view.data[start:end]
-                    #     offset = blend_buffer_view.buffer.append_bytes(data_for_vertex, vidx == 0)
-
-
-
-                    #     if vidx == 0:
-                    #         attr_accessor.byte_offset = offset
-                    #         if attr_accessor.byte_offset == 0:
-                    #             attr_accessor.byte_offset = None
-                    #         # actual_byte_stride += binary_data.byte_length
-                    #         actual_byte_stride += len(data_for_vertex)
-                    # if vidx == 0:
-                    #     assert actual_byte_stride == expected_byte_stride
-
-                
-                blend_buffer_view.buffer.append_bytes(bytes(the_buffer), False)
+                vertices = primitive.attributes['POSITION'].buffer_view
+                if not isinstance(vertices, VertexData):
+                    vertices = self.__interleave_vertices('BLEND4' if is_blend4 else 'BLEND1', primitive.attributes)
+                self.__append_interleaved_vertices(blend_buffer_view, primitive.attributes, vertices)
 
                 for attr in primitive.attributes:
-                    primitive.attributes[attr].buffer_view = self.__gltf.buffer_views.index(blend_buffer_view)
+                    primitive.attributes[attr].buffer_view = self.__to_reference(blend_buffer_view)
                     primitive.attributes[attr].name = f'{mesh.name}_vertices#0_{attr}'
                 
                 for attr in primitive.attributes:
                     primitive.attributes[attr] = self.__to_reference(primitive.attributes[attr])
                 indices_accessor = primitive.indices
-                binary_data = gltf2_io_binary_data.BinaryData.from_list(indices_accessor.buffer_view, indices_accessor.component_type)
+                binary_data = gltf2_io_binary_data.BinaryData.from_array(indices_accessor.buffer_view, indices_accessor.component_type)
                 offset = self.__asobo_buffer_views['BufferViewIndex'].buffer.append_data(binary_data, True, True)
-                indices_accessor.buffer_view = self.__gltf.buffer_views.index(self.__asobo_buffer_views['BufferViewIndex'])
+                indices_accessor.buffer_view = self.__to_reference(self.__asobo_buffer_views['BufferViewIndex'])
                 indices_accessor.byte_offset = offset
                 if indices_accessor.byte_offset == 0:
                     indices_accessor.byte_offset = None
@@ -569,81 +500,26 @@ class GlTF2Exporter:
         else:
             print(f'__handle_mesh unskinned {mesh.name}')
             # Accessors are shared between the primitives
-            all_indices = []
-            for primitive in mesh.primitives:
-                all_indices.extend(primitive.indices.buffer_view)
+            all_indices = np.concatenate([primitive.indices.buffer_view for primitive in mesh.primitives])
             first_primitive = mesh.primitives[0]
             indices_accessor = first_primitive.indices
-            binary_data = gltf2_io_binary_data.BinaryData.from_list(all_indices, indices_accessor.component_type)
+            binary_data = gltf2_io_binary_data.BinaryData.from_array(all_indices, indices_accessor.component_type)
             offset = self.__asobo_buffer_views['BufferViewIndex'].buffer.append_data(binary_data, True, True)
-            indices_accessor.buffer_view = self.__gltf.buffer_views.index(self.__asobo_buffer_views['BufferViewIndex'])
+            indices_accessor.buffer_view = self.__to_reference(self.__asobo_buffer_views['BufferViewIndex'])
             indices_accessor.byte_offset = offset
             if indices_accessor.byte_offset == 0:
                 indices_accessor.byte_offset = None
             indices_accessor.count = len(all_indices)
             indices_accessor.name = f'{mesh.name}_indices#{len(mesh.primitives) - 1}'
             vertex_nd_buffer_view = self.__asobo_buffer_views['BufferViewVertexND']
-            expected_byte_stride = 36
-
-            the_buffer = ctypes.create_string_buffer(expected_byte_stride * first_primitive.attributes['POSITION'].count)
-
-            # for attr in first_primitive.attributes:
-            #     attr_accessor = first_primitive.attributes[attr]
-            #     attr_accessor.buffer_view = gltf2_io_binary_data.BinaryData.from_list(attr_accessor.buffer_view, attr_accessor.component_type)
-            
-            offset = vertex_nd_buffer_view.buffer.byte_length
-            
-            if offset + 0 == 0:
-                first_primitive.attributes['POSITION'].byte_offset = None
-            else:
-                first_primitive.attributes['POSITION'].byte_offset = offset + 0
-            first_primitive.attributes['TANGENT'].byte_offset = offset + 12
-            first_primitive.attributes['NORMAL'].byte_offset = offset + 16
-            first_primitive.attributes['TEXCOORD_0'].byte_offset = offset + 20
-            first_primitive.attributes['TEXCOORD_1'].byte_offset = offset + 24
-            first_primitive.attributes['COLOR_0'].byte_offset = offset + 28
-
-            # actual_byte_stride = 0
-            for vidx in range(first_primitive.attributes['POSITION'].count):
-                
-                start = vidx * expected_byte_stride
-                
-                STRUCT_POSITION.pack_into(the_buffer, start, *first_primitive.attributes['POSITION'].buffer_view[vidx * 3:vidx * 3 + 3])
-                STRUCT_TANGENT.pack_into(the_buffer, start + 12, *first_primitive.attributes['TANGENT'].buffer_view[vidx * 4:vidx * 4 + 4])
-                STRUCT_NORMAL.pack_into(the_buffer, start + 16, *first_primitive.attributes['NORMAL'].buffer_view[vidx * 4:vidx * 4 + 4])
-                STRUCT_UV.pack_into(the_buffer, start + 20, *first_primitive.attributes['TEXCOORD_0'].buffer_view[vidx * 2:vidx * 2 + 2])
-                STRUCT_UV.pack_into(the_buffer, start + 24, *first_primitive.attributes['TEXCOORD_1'].buffer_view[vidx * 2:vidx * 2 + 2])
-                STRUCT_COLOR_VTX.pack_into(the_buffer, start + 28, *first_primitive.attributes['COLOR_0'].buffer_view[vidx * 4:vidx * 4 + 4])
-
-
-                # for attr in first_primitive.attributes:
-                #     attr_accessor = first_primitive.attributes[attr]
-
-                #     # elements_to_pull = self.component_nb_dict[attr_accessor.type]
-                #     data_for_vertex = attr_accessor.buffer_view[vidx:vidx + elements_to_pull]
-                #     # binary_data = gltf2_io_binary_data.BinaryData.from_list(data_for_vertex, attr_accessor.component_type)
-                #     # offset = vertex_nd_buffer_view.buffer.append_data(binary_data, False, vidx == 0)
-
-                #     elements_to_pull = self.component_nb_dict[attr_accessor.type]
-                #     chunk_byte_size = gltf2_io_constants.ComponentType.get_size(attr_accessor.component_type) * elements_to_pull
-                #     start = vidx * chunk_byte_size
-                    # end = start + chunk_byte_size
-                    # data_for_vertex = attr_accessor.buffer_view.data[start:end]
-                    # offset = vertex_nd_buffer_view.buffer.append_bytes(data_for_vertex, vidx == 0)
-
-                #     if vidx == 0:
-                #         attr_accessor.byte_offset = offset
-                #         if attr_accessor.byte_offset == 0:
-                #             attr_accessor.byte_offset = None
-                #         # actual_byte_stride += binary_data.byte_length
-                #         actual_byte_stride += len(data_for_vertex)
-                # if vidx == 0:
-                #     assert actual_byte_stride == expected_byte_stride
-            
-            vertex_nd_buffer_view.buffer.append_bytes(bytes(the_buffer), False)
+
+            vertices = first_primitive.attributes['POSITION'].buffer_view
+            if not isinstance(vertices, VertexData):
+                vertices = self.__interleave_vertices('VTX', first_primitive.attributes)
+            self.__append_interleaved_vertices(vertex_nd_buffer_view, first_primitive.attributes, vertices)
 
             for attr in first_primitive.attributes:
-                first_primitive.attributes[attr].buffer_view = self.__gltf.buffer_views.index(vertex_nd_buffer_view)
+                first_primitive.attributes[attr].buffer_view = self.__to_reference(vertex_nd_buffer_view)
                 first_primitive.attributes[attr].name = f'{mesh.name}_vertices#0_{attr}'
 
             total_asobo_primitive_count = 0
@@ -659,6 +535,27 @@ class GlTF2Exporter:
         idx = self.__to_reference(mesh)
         return idx
     
+    @staticmethod
+    def __interleave_vertices(vertex_type, attributes):
+        """Interleave the attribute lists of a primitive in the layout of an Asobo vertex buffer view."""
+        vertices = VertexData(vertex_type)
+        data = np.empty(attributes['POSITION'].count, dtype=vertices.dtype)
+        for attr in vertices.dtype.names:
+            data[attr] = np.asarray(attributes[attr].buffer_view).reshape(data[attr].shape)
+        vertices.append(data)
+        return vertices
+
+    @staticmethod
+    def __append_interleaved_vertices(buffer_view, attributes, vertices: VertexData):
+        """Write interleaved vertices in a vertex buffer view, and set the byte offsets of their accessors."""
+        offset = buffer_view.buffer.byte_length
+        for attr in vertices.dtype.names:
+            attributes[attr].byte_offset = offset + vertices.field_offset(attr)
+            if attributes[attr].byte_offset == 0:
+                attributes[attr].byte_offset = None
+        for chunk in vertices.chunks:
+            buffer_view.buffer.append_bytes(chunk, False)
+
     def __handle_anim_sampler(self, input_or_output):
         if input_or_output.type == 'SCALAR':
             animation_x_buffer_view = self.__asobo_buffer_views['bufferViewAnimationFloatScalar']
@@ -673,7 +570,7 @@ class GlTF2Exporter:
             input_or_output.byte_offset = animation_x_buffer_view.buffer.append_data(binary_data, True, True)
             if input_or_output.byte_offset == 0:
                 input_or_output.byte_offset = None
-            input_or_output.buffer_view = self.__gltf.buffer_views.index(animation_x_buffer_view)
+            input_or_output.buffer_view = self.__to_reference(animation_x_buffer_view)
         return self.__to_reference(input_or_output)
 
     def __traverse(self, node):
@@ -683,89 +580,103 @@ class GlTF2Exporter:
         The tree is traversed downwards until a primitive is reached. Then any ChildOfRoot property
         is stored in the according list in the glTF and replaced with a index reference in the upper level.
         """
-        def __traverse_property(node):
-            for member_name in [a for a in dir(node) if not a.startswith('__') and not callable(getattr(node, a))]:
-                new_value = self.__traverse(getattr(node, member_name))
-                setattr(node, member_name, new_value)  # usually this is the same as before
-
-                # # TODO: maybe with extensions hooks we can find a more elegant solution
-                # if member_name == "extensions" and new_value is not None:
-                #     for extension_name in new_value.keys():
-                #         self.__append_unique_and_get_index(self.__gltf.extensions_used, extension_name)
-                #         self.__append_unique_and_get_index(self.__gltf.extensions_required, extension_name)
-            return node
-
-        if type(node) == gltf2_io.Mesh:
-            if type(node.primitives[0].indices) == int:
-                return self.__to_reference(node)
-            else:
-                return self.__handle_mesh(node)
-
-        if type(node) == gltf2_io.Skin:
-            float_mat4_buffer_view = self.__asobo_buffer_views['bufferViewFloatMat4']
-            if type(node.inverse_bind_matrices) != int:
-                if type(node.inverse_bind_matrices.buffer_view) != int: # this seems to work, but may be causing some other issues elsewhere. (issue was some skins had 0 as their buffer view, instead of having data)
-                    binary_data = node.inverse_bind_matrices.buffer_view
-                    node.inverse_bind_matrices.byte_offset = float_mat4_buffer_view.buffer.append_data(binary_data, True, True)
-                    if node.inverse_bind_matrices.byte_offset == 0:
-                        node.inverse_bind_matrices.byte_offset = None
-                    node.inverse_bind_matrices.buffer_view = self.__gltf.buffer_views.index(float_mat4_buffer_view)
-                    node.inverse_bind_matrices = self.__to_reference(node.inverse_bind_matrices)
-
-        if type(node) == gltf2_io.Animation:
-            for sampler in node.samplers:
-                sampler.input = self.__handle_anim_sampler(sampler.input)
-                sampler.output = self.__handle_anim_sampler(sampler.output)
-
+        traverse = self.__traverse_by_type.get(type(node))
+        if traverse is None:
+            traverse = self.__get_traverse(type(node))
+        return traverse(node)
+
+    def __get_traverse(self, node_type):
+        """Find the traversal of a type that is not a glTF property type, and remember it for the next nodes."""
+        for base_type, traverse in (
+                # traverse lists, such as children and replace them with indices
+                (list, self.__traverse_list),
+                (dict, self.__traverse_dict),
+                # binary data needs to be moved to a buffer and referenced with a buffer view
+                (gltf2_io_binary_data.BinaryData, self.__traverse_binary_data),
+                # image data needs to be saved to file
+                (gltf2_io_image_data.ImageData, self.__add_image),
+                (gltf2_io_extensions.Extension, self.__traverse_extension)):
+            if issubclass(node_type, base_type):
+                break
+        else:
+            # do nothing for any type that does not match a glTF schema (primitives)
+            traverse = self.__traverse_value
+        self.__traverse_by_type[node_type] = traverse
+        return traverse
+
+    def __traverse_mesh(self, node):
+        if type(node.primitives[0].indices) == int:
+            return self.__to_reference(node)
+        else:
+            return self.__handle_mesh(node)
+
+    def __traverse_skin(self, node):
+        float_mat4_buffer_view = self.__asobo_buffer_views['bufferViewFloatMat4']
+        if type(node.inverse_bind_matrices) != int:
+            if type(node.inverse_bind_matrices.buffer_view) != int: # this seems to work, but may be causing some other issues elsewhere. (issue was some skins had 0 as their buffer view, instead of having data)
+                binary_data = node.inverse_bind_matrices.buffer_view
+                node.inverse_bind_matrices.byte_offset = float_mat4_buffer_view.buffer.append_data(binary_data, True, True)
+                if node.inverse_bind_matrices.byte_offset == 0:
+                    node.inverse_bind_matrices.byte_offset = None
+                node.inverse_bind_matrices.buffer_view = self.__to_reference(float_mat4_buffer_view)
+                node.inverse_bind_matrices = self.__to_reference(node.inverse_bind_matrices)
+        return self.__traverse_child_of_root(node)
+
+    def __traverse_animation(self, node):
+        for sampler in node.samplers:
+            sampler.input = self.__handle_anim_sampler(sampler.input)
+            sampler.output = self.__handle_anim_sampler(sampler.output)
+        return self.__traverse_child_of_root(node)
+
+    def __traverse_child_of_root(self, node):
         # traverse nodes of a child of root property type and add them to the glTF root
-        if type(node) in self.__childOfRootPropertyTypeLookup:
-            node = __traverse_property(node)
-            idx = self.__to_reference(node)
-            # child of root properties are only present at root level --> replace with index in upper level
+        node = self.__traverse_property(node)
+        # child of root properties are only present at root level --> replace with index in upper level
+        return self.__to_reference(node)
+
+    def __traverse_property(self, node):
+        for member_name in node._fields:
+            new_value = self.__traverse(getattr(node, member_name))
+            setattr(node, member_name, new_value)  # usually this is the same as before
+
+            # # TODO: maybe with extensions hooks we can find a more elegant solution
+            # if member_name == "extensions" and new_value is not None:
+            #     for extension_name in new_value.keys():
+            #         self.__append_unique_and_get_index(self.__gltf.extensions_used, extension_name)
+            #         self.__append_unique_and_get_index(self.__gltf.extensions_required, extension_name)
+        return node
+
+    def __traverse_list(self, node):
+        for i in range(len(node)):
+            node[i] = self.__traverse(node[i])
+        return node
+
+    def __traverse_dict(self, node):
+        for key in node.keys():
+            node[key] = self.__traverse(node[key])
+        return node
+
+    def __traverse_binary_data(self, node):
+        buffer_view = self.__buffer.add_and_get_view(node)
+        return self.__to_reference(buffer_view)
+
+    def __traverse_extension(self, node):
+        extension = self.__traverse(node.extension)
+        self.__append_unique_and_get_index(self.__gltf.extensions_used, node.name)
+        if node.required:
+            self.__append_unique_and_get_index(self.__gltf.extensions_required, node.name)
+
+        # extensions that lie in the root of the glTF.
+        # They need to be converted to a reference at place of occurrence
+        if isinstance(node, gltf2_io_extensions.ChildOfRootExtension):
+            root_extension_list = self.__get_key_path(self.__gltf.extensions, [node.name] + node.path, [])
+            idx = self.__append_unique_and_get_index(root_extension_list, extension)
             return idx
 
-        # traverse lists, such as children and replace them with indices
-        if isinstance(node, list):
-            for i in range(len(node)):
-                node[i] = self.__traverse(node[i])
-            return node
-
-        if isinstance(node, dict):
-            for key in node.keys():
-                node[key] = self.__traverse(node[key])
-            return node
-
-        # traverse into any other property
-        if type(node) in self.__propertyTypeLookup:
-            return __traverse_property(node)
-
-        # binary data needs to be moved to a buffer and referenced with a buffer view
-        if isinstance(node, gltf2_io_binary_data.BinaryData):
-            buffer_view = self.__buffer.add_and_get_view(node)
-            return self.__to_reference(buffer_view)
-
-        # image data needs to be saved to file
-        if isinstance(node, gltf2_io_image_data.ImageData):
-            image = self.__add_image(node)
-            return image
-
-        # extensions
-        if isinstance(node, gltf2_io_extensions.Extension):
-            extension = self.__traverse(node.extension)
-            self.__append_unique_and_get_index(self.__gltf.extensions_used, node.name)
-            if node.required:
-                self.__append_unique_and_get_index(self.__gltf.extensions_required, node.name)
-
-            # extensions that lie in the root of the glTF.
-            # They need to be converted to a reference at place of occurrence
-            if isinstance(node, gltf2_io_extensions.ChildOfRootExtension):
-                root_extension_list = self.__get_key_path(self.__gltf.extensions, [node.name] + node.path, [])
-                idx = self.__append_unique_and_get_index(root_extension_list, extension)
-                return idx
-
-            return extension
-
-        # do nothing for any type that does not match a glTF schema (primitives)
+        return extension
+
+    @staticmethod
+    def __traverse_value(node):
         return node
 
 def _path_to_uri(path):
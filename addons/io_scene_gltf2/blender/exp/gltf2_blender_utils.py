@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import math
+import numpy as np
 from io_scene_gltf2.io.com import gltf2_io_constants
 
 
@@ -33,35 +33,34 @@ def split_list_by_data_type(l: list, data_type: gltf2_io_constants.DataType):
     return [l[i:i + num_elements] for i in range(0, len(l), num_elements)]
 
 
-def max_components(l: list, data_type: gltf2_io_constants.DataType) -> list:
+def max_components(l, data_type: gltf2_io_constants.DataType) -> list:
     """
     Find the maximum components in a flat list.
 
     This is required, for example, for the glTF2.0 accessor min and max properties
-    :param l: the flat list of components
+    :param l: the flat list of components, as a list, an array.array or a NumPy array
     :param data_type: the data type of the list (determines the length of the result)
-    :return: a list with length num_elements(data_type) containing the maximum per component along the list
+    :return: a list of floats with length num_elements(data_type) containing the maximum per component along the list
     """
-    components_lists = split_list_by_data_type(l, data_type)
-    result = [-math.inf] * gltf2_io_constants.DataType.num_elements(data_type)
-    for components in components_lists:
-        for i, c in enumerate(components):
-            result[i] = max(result[i], c)
-    return result
+    return __components(l, data_type).max(axis=0).astype(np.float64).tolist()
 
 
-def min_components(l: list, data_type: gltf2_io_constants.DataType) -> list:
+def min_components(l, data_type: gltf2_io_constants.DataType) -> list:
     """
     Find the minimum components in a flat list.
 
     This is required, for example, for the glTF2.0 accessor min and max properties
-    :param l: the flat list of components
+    :param l: the flat list of components, as a list, an array.array or a NumPy array
     :param data_type: the data type of the list (determines the length of the result)
-    :return: a list with length num_elements(data_type) containing the minimum per component along the list
+    :return: a list of floats with length num_elements(data_type) containing the minimum per component along the list
     """
-    components_lists = split_list_by_data_type(l, data_type)
-    result = [math.inf] * gltf2_io_constants.DataType.num_elements(data_type)
-    for components in components_lists:
-        for i, c in enumerate(components):
-            result[i] = min(result[i], c)
-    return result
+    return __components(l, data_type).min(axis=0).astype(np.float64).tolist()
+
+
+def __components(l, data_type: gltf2_io_constants.DataType) -> np.ndarray:
+    """View a flat list of components as an array with one row per element."""
+    num_elements = gltf2_io_constants.DataType.num_elements(data_type)
+    components = np.asarray(l)
+    if components.size == 0 or components.size % num_elements != 0:
+        raise ValueError("List length does not match specified data type")
+    return components.reshape(-1, num_elements)
@@ -17,6 +17,7 @@ from mathutils import Vector, Matrix
 import numpy as np
 
 from ...io.imp.gltf2_io_binary import BinaryData
+from ...io.com.gltf2_io_color_management import colors_linear_to_srgb
 from ..com.gltf2_blender_extras import set_extras
 from .gltf2_blender_material import BlenderMaterial
 
@@ -151,7 +152,7 @@ def do_primitives(gltf, mesh_idx, skin_idx, mesh, ob):
         if start_index is None:
             start_index = 0
 
-        indices = list(map(lambda x: x + base_vertex_index, indices[start_index:(start_index + (tri_count * 3))]))
+        indices = list(map(lambda x: int(x) + base_vertex_index, indices[start_index:(start_index + (tri_count * 3))]))
 
         mode = 4 if prim.mode is None else prim.mode
         points, edges, tris = points_edges_tris(mode, indices)
@@ -493,15 +494,6 @@ def colors_rgb_to_rgba(rgb):
     return rgba
 
 
-def colors_linear_to_srgb(color):
-    assert color.shape[1] == 3  # only change RGB, not A
-
-    not_small = color >= 0.0031308
-    small_result = np.where(color < 0.0, 0.0, color * 12.92)
-    large_result = 1.055 * np.power(color, 1.0 / 2.4, where=not_small) - 0.055
-    color[:] = np.where(not_small, large_result, small_result)
-
-
 def locs_yup_to_zup(vecs):
     # x,y,z -> x,-z,y
     vecs[:, [1,2]] = vecs[:, [2,1]]
@@ -16,7 +16,9 @@
 # command used:
 # quicktype --src glTF.schema.json --src-lang schema -t gltf --lang python --python-version 3.5
 
-# TODO: add __slots__ to all classes by extending the generator
+# NOTE: each class lists its fields, in alphabetical order, in a _fields tuple. The exporter visits them in that order.
+# Classes have __slots__ made of these fields, plus the Blender side data that the importer and exporter attach to
+# some of them. Any other attribute has to be declared there too.
 
 # TODO: REMOVE traceback import
 
@@ -120,6 +122,9 @@ class AccessorSparseIndices:
     Indices of those attributes that deviate from their initialization value.
     """
 
+    _fields = ('buffer_view', 'byte_offset', 'component_type', 'extensions', 'extras')
+    __slots__ = _fields
+
     def __init__(self, buffer_view, byte_offset, component_type, extensions, extras):
         self.buffer_view = buffer_view
         self.byte_offset = byte_offset
@@ -158,6 +163,9 @@ class AccessorSparseValues:
     accessor attributes pointed by `accessor.sparse.indices`.
     """
 
+    _fields = ('buffer_view', 'byte_offset', 'extensions', 'extras')
+    __slots__ = _fields
+
     def __init__(self, buffer_view, byte_offset, extensions, extras):
         self.buffer_view = buffer_view
         self.byte_offset = byte_offset
@@ -187,6 +195,9 @@ class AccessorSparseValues:
 class AccessorSparse:
     """Sparse storage of attributes that deviate from their initialization value."""
 
+    _fields = ('count', 'extensions', 'extras', 'indices', 'values')
+    __slots__ = _fields
+
     def __init__(self, count, extensions, extras, indices, values):
         self.count = count
         self.extensions = extensions
@@ -222,6 +233,10 @@ class Accessor:
     WebGL's `vertexAttribPointer()` defines an attribute in a buffer.
     """
 
+    _fields = ('buffer_view', 'byte_offset', 'component_type', 'count', 'extensions', 'extras', 'max', 'min', 'name',
+               'normalized', 'sparse', 'type')
+    __slots__ = _fields
+
     def __init__(self, buffer_view, byte_offset, component_type, count, extensions, extras, max, min, name, normalized,
                  sparse, type):
         self.buffer_view = buffer_view
@@ -280,6 +295,9 @@ class AnimationChannelTarget:
     The index of the node and TRS property that an animation channel targets.
     """
 
+    _fields = ('extensions', 'extras', 'node', 'path')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, node, path):
         self.extensions = extensions
         self.extras = extras
@@ -309,6 +327,9 @@ class AnimationChannelTarget:
 class AnimationChannel:
     """Targets an animation's sampler at a node's property."""
 
+    _fields = ('extensions', 'extras', 'sampler', 'target')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, sampler, target):
         self.extensions = extensions
         self.extras = extras
@@ -340,6 +361,9 @@ class AnimationSampler:
     graph (but not its target).
     """
 
+    _fields = ('extensions', 'extras', 'input', 'interpolation', 'output')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, input, interpolation, output):
         self.extensions = extensions
         self.extras = extras
@@ -372,6 +396,9 @@ class AnimationSampler:
 class Animation:
     """A keyframe animation."""
 
+    _fields = ('channels', 'extensions', 'extras', 'name', 'samplers')
+    __slots__ = _fields + ('track_name',)
+
     def __init__(self, channels, extensions, extras, name, samplers):
         self.channels = channels
         self.extensions = extensions
@@ -404,6 +431,9 @@ class Animation:
 class Asset:
     """Metadata about the glTF asset."""
 
+    _fields = ('copyright', 'extensions', 'extras', 'generator', 'min_version', 'version')
+    __slots__ = _fields
+
     def __init__(self, copyright, extensions, extras, generator, min_version, version):
         self.copyright = copyright
         self.extensions = extensions
@@ -439,6 +469,9 @@ class Asset:
 class BufferView:
     """A view into a buffer generally representing a subset of the buffer."""
 
+    _fields = ('buffer', 'byte_length', 'byte_offset', 'byte_stride', 'extensions', 'extras', 'name', 'target')
+    __slots__ = _fields
+
     def __init__(self, buffer, byte_length, byte_offset, byte_stride, extensions, extras, name, target):
         self.buffer = buffer
         self.byte_length = byte_length
@@ -483,6 +516,9 @@ class BufferView:
 class Buffer:
     """A buffer points to binary geometry, animation, or skins."""
 
+    _fields = ('byte_length', 'extensions', 'extras', 'name', 'uri')
+    __slots__ = _fields
+
     def __init__(self, byte_length, extensions, extras, name, uri):
         self.byte_length = byte_length
         self.extensions = extensions
@@ -515,6 +551,9 @@ class Buffer:
 class CameraOrthographic:
     """An orthographic camera containing properties to create an orthographic projection matrix."""
 
+    _fields = ('extensions', 'extras', 'xmag', 'ymag', 'zfar', 'znear')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, xmag, ymag, zfar, znear):
         self.extensions = extensions
         self.extras = extras
@@ -550,6 +589,9 @@ class CameraOrthographic:
 class CameraPerspective:
     """A perspective camera containing properties to create a perspective projection matrix."""
 
+    _fields = ('aspect_ratio', 'extensions', 'extras', 'yfov', 'zfar', 'znear')
+    __slots__ = _fields
+
     def __init__(self, aspect_ratio, extensions, extras, yfov, zfar, znear):
         self.aspect_ratio = aspect_ratio
         self.extensions = extensions
@@ -587,6 +629,9 @@ class Camera:
     camera in the scene.
     """
 
+    _fields = ('extensions', 'extras', 'name', 'orthographic', 'perspective', 'type')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, name, orthographic, perspective, type):
         self.extensions = extensions
         self.extras = extras
@@ -624,6 +669,9 @@ class Image:
     index. `mimeType` is required in the latter case.
     """
 
+    _fields = ('buffer_view', 'extensions', 'extras', 'mime_type', 'name', 'uri')
+    __slots__ = _fields + ('blender_image_name',)
+
     def __init__(self, buffer_view, extensions, extras, mime_type, name, uri):
         self.buffer_view = buffer_view
         self.extensions = extensions
@@ -672,6 +720,9 @@ class TextureInfo:
     Reference to a texture.
     """
 
+    _fields = ('extensions', 'extras', 'index', 'tex_coord')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, index, tex_coord):
         self.extensions = extensions
         self.extras = extras
@@ -704,6 +755,9 @@ class MaterialNormalTextureInfoClass:
     Reference to a texture.
     """
 
+    _fields = ('extensions', 'extras', 'index', 'scale', 'tex_coord')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, index, scale, tex_coord):
         self.extensions = extensions
         self.extras = extras
@@ -739,6 +793,9 @@ class MaterialOcclusionTextureInfoClass:
     Reference to a texture.
     """
 
+    _fields = ('extensions', 'extras', 'index', 'strength', 'tex_coord')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, index, strength, tex_coord):
         self.extensions = extensions
         self.extras = extras
@@ -777,6 +834,10 @@ class MaterialPBRMetallicRoughness:
     from Physically-Based Rendering (PBR) methodology.
     """
 
+    _fields = ('base_color_factor', 'base_color_texture', 'extensions', 'extras', 'metallic_factor',
+               'metallic_roughness_texture', 'roughness_factor')
+    __slots__ = _fields
+
     def __init__(self, base_color_factor, base_color_texture, extensions, extras, metallic_factor,
                  metallic_roughness_texture, roughness_factor):
         self.base_color_factor = base_color_factor
@@ -819,6 +880,10 @@ class MaterialPBRMetallicRoughness:
 class Material:
     """The material appearance of a primitive."""
 
+    _fields = ('alpha_cutoff', 'alpha_mode', 'double_sided', 'emissive_factor', 'emissive_texture', 'extensions',
+               'extras', 'name', 'normal_texture', 'occlusion_texture', 'pbr_metallic_roughness')
+    __slots__ = _fields + ('blender_material',)
+
     def __init__(self, alpha_cutoff, alpha_mode, double_sided, emissive_factor, emissive_texture, extensions, extras,
                  name, normal_texture, occlusion_texture, pbr_metallic_roughness):
         self.alpha_cutoff = alpha_cutoff
@@ -876,6 +941,9 @@ class Material:
 class MeshPrimitive:
     """Geometry to be rendered with the given material."""
 
+    _fields = ('attributes', 'extensions', 'extras', 'indices', 'material', 'mode', 'targets')
+    __slots__ = _fields + ('num_faces',)
+
     def __init__(self, attributes, extensions, extras, indices, material, mode, targets):
         self.attributes = attributes
         self.extensions = extensions
@@ -917,6 +985,9 @@ class Mesh:
     places the mesh in the scene.
     """
 
+    _fields = ('extensions', 'extras', 'name', 'primitives', 'weights')
+    __slots__ = _fields + ('blender_name', 'shapekey_names')
+
     def __init__(self, extensions, extras, name, primitives, weights):
         self.extensions = extensions
         self.extras = extras
@@ -957,6 +1028,11 @@ class Node:
     may be present; `matrix` will not be present.
     """
 
+    _fields = ('camera', 'children', 'extensions', 'extras', 'matrix', 'mesh', 'name', 'rotation', 'scale', 'skin',
+               'translation', 'weights')
+    __slots__ = _fields + ('animations', 'blender_data', 'original_solo_track',
+                           'original_use_nla', 'temp_nla_track', 'weight_animation')
+
     def __init__(self, camera, children, extensions, extras, matrix, mesh, name, rotation, scale, skin, translation,
                  weights):
         self.camera = camera
@@ -1012,6 +1088,9 @@ class Node:
 class Sampler:
     """Texture sampler properties for filtering and wrapping modes."""
 
+    _fields = ('extensions', 'extras', 'mag_filter', 'min_filter', 'name', 'wrap_s', 'wrap_t')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, mag_filter, min_filter, name, wrap_s, wrap_t):
         self.extensions = extensions
         self.extras = extras
@@ -1050,6 +1129,9 @@ class Sampler:
 class Scene:
     """The root nodes of a scene."""
 
+    _fields = ('extensions', 'extras', 'name', 'nodes')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, name, nodes):
         self.extensions = extensions
         self.extras = extras
@@ -1079,6 +1161,9 @@ class Scene:
 class Skin:
     """Joints and matrices defining a skin."""
 
+    _fields = ('extensions', 'extras', 'inverse_bind_matrices', 'joints', 'name', 'skeleton')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, inverse_bind_matrices, joints, name, skeleton):
         self.extensions = extensions
         self.extras = extras
@@ -1114,6 +1199,9 @@ class Skin:
 class Texture_Source:
     """A texture and its sampler."""
 
+    _fields = ('source',)
+    __slots__ = _fields
+
     def __init__(self, source):
         self.source = source
 
@@ -1132,6 +1220,9 @@ class Texture_Source:
 class Texture:
     """A texture and its sampler."""
 
+    _fields = ('extensions', 'extras', 'name', 'sampler', 'source', 'texture')
+    __slots__ = _fields
+
     def __init__(self, extensions, extras, name, sampler, source, texture=''):
         self.extensions = extensions
         self.extras = extras
@@ -1180,6 +1271,11 @@ class Texture:
 class Gltf:
     """The root object for a glTF asset."""
 
+    _fields = ('accessors', 'animations', 'asset', 'buffer_views', 'buffers', 'cameras', 'extensions',
+               'extensions_required', 'extensions_used', 'extras', 'images', 'materials', 'meshes', 'nodes', 'samplers',
+               'scene', 'scenes', 'skins', 'textures')
+    __slots__ = _fields
+
     def __init__(self, accessors, animations, asset, buffers, buffer_views, cameras, extensions, extensions_required,
                  extensions_used, extras, images, materials, meshes, nodes, samplers, scene, scenes, skins, textures):
         self.accessors = accessors
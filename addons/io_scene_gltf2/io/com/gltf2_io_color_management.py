@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
+
 
 def color_srgb_to_scene_linear(c):
     """
@@ -34,3 +36,31 @@ def color_linear_to_srgb(c):
         return 0.0 if c < 0.0 else c * 12.92
     else:
         return 1.055 * c ** (1.0 / 2.4) - 0.055
+
+
+def colors_srgb_to_scene_linear(color):
+    """
+    Convert an array of colors from sRGB to scene linear color space, in place.
+
+    Array version of color_srgb_to_scene_linear.
+    """
+    assert color.shape[-1] == 3  # only change RGB, not A
+
+    not_small = color >= 0.04045
+    small_result = np.where(color < 0.0, 0.0, color * (1.0 / 12.92))
+    large_result = np.power((color + 0.055) * (1.0 / 1.055), 2.4, where=not_small, out=np.zeros_like(color))
+    color[:] = np.where(not_small, large_result, small_result)
+
+
+def colors_linear_to_srgb(color):
+    """
+    Convert an array of colors from linear to sRGB color space, in place.
+
+    Array version of color_linear_to_srgb.
+    """
+    assert color.shape[-1] == 3  # only change RGB, not A
+
+    not_small = color >= 0.0031308
+    small_result = np.where(color < 0.0, 0.0, color * 12.92)
+    large_result = 1.055 * np.power(color, 1.0 / 2.4, where=not_small, out=np.zeros_like(color)) - 0.055
+    color[:] = np.where(not_small, large_result, small_result)
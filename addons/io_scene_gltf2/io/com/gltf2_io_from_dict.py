@@ -0,0 +1,446 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+#
+# Fast conversion of a parsed glTF JSON document to the gltf2_io classes.
+#
+# The from_dict methods of gltf2_io go through from_union, which relies on assertions and exceptions for every
+# optional property. Here each property is described once in a schema table, written by hand with the same types
+# as these methods, and values are type checked directly. The table is checked against the _fields of the gltf2_io
+# classes when this module is imported, so a property added to gltf2_io cannot be silently dropped on import.
+# Validation errors are only recorded while converting, and reported all together at the end. Trusted input, such as
+# files written by this addon, skips validation completely.
+#
+
+from io_scene_gltf2.io.com import gltf2_io
+
+# Number of validation errors listed in the error message
+MAX_REPORTED_ERRORS = 10
+
+
+def gltf_from_dict(obj, trusted=False) -> gltf2_io.Gltf:
+    """
+    Convert a parsed glTF JSON document to a gltf2_io.Gltf.
+
+    Raises a ValueError listing the validation errors, unless trusted is set. Trusted input is neither validated nor
+    converted, numbers are kept as parsed.
+    """
+    if trusted:
+        return _from_dict(gltf2_io.Gltf, obj, None, None)
+
+    errors = []
+    if not isinstance(obj, dict):
+        _add_error(errors, None, None, 'an object', obj)
+        gltf = None
+    else:
+        gltf = _from_dict(gltf2_io.Gltf, obj, None, errors)
+    if errors:
+        raise ValueError(_format_errors(errors))
+    return gltf
+
+
+def _from_dict(cls, obj, path, errors):
+    """Convert a JSON object to an instance of a gltf2_io class. Validation errors are added to errors, if not None."""
+    values = {}
+    if errors is None:
+        for key, name, kind, required in _SCHEMA[cls]:
+            value = obj.get(key)
+            if value is not None and kind.nested:
+                value = kind.trust(value)
+            values[name] = value
+    else:
+        for key, name, kind, required in _SCHEMA[cls]:
+            value = obj.get(key)
+            if value is not None:
+                value = kind.check(value, path, key, errors)
+            elif required:
+                errors.append((path, key, 'missing required property'))
+            values[name] = value
+
+    if cls is gltf2_io.Texture:
+        return _texture(values, obj, path, errors)
+    return cls(**values)
+
+
+def _texture(values, obj, path, errors):
+    # The msfs gltf texture objects don't have a root source prop, it is in their MSFT_texture_dds extension
+    extensions = values['extensions']
+    if extensions:  # not every texture is DDS
+        source_path, source_obj = ((path, 'extensions'), 'MSFT_texture_dds'), extensions.get('MSFT_texture_dds')
+        if not isinstance(source_obj, dict):
+            if errors is not None:
+                _add_error(errors, *source_path, 'an object', source_obj)
+            source_obj = {}
+    else:
+        source_path, source_obj = path, obj
+
+    source = source_obj.get('source')
+    if errors is not None:
+        if source is None:
+            errors.append((source_path, 'source', 'missing required property'))
+        else:
+            source = _INT.check(source, source_path, 'source', errors)
+    return gltf2_io.Texture(texture=gltf2_io.Texture_Source(source), source=source, **values)
+
+
+def _add_error(errors, path, key, expected, value):
+    errors.append((path, key, 'expected {}, got {}'.format(expected, type(value).__name__)))
+
+
+def _format_path(path, key):
+    keys = [key]
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    return ''.join('[{}]'.format(k) if isinstance(k, int) else '.' + k for k in reversed(keys) if k is not None)
+
+
+def _format_errors(errors):
+    lines = ['Invalid glTF: ' + str(len(errors)) + ' validation error(s)']
+    for path, key, message in errors[:MAX_REPORTED_ERRORS]:
+        lines.append('  ' + (_format_path(path, key).lstrip('.') or 'root') + ': ' + message)
+    if len(errors) > MAX_REPORTED_ERRORS:
+        lines.append('  ...')
+    return '\n'.join(lines)
+
+
+#
+# Property types. check() validates and converts a value, trust() only converts the nested gltf2_io objects.
+#
+
+class _Int:
+    nested = False
+
+    @staticmethod
+    def check(value, path, key, errors):
+        if type(value) is not int:
+            _add_error(errors, path, key, 'an integer', value)
+        return value
+
+
+class _Float:
+    nested = False
+
+    @staticmethod
+    def check(value, path, key, errors):
+        if type(value) is float:
+            return value
+        if type(value) is int:
+            return float(value)
+        _add_error(errors, path, key, 'a number', value)
+        return value
+
+
+class _Str:
+    nested = False
+
+    @staticmethod
+    def check(value, path, key, errors):
+        if type(value) is not str:
+            _add_error(errors, path, key, 'a string', value)
+        return value
+
+
+class _Bool:
+    nested = False
+
+    @staticmethod
+    def check(value, path, key, errors):
+        if type(value) is not bool:
+            _add_error(errors, path, key, 'a boolean', value)
+        return value
+
+
+class _Any:
+    nested = False
+
+    @staticmethod
+    def check(value, path, key, errors):
+        return value
+
+
+class _List:
+    def __init__(self, item):
+        self.item = item
+        self.nested = item.nested
+
+    def check(self, value, path, key, errors):
+        if type(value) is not list:
+            _add_error(errors, path, key, 'an array', value)
+            return value
+        path = (path, key)
+        check = self.item.check
+        return [check(item, path, i, errors) for i, item in enumerate(value)]
+
+    def trust(self, value):
+        trust = self.item.trust
+        return [trust(item) for item in value]
+
+
+class _Dict:
+    def __init__(self, item):
+        self.item = item
+        self.nested = item.nested
+
+    def check(self, value, path, key, errors):
+        if type(value) is not dict:
+            _add_error(errors, path, key, 'an object', value)
+            return value
+        path = (path, key)
+        check = self.item.check
+        return {k: check(v, path, k, errors) for k, v in value.items()}
+
+    def trust(self, value):
+        trust = self.item.trust
+        return {k: trust(v) for k, v in value.items()}
+
+
+class _Object:
+    nested = True
+
+    def __init__(self, cls):
+        self.cls = cls
+
+    def check(self, value, path, key, errors):
+        if type(value) is not dict:
+            _add_error(errors, path, key, 'an object', value)
+            return None
+        return _from_dict(self.cls, value, (path, key), errors)
+
+    def trust(self, value):
+        return _from_dict(self.cls, value, None, None)
+
+
+_INT = _Int()
+_FLOAT = _Float()
+_STR = _Str()
+_BOOL = _Bool()
+_ANY = _Any()
+_EXTENSIONS = _Dict(_Dict(_ANY))
+
+
+#
+# Properties of each class: JSON key, attribute name, type, and whether it is required
+#
+
+_COMMON = (
+    ('extensions', 'extensions', _EXTENSIONS, False),
+    ('extras', 'extras', _ANY, False),
+)
+
+_SCHEMA = {
+    gltf2_io.AccessorSparseIndices: _COMMON + (
+        ('bufferView', 'buffer_view', _INT, True),
+        ('byteOffset', 'byte_offset', _INT, False),
+        ('componentType', 'component_type', _INT, True),
+    ),
+    gltf2_io.AccessorSparseValues: _COMMON + (
+        ('bufferView', 'buffer_view', _INT, True),
+        ('byteOffset', 'byte_offset', _INT, False),
+    ),
+    gltf2_io.AccessorSparse: _COMMON + (
+        ('count', 'count', _INT, True),
+        ('indices', 'indices', _Object(gltf2_io.AccessorSparseIndices), True),
+        ('values', 'values', _Object(gltf2_io.AccessorSparseValues), True),
+    ),
+    gltf2_io.Accessor: _COMMON + (
+        ('bufferView', 'buffer_view', _INT, False),
+        ('byteOffset', 'byte_offset', _INT, False),
+        ('componentType', 'component_type', _INT, True),
+        ('count', 'count', _INT, True),
+        ('max', 'max', _List(_FLOAT), False),
+        ('min', 'min', _List(_FLOAT), False),
+        ('name', 'name', _STR, False),
+        ('normalized', 'normalized', _BOOL, False),
+        ('sparse', 'sparse', _Object(gltf2_io.AccessorSparse), False),
+        ('type', 'type', _STR, True),
+    ),
+    gltf2_io.AnimationChannelTarget: _COMMON + (
+        ('node', 'node', _INT, False),
+        ('path', 'path', _STR, True),
+    ),
+    gltf2_io.AnimationChannel: _COMMON + (
+        ('sampler', 'sampler', _INT, True),
+        ('target', 'target', _Object(gltf2_io.AnimationChannelTarget), True),
+    ),
+    gltf2_io.AnimationSampler: _COMMON + (
+        ('input', 'input', _INT, True),
+        ('interpolation', 'interpolation', _STR, False),
+        ('output', 'output', _INT, True),
+    ),
+    gltf2_io.Animation: _COMMON + (
+        ('channels', 'channels', _List(_Object(gltf2_io.AnimationChannel)), True),
+        ('name', 'name', _STR, False),
+        ('samplers', 'samplers', _List(_Object(gltf2_io.AnimationSampler)), True),
+    ),
+    gltf2_io.Asset: _COMMON + (
+        ('copyright', 'copyright', _STR, False),
+        ('generator', 'generator', _STR, False),
+        ('minVersion', 'min_version', _STR, False),
+        ('version', 'version', _STR, True),
+    ),
+    gltf2_io.BufferView: _COMMON + (
+        ('buffer', 'buffer', _INT, True),
+        ('byteLength', 'byte_length', _INT, True),
+        ('byteOffset', 'byte_offset', _INT, False),
+        ('byteStride', 'byte_stride', _INT, False),
+        ('name', 'name', _STR, False),
+        ('target', 'target', _INT, False),
+    ),
+    gltf2_io.Buffer: _COMMON + (
+        ('byteLength', 'byte_length', _INT, True),
+        ('name', 'name', _STR, False),
+        ('uri', 'uri', _STR, False),
+    ),
+    gltf2_io.CameraOrthographic: _COMMON + (
+        ('xmag', 'xmag', _FLOAT, True),
+        ('ymag', 'ymag', _FLOAT, True),
+        ('zfar', 'zfar', _FLOAT, True),
+        ('znear', 'znear', _FLOAT, True),
+    ),
+    gltf2_io.CameraPerspective: _COMMON + (
+        ('aspectRatio', 'aspect_ratio', _FLOAT, False),
+        ('yfov', 'yfov', _FLOAT, True),
+        ('zfar', 'zfar', _FLOAT, False),
+        ('znear', 'znear', _FLOAT, True),
+    ),
+    gltf2_io.Camera: _COMMON + (
+        ('name', 'name', _STR, False),
+        ('orthographic', 'orthographic', _Object(gltf2_io.CameraOrthographic), False),
+        ('perspective', 'perspective', _Object(gltf2_io.CameraPerspective), False),
+        ('type', 'type', _STR, True),
+    ),
+    gltf2_io.Image: _COMMON + (
+        ('bufferView', 'buffer_view', _INT, False),
+        ('mimeType', 'mime_type', _STR, False),
+        ('name', 'name', _STR, False),
+        ('uri', 'uri', _STR, False),
+    ),
+    gltf2_io.TextureInfo: _COMMON + (
+        ('index', 'index', _INT, True),
+        ('texCoord', 'tex_coord', _INT, False),
+    ),
+    gltf2_io.MaterialNormalTextureInfoClass: _COMMON + (
+        ('index', 'index', _INT, True),
+        ('scale', 'scale', _FLOAT, False),
+        ('texCoord', 'tex_coord', _INT, False),
+    ),
+    gltf2_io.MaterialOcclusionTextureInfoClass: _COMMON + (
+        ('index', 'index', _INT, True),
+        ('strength', 'strength', _FLOAT, False),
+        ('texCoord', 'tex_coord', _INT, False),
+    ),
+    gltf2_io.MaterialPBRMetallicRoughness: _COMMON + (
+        ('baseColorFactor', 'base_color_factor', _List(_FLOAT), False),
+        ('baseColorTexture', 'base_color_texture', _Object(gltf2_io.TextureInfo), False),
+        ('metallicFactor', 'metallic_factor', _FLOAT, False),
+        ('metallicRoughnessTexture', 'metallic_roughness_texture', _Object(gltf2_io.TextureInfo), False),
+        ('roughnessFactor', 'roughness_factor', _FLOAT, False),
+    ),
+    gltf2_io.Material: _COMMON + (
+        ('alphaCutoff', 'alpha_cutoff', _FLOAT, False),
+        ('alphaMode', 'alpha_mode', _STR, False),
+        ('doubleSided', 'double_sided', _BOOL, False),
+        ('emissiveFactor', 'emissive_factor', _List(_FLOAT), False),
+        ('emissiveTexture', 'emissive_texture', _Object(gltf2_io.TextureInfo), False),
+        ('name', 'name', _STR, False),
+        ('normalTexture', 'normal_texture', _Object(gltf2_io.MaterialNormalTextureInfoClass), False),
+        ('occlusionTexture', 'occlusion_texture', _Object(gltf2_io.MaterialOcclusionTextureInfoClass), False),
+        ('pbrMetallicRoughness', 'pbr_metallic_roughness', _Object(gltf2_io.MaterialPBRMetallicRoughness), False),
+    ),
+    gltf2_io.MeshPrimitive: _COMMON + (
+        ('attributes', 'attributes', _Dict(_INT), True),
+        ('indices', 'indices', _INT, False),
+        ('material', 'material', _INT, False),
+        ('mode', 'mode', _INT, False),
+        ('targets', 'targets', _List(_Dict(_INT)), False),
+    ),
+    gltf2_io.Mesh: _COMMON + (
+        ('name', 'name', _STR, False),
+        ('primitives', 'primitives', _List(_Object(gltf2_io.MeshPrimitive)), True),
+        ('weights', 'weights', _List(_FLOAT), False),
+    ),
+    gltf2_io.Node: _COMMON + (
+        ('camera', 'camera', _INT, False),
+        ('children', 'children', _List(_INT), False),
+        ('matrix', 'matrix', _List(_FLOAT), False),
+        ('mesh', 'mesh', _INT, False),
+        ('name', 'name', _STR, False),
+        ('rotation', 'rotation', _List(_FLOAT), False),
+        ('scale', 'scale', _List(_FLOAT), False),
+        ('skin', 'skin', _INT, False),
+        ('translation', 'translation', _List(_FLOAT), False),
+        ('weights', 'weights', _List(_FLOAT), False),
+    ),
+    gltf2_io.Sampler: _COMMON + (
+        ('magFilter', 'mag_filter', _INT, False),
+        ('minFilter', 'min_filter', _INT, False),
+        ('name', 'name', _STR, False),
+        ('wrapS', 'wrap_s', _INT, False),
+        ('wrapT', 'wrap_t', _INT, False),
+    ),
+    gltf2_io.Scene: _COMMON + (
+        ('name', 'name', _STR, False),
+        ('nodes', 'nodes', _List(_INT), False),
+    ),
+    gltf2_io.Skin: _COMMON + (
+        ('inverseBindMatrices', 'inverse_bind_matrices', _INT, False),
+        ('joints', 'joints', _List(_INT), True),
+        ('name', 'name', _STR, False),
+        ('skeleton', 'skeleton', _INT, False),
+    ),
+    # source and texture are read by _texture
+    gltf2_io.Texture: _COMMON + (
+        ('name', 'name', _STR, False),
+        ('sampler', 'sampler', _INT, False),
+    ),
+    gltf2_io.Gltf: _COMMON + (
+        ('accessors', 'accessors', _List(_Object(gltf2_io.Accessor)), False),
+        ('animations', 'animations', _List(_Object(gltf2_io.Animation)), False),
+        ('asset', 'asset', _Object(gltf2_io.Asset), True),
+        ('buffers', 'buffers', _List(_Object(gltf2_io.Buffer)), False),
+        ('bufferViews', 'buffer_views', _List(_Object(gltf2_io.BufferView)), False),
+        ('cameras', 'cameras', _List(_Object(gltf2_io.Camera)), False),
+        ('extensionsRequired', 'extensions_required', _List(_STR), False),
+        ('extensionsUsed', 'extensions_used', _List(_STR), False),
+        ('images', 'images', _List(_Object(gltf2_io.Image)), False),
+        ('materials', 'materials', _List(_Object(gltf2_io.Material)), False),
+        ('meshes', 'meshes', _List(_Object(gltf2_io.Mesh)), False),
+        ('nodes', 'nodes', _List(_Object(gltf2_io.Node)), False),
+        ('samplers', 'samplers', _List(_Object(gltf2_io.Sampler)), False),
+        ('scene', 'scene', _INT, False),
+        ('scenes', 'scenes', _List(_Object(gltf2_io.Scene)), False),
+        ('skins', 'skins', _List(_Object(gltf2_io.Skin)), False),
+        ('textures', 'textures', _List(_Object(gltf2_io.Texture)), False),
+    ),
+}
+
+
+def _check_schema():
+    """Make sure the schema table describes every gltf2_io class, with exactly the fields of the class."""
+    for cls in vars(gltf2_io).values():
+        # Texture_Source is only built by _texture
+        if isinstance(cls, type) and hasattr(cls, '_fields') and cls not in _SCHEMA \
+                and cls is not gltf2_io.Texture_Source:
+            raise RuntimeError('No import schema for gltf2_io.' + cls.__name__)
+    for cls, properties in _SCHEMA.items():
+        names = {name for _, name, _, _ in properties}
+        if cls is gltf2_io.Texture:
+            names |= {'source', 'texture'}
+        if names != set(cls._fields):
+            raise RuntimeError('Import schema of gltf2_io.' + cls.__name__ + ' does not match its fields: ' +
+                               ', '.join(sorted(names.symmetric_difference(cls._fields))))
+
+
+_check_schema()
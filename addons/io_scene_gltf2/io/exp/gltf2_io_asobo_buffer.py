@@ -16,48 +16,81 @@ import base64
 
 from io_scene_gltf2.io.com import gltf2_io
 from io_scene_gltf2.io.exp import gltf2_io_binary_data
+from io_scene_gltf2.io.exp.gltf2_io_buffer import PADDING, SpillFile
 
 
 class AsoboBuffer:
-    def __init__(self, buffer_index=0):
-        self.__data = b""
+    """
+    Binary data of one of the predefined Asobo buffer views.
+
+    Data is kept as a list of chunks, joined once when the bytes of the buffer view are requested.
+    With spill set, data is instead written to a temporary file as soon as it is appended.
+    """
+
+    def __init__(self, buffer_index=0, spill=False):
+        self.__chunks = []
+        self.__byte_length = 0
         self.__buffer_index = buffer_index
+        self.__spill_file = SpillFile() if spill else None
 
-    def append_data(self, binary_data: gltf2_io_binary_data.BinaryData, check_padding, calculate_offset) -> gltf2_io.BufferView:
-        """Add binary data to the buffer. Return a glTF BufferView."""
+    def append_data(self, binary_data: gltf2_io_binary_data.BinaryData, check_padding, calculate_offset) -> int:
+        """Add binary data to the buffer. Return its offset, if requested."""
         offset = None
         if calculate_offset:
-            offset = len(self.__data)
+            offset = self.__byte_length
 
-        self.__data += binary_data.data
+        self.__append(binary_data.data)
 
         # offsets should be a multiple of 4 --> therefore add padding if necessary
         if check_padding:
-            padding = (4 - (binary_data.byte_length % 4)) % 4
-            if padding != 0:
-                self.__data += b"\x00" * padding
+            self.__append(PADDING[(4 - (binary_data.byte_length % 4)) % 4])
 
         return offset
 
-    def append_bytes(self, binary_data: bytes, calculate_offset) -> gltf2_io.BufferView:
-        """Add binary data to the buffer. Return a glTF BufferView."""
+    def append_bytes(self, binary_data: bytes, calculate_offset) -> int:
+        """Add binary data (any bytes-like object, kept without copy) to the buffer. Return its offset, if requested."""
         offset = None
         if calculate_offset:
-            offset = len(self.__data)
+            offset = self.__byte_length
 
-        self.__data += binary_data
+        self.__append(binary_data)
 
         return offset
 
+    def __append(self, data):
+        if not isinstance(data, bytes):
+            # lengths are counted in bytes, whatever the item size of the data
+            data = memoryview(data).cast('B')
+        if len(data) != 0:
+            if self.__spill_file is not None:
+                self.__spill_file.write(data)
+            else:
+                self.__chunks.append(data)
+            self.__byte_length += len(data)
+
     @property
     def byte_length(self):
-        return len(self.__data)
+        return self.__byte_length
 
     def to_bytes(self):
-        return self.__data
+        if self.__spill_file is not None:
+            return self.__spill_file.to_bytes()
+        if len(self.__chunks) != 1 or not isinstance(self.__chunks[0], bytes):
+            self.__chunks = [b"".join(self.__chunks)]
+        return self.__chunks[0]
+
+    def chunks(self) -> list:
+        """The data of the buffer view, as the list of the byte chunks it was appended with, or its spill file."""
+        if self.__spill_file is not None:
+            return [self.__spill_file]
+        return list(self.__chunks)
 
     def to_embed_string(self):
-        return 'data:application/octet-stream;base64,' + base64.b64encode(self.__data).decode('ascii')
+        return 'data:application/octet-stream;base64,' + base64.b64encode(self.to_bytes()).decode('ascii')
 
     def clear(self):
-        self.__data = b""
+        if self.__spill_file is not None:
+            self.__spill_file.close()
+            self.__spill_file = SpillFile()
+        self.__chunks = []
+        self.__byte_length = 0
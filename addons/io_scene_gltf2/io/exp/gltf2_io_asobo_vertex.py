@@ -0,0 +1,99 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import typing
+
+import numpy as np
+
+#
+# Interleaved vertex layouts of the Asobo vertex buffer views
+#
+
+VERTEX_DTYPES = {
+    # BufferViewVertexND, 36 bytes
+    'VTX': np.dtype([
+        ('POSITION', '<f4', 3),
+        ('TANGENT', 'i1', 4),
+        ('NORMAL', 'i1', 4),
+        ('TEXCOORD_0', '<f2', 2),
+        ('TEXCOORD_1', '<f2', 2),
+        ('COLOR_0', '<u2', 4),
+    ]),
+    # BufferViewVertex1Blend, 44 bytes
+    'BLEND1': np.dtype([
+        ('POSITION', '<f4', 3),
+        ('TANGENT', 'i1', 4),
+        ('NORMAL', 'i1', 4),
+        ('TEXCOORD_0', '<f2', 2),
+        ('TEXCOORD_1', '<f2', 2),
+        ('JOINTS_0', '<u2', 4),
+        ('WEIGHTS_0', '<f4'),
+        ('COLOR_0', 'i1', 4),
+    ]),
+    # BufferViewVertex4Blend, 48 bytes
+    'BLEND4': np.dtype([
+        ('POSITION', '<f4', 3),
+        ('TANGENT', 'i1', 4),
+        ('NORMAL', 'i1', 4),
+        ('TEXCOORD_0', '<f2', 2),
+        ('TEXCOORD_1', '<f2', 2),
+        ('JOINTS_0', '<u2', 4),
+        ('WEIGHTS_0', '<u2', 4),
+        ('COLOR_0', 'i1', 4),
+    ]),
+}
+
+
+class VertexData:
+    """
+    Interleaved vertices of a primitive, laid out as in an Asobo vertex buffer view.
+
+    Vertices are kept as a list of structured array chunks, written one after the other in the buffer view.
+    """
+
+    def __init__(self, vertex_type: str):
+        self.vertex_type = vertex_type
+        self.dtype = VERTEX_DTYPES[vertex_type]
+        self.chunks = []
+
+    def append(self, vertices: np.ndarray):
+        if vertices.dtype != self.dtype:
+            raise TypeError("Vertices do not have the " + self.vertex_type + " layout")
+        if len(vertices) != 0:
+            self.chunks.append(vertices)
+
+    def extend(self, other: 'VertexData'):
+        for vertices in other.chunks:
+            self.append(vertices)
+
+    def field_offset(self, name: str) -> int:
+        """Byte offset of an attribute in each vertex."""
+        return self.dtype.fields[name][1]
+
+    def position_bounds(self) -> typing.Optional[tuple]:
+        """Component wise min and max of the vertex positions."""
+        if len(self.chunks) == 0:
+            return None
+        return (
+            np.min([vertices['POSITION'].min(axis=0) for vertices in self.chunks], axis=0).tolist(),
+            np.max([vertices['POSITION'].max(axis=0) for vertices in self.chunks], axis=0).tolist()
+        )
+
+    @property
+    def count(self):
+        return sum(len(vertices) for vertices in self.chunks)
+
+    @property
+    def byte_length(self):
+        return self.count * self.dtype.itemsize
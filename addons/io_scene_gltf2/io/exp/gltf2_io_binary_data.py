@@ -14,10 +14,9 @@
 
 import typing
 import array
-import struct
+import numpy as np
 from io_scene_gltf2.io.com import gltf2_io_constants
 
-STRUCT_HALF = struct.Struct('e')
 
 class BinaryData:
     """Store for gltf binary data that can later be stored in a buffer."""
@@ -38,13 +37,15 @@ class BinaryData:
         format_char = gltf2_io_constants.ComponentType.to_type_code(gltf_component_type)
         if format_char == 'e':
             # (e) 2 byte float, not supported by array.array()
-            data = b''
-            for x in lst:
-                data += STRUCT_HALF.pack(x)
-            return BinaryData(data)
+            return BinaryData(np.asarray(lst, dtype=np.float16).tobytes())
         else:
             return BinaryData(array.array(format_char, lst).tobytes())
 
+    @classmethod
+    def from_array(cls, arr: np.ndarray, gltf_component_type: gltf2_io_constants.ComponentType):
+        format_char = gltf2_io_constants.ComponentType.to_type_code(gltf_component_type)
+        return BinaryData(np.ascontiguousarray(arr, dtype=format_char).tobytes())
+
     @property
     def byte_length(self):
         return len(self.data)
@@ -13,26 +13,84 @@
 # limitations under the License.
 
 import base64
+import os
+import shutil
+import sys
+import tempfile
 
 from io_scene_gltf2.io.com import gltf2_io
 from io_scene_gltf2.io.exp import gltf2_io_binary_data
 
+# Padding of the data, shared by all buffers
+PADDING = (b"", b"\x00", b"\x00\x00", b"\x00\x00\x00")
+
+
+class SpillFile:
+    """
+    Binary data written to a temporary file as it is added, instead of being kept in memory.
+
+    A spill file can be added to a Buffer as a single chunk, its content is copied to the output file when the
+    buffer is written.
+    """
+
+    def __init__(self):
+        self.__file = tempfile.TemporaryFile()
+        self.__byte_length = 0
+
+    def write(self, data):
+        self.__file.write(data)
+        self.__byte_length += len(data)
+
+    def __len__(self):
+        return self.__byte_length
+
+    def copy_to(self, file):
+        """Copy the content of the spill file at the current position of a binary file."""
+        self.__file.flush()
+        self.__file.seek(0)
+        if sys.platform.startswith('linux'):
+            # copied by the kernel, never read in memory
+            file.flush()
+            try:
+                offset = 0
+                while offset < self.__byte_length:
+                    sent = os.sendfile(file.fileno(), self.__file.fileno(), offset, self.__byte_length - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                file.seek(0, os.SEEK_END)
+                return
+            except (AttributeError, OSError):
+                # not a regular file, fall back to a copy by blocks
+                if offset != 0:
+                    raise
+        shutil.copyfileobj(self.__file, file)
+
+    def to_bytes(self):
+        self.__file.flush()
+        self.__file.seek(0)
+        return self.__file.read()
+
+    def close(self):
+        self.__file.close()
+
 
 class Buffer:
-    """Class representing binary data for use in a glTF file as 'buffer' property."""
+    """
+    Class representing binary data for use in a glTF file as 'buffer' property.
+
+    Data is kept as a list of chunks, so that adding data never copies what was added before.
+    The chunks are joined once, when the bytes of the whole buffer are requested.
+    """
 
     def __init__(self, buffer_index=0):
-        self.__data = b""
+        self.__chunks = []
+        self.__byte_length = 0
         self.__buffer_index = buffer_index
 
     def add_and_get_view(self, binary_data: gltf2_io_binary_data.BinaryData) -> gltf2_io.BufferView:
         """Add binary data to the buffer. Return a glTF BufferView."""
-        offset = len(self.__data)
-        self.__data += binary_data.data
-
-        # offsets should be a multiple of 4 --> therefore add padding if necessary
-        padding = (4 - (binary_data.byte_length % 4)) % 4
-        self.__data += b"\x00" * padding
+        offset = self.add(binary_data.data)
 
         buffer_view = gltf2_io.BufferView(
             buffer=self.__buffer_index,
@@ -46,26 +104,57 @@ class Buffer:
         )
         return buffer_view
 
-    def add(self, data) -> gltf2_io.BufferView:
-        """Add binary data to the buffer."""
-        offset = len(self.__data)
-        self.__data += data
+    def add(self, data) -> int:
+        """Add binary data (any bytes-like object, kept without copy) to the buffer. Return its offset."""
+        return self.add_chunks((data,))
+
+    def add_chunks(self, chunks) -> int:
+        """Add binary data given as a sequence of bytes-like chunks, without joining them. Return its offset."""
+        offset = self.__byte_length
+        for data in chunks:
+            self.__append(data)
 
         # offsets should be a multiple of 4 --> therefore add padding if necessary
-        padding = (4 - (len(data) % 4)) % 4
-        self.__data += b"\x00" * padding
+        self.__append(PADDING[(4 - ((self.__byte_length - offset) % 4)) % 4])
 
         return offset
 
+    def __append(self, data):
+        if not isinstance(data, (bytes, SpillFile)):
+            # lengths are counted in bytes, whatever the item size of the data
+            data = memoryview(data).cast('B')
+        if len(data) != 0:
+            self.__chunks.append(data)
+            self.__byte_length += len(data)
+
     @property
     def byte_length(self):
-        return len(self.__data)
+        return self.__byte_length
 
     def to_bytes(self):
-        return self.__data
+        if len(self.__chunks) != 1 or not isinstance(self.__chunks[0], bytes):
+            self.__chunks = [b"".join(chunk.to_bytes() if isinstance(chunk, SpillFile) else chunk
+                                      for chunk in self.__chunks)]
+        return self.__chunks[0]
+
+    def chunks(self) -> list:
+        """The data of the buffer, as the list of the byte chunks it was added with."""
+        return list(self.__chunks)
+
+    def write(self, file):
+        """Write the buffer to a binary file, chunk by chunk."""
+        for chunk in self.__chunks:
+            if isinstance(chunk, SpillFile):
+                chunk.copy_to(file)
+            else:
+                file.write(chunk)
 
     def to_embed_string(self):
-        return 'data:application/octet-stream;base64,' + base64.b64encode(self.__data).decode('ascii')
+        return 'data:application/octet-stream;base64,' + base64.b64encode(self.to_bytes()).decode('ascii')
 
     def clear(self):
-        self.__data = b""
+        for chunk in self.__chunks:
+            if isinstance(chunk, SpillFile):
+                chunk.close()
+        self.__chunks = []
+        self.__byte_length = 0
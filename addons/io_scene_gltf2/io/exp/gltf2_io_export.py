@@ -16,20 +16,27 @@
 # Imports
 #
 
-import json
+import contextlib
+import os
 import struct
 
+from io_scene_gltf2.io.exp.gltf2_io_buffer import SpillFile
+from io_scene_gltf2.io.exp.gltf2_io_json_writer import JSONWriter
+
 #
 # Globals
 #
 
+# Padding of the GLB chunks, by padding length
+SPACES = (b'', b' ', b'  ', b'   ')
+ZEROS = (b'', b'\0', b'\0\0', b'\0\0\0')
+
 #
 # Functions
 #
-from collections import OrderedDict
 
 
-def save_gltf(gltf, export_settings, encoder, glb_buffer):
+def save_gltf(gltf, export_settings, encoder, glb_buffer, allowed_empty_collections=()):
     indent = None
     separators = (',', ':')
 
@@ -59,59 +66,72 @@ def save_gltf(gltf, export_settings, encoder, glb_buffer):
         "cameras",
         "samplers"
     ]
-    gltf_ordered = OrderedDict(sorted(gltf.items(), key=lambda item: sort_order.index(item[0])))
-    gltf_encoded = json.dumps(gltf_ordered, indent=indent, separators=separators, cls=encoder, allow_nan=False)
 
     #
 
     if export_settings['gltf_format'] != 'GLB':
-        file = open(export_settings['gltf_filedirectory'] + export_settings['gltf_filename'], "w", encoding="utf8", newline="\n")
-        file.write(gltf_encoded)
-        file.write("\n")
-        file.close()
-
-        binary = export_settings['gltf_binary']
-        if len(binary) > 0 and not export_settings['gltf_embed_buffers']:
-            file = open(export_settings['gltf_filedirectory'] + export_settings['gltf_binaryfilename'], "wb")
-            file.write(binary)
-            file.close()
-
+        with replace_on_success(export_settings['gltf_filedirectory'] + export_settings['gltf_filename'], "w",
+                                encoding="utf8", newline="\n") as file:
+            writer = JSONWriter(file.write, indent, separators, encoder, allowed_empty_collections)
+            writer.write_gltf(gltf, sort_order)
+            file.write("\n")
     else:
-        file = open(export_settings['gltf_filedirectory'] + export_settings['gltf_filename'], "wb")
-
-        gltf_data = gltf_encoded.encode()
-        binary = glb_buffer
-
-        length_gltf = len(gltf_data)
-        spaces_gltf = (4 - (length_gltf & 3)) & 3
-        length_gltf += spaces_gltf
+        with replace_on_success(export_settings['gltf_filedirectory'] + export_settings['gltf_filename'], "wb") as file:
+            # The JSON is streamed right after the headers, which are written once its length is known
+            file.write(b'\0' * 20)
+            writer = JSONWriter(lambda text: file.write(text.encode()), indent, separators, encoder,
+                                allowed_empty_collections)
+            writer.write_gltf(gltf, sort_order)
+
+            length_gltf = writer.length
+            spaces_gltf = (4 - (length_gltf & 3)) & 3
+            length_gltf += spaces_gltf
+            file.write(SPACES[spaces_gltf])
+
+            # The binary chunk is a sequence of bytes-like chunks, written one by one without being joined
+            length_bin = sum(len(chunk) for chunk in glb_buffer)
+            zeros_bin = (4 - (length_bin & 3)) & 3
+            length_bin += zeros_bin
+
+            length = 12 + 8 + length_gltf
+            if length_bin > 0:
+                length += 8 + length_bin
+
+            # Chunk 1 (BIN)
+            if length_bin > 0:
+                file.write(struct.pack("<I4s", length_bin, b'BIN\0'))
+                for chunk in glb_buffer:
+                    if isinstance(chunk, SpillFile):
+                        chunk.copy_to(file)
+                    else:
+                        file.write(chunk)
+                file.write(ZEROS[zeros_bin])
+
+            file.seek(0)
+
+            # Header (Version 2)
+            file.write(struct.pack("<4sII", b'glTF', 2, length))
+
+            # Chunk 0 (JSON)
+            file.write(struct.pack("<I4s", length_gltf, b'JSON'))
 
-        length_bin = len(binary)
-        zeros_bin = (4 - (length_bin & 3)) & 3
-        length_bin += zeros_bin
-
-        length = 12 + 8 + length_gltf
-        if length_bin > 0:
-            length += 8 + length_bin
-
-        # Header (Version 2)
-        file.write('glTF'.encode())
-        file.write(struct.pack("I", 2))
-        file.write(struct.pack("I", length))
-
-        # Chunk 0 (JSON)
-        file.write(struct.pack("I", length_gltf))
-        file.write('JSON'.encode())
-        file.write(gltf_data)
-        file.write(b' ' * spaces_gltf)
-
-        # Chunk 1 (BIN)
-        if length_bin > 0:
-            file.write(struct.pack("I", length_bin))
-            file.write('BIN\0'.encode())
-            file.write(binary)
-            file.write(b'\0' * zeros_bin)
+    return True
 
-        file.close()
 
-    return True
+@contextlib.contextmanager
+def replace_on_success(path, mode, **kwargs):
+    """
+    Open a temporary file next to the given path, which replaces it once written.
+
+    The files are streamed while they are encoded, if anything fails the temporary file is removed and an
+    existing file at the path is left untouched, instead of being truncated.
+    """
+    temporary_path = path + '.tmp'
+    try:
+        with open(temporary_path, mode, **kwargs) as file:
+            yield file
+        os.replace(temporary_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary_path)
+        raise
@@ -0,0 +1,174 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from io_scene_gltf2.io.com import gltf2_io
+
+# Size of the text kept before it is passed to the output
+BUFFER_SIZE = 1 << 16
+
+
+class JSONWriter:
+    """
+    Incremental JSON encoder of a glTF.
+
+    The glTF is written in a single pass over the gltf2_io objects, each child of root property being converted with
+    its to_dict only when it is reached. The output is the same as json.dumps, once the JSON has been cleaned up:
+    None values and empty collections (except for the allowed keys) are left out of objects, and floats that are
+    integers are written as integers.
+
+    The text is passed to write() in pieces of about BUFFER_SIZE characters. It is always ASCII.
+    """
+
+    def __init__(self, write, indent=None, separators=(',', ':'), encoder=json.JSONEncoder,
+                 allowed_empty_collections=()):
+        self.__write = write
+        self.__indent = ' ' * indent if indent is not None else None
+        self.__item_separator, self.__key_separator = separators
+        self.__default = encoder().default
+        self.__allowed_empty_collections = set(allowed_empty_collections)
+        self.__pieces = []
+        self.__pieces_length = 0
+        self.length = 0
+
+    def write_gltf(self, gltf: gltf2_io.Gltf, key_order):
+        """Write a glTF as a JSON object, with its top level properties in the given order."""
+        properties = {
+            "accessors": gltf.accessors,
+            "animations": gltf.animations,
+            "asset": gltf.asset,
+            "buffers": gltf.buffers,
+            "bufferViews": gltf.buffer_views,
+            "cameras": gltf.cameras,
+            "extensions": gltf2_io.from_union([lambda x: gltf2_io.from_dict(gltf2_io.from_extension, x),
+                                               gltf2_io.from_none], gltf.extensions),
+            "extensionsRequired": gltf.extensions_required,
+            "extensionsUsed": gltf.extensions_used,
+            "extras": gltf2_io.from_extra(gltf.extras),
+            "images": gltf.images,
+            "materials": gltf.materials,
+            "meshes": gltf.meshes,
+            "nodes": gltf.nodes,
+            "samplers": gltf.samplers,
+            "scene": gltf.scene,
+            "scenes": gltf.scenes,
+            "skins": gltf.skins,
+            "textures": gltf.textures
+        }
+        self.__write_dict({key: properties[key] for key in key_order}, 0, True)
+        self.flush()
+
+    def write(self, text: str):
+        self.__pieces.append(text)
+        self.__pieces_length += len(text)
+        if self.__pieces_length >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.__pieces:
+            text = ''.join(self.__pieces)
+            self.__pieces = []
+            self.__pieces_length = 0
+            self.length += len(text)
+            self.__write(text)
+
+    def __write_value(self, value, level, fix):
+        if value is None:
+            self.write('null')
+        elif isinstance(value, str):
+            self.write(json.encoder.encode_basestring_ascii(value))
+        elif value is True:
+            self.write('true')
+        elif value is False:
+            self.write('false')
+        elif isinstance(value, int):
+            self.write(int.__repr__(value))
+        elif isinstance(value, float):
+            # force floats to int, if they are integers (prevent INTEGER_WRITTEN_AS_FLOAT validator warnings)
+            if fix and int(value) == value:
+                self.write(int.__repr__(int(value)))
+            else:
+                self.write(self.__float_repr(value))
+        elif isinstance(value, dict):
+            self.__write_dict(value, level, fix)
+        elif isinstance(value, list):
+            self.__write_list(value, level, fix)
+        elif isinstance(value, tuple):
+            # not cleaned up, as tuples were left as they are
+            self.__write_list(value, level, False)
+        elif hasattr(value, 'to_dict'):
+            # glTF properties, converted one at a time
+            self.__write_dict(value.to_dict(), level, fix)
+        else:
+            self.__write_value(self.__default(value), level, False)
+
+    def __write_dict(self, value, level, fix):
+        empty = True
+        for key, item in value.items():
+            if fix and (item is None or (isinstance(item, (dict, list)) and len(item) == 0
+                                         and key not in self.__allowed_empty_collections)):
+                continue
+            if empty:
+                self.write('{')
+                empty = False
+            else:
+                self.write(self.__item_separator)
+            self.__write_newline(level + 1)
+            self.write(self.__key(key))
+            self.write(self.__key_separator)
+            self.__write_value(item, level + 1, fix)
+        if empty:
+            self.write('{}')
+        else:
+            self.__write_newline(level)
+            self.write('}')
+
+    def __write_list(self, value, level, fix):
+        if len(value) == 0:
+            self.write('[]')
+            return
+        self.write('[')
+        for i, item in enumerate(value):
+            if i != 0:
+                self.write(self.__item_separator)
+            self.__write_newline(level + 1)
+            self.__write_value(item, level + 1, fix)
+        self.__write_newline(level)
+        self.write(']')
+
+    def __write_newline(self, level):
+        if self.__indent is not None:
+            self.write('\n' + self.__indent * level)
+
+    def __key(self, key):
+        if isinstance(key, str):
+            return json.encoder.encode_basestring_ascii(key)
+        if isinstance(key, float):
+            return '"' + self.__float_repr(key) + '"'
+        if key is True:
+            return '"true"'
+        if key is False:
+            return '"false"'
+        if key is None:
+            return '"null"'
+        if isinstance(key, int):
+            return '"' + int.__repr__(key) + '"'
+        raise TypeError('keys must be str, int, float, bool or None, not {}'.format(key.__class__.__name__))
+
+    @staticmethod
+    def __float_repr(value):
+        if value != value or value in (float('inf'), float('-inf')):
+            raise ValueError("Out of range float values are not JSON compliant: " + repr(value))
+        return float.__repr__(value)
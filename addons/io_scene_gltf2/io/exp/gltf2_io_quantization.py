@@ -0,0 +1,65 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import typing
+
+import numpy as np
+
+#
+# Quantization of vertex attributes to the component types of the Asobo vertex layouts
+#
+# Values are rounded to the nearest representable value (ties to even, as round() does) and clamped to the range of
+# the component type. When a dictionary of errors is given, the largest absolute difference between the values and
+# their quantized value is kept for the attribute.
+#
+
+SNORM8_MAX = 127
+UNORM16_MAX = 65535
+HALF_MAX = float(np.finfo(np.float16).max)
+
+
+def to_snorm8(values, errors: typing.Optional[dict] = None, attribute: str = None) -> np.ndarray:
+    """Signed normalized bytes, for values in [-1, 1]."""
+    values = np.asarray(values, dtype=np.float64)
+    quantized = np.clip(np.rint(values * SNORM8_MAX), -SNORM8_MAX, SNORM8_MAX).astype(np.int8)
+    __report(errors, attribute, values, quantized / SNORM8_MAX)
+    return quantized
+
+
+def to_unorm16(values, errors: typing.Optional[dict] = None, attribute: str = None) -> np.ndarray:
+    """Unsigned normalized shorts, for values in [0, 1]."""
+    values = np.asarray(values, dtype=np.float64)
+    quantized = np.clip(np.rint(values * UNORM16_MAX), 0, UNORM16_MAX).astype(np.uint16)
+    __report(errors, attribute, values, quantized / UNORM16_MAX)
+    return quantized
+
+
+def to_half(values, errors: typing.Optional[dict] = None, attribute: str = None) -> np.ndarray:
+    """Half floats, values out of their range are clamped to the largest finite half float."""
+    values = np.asarray(values)
+    quantized = np.clip(values, -HALF_MAX, HALF_MAX).astype(np.float16)
+    __report(errors, attribute, values, quantized)
+    return quantized
+
+
+def format_errors(errors: dict) -> typing.List[str]:
+    """One line per attribute, with its maximum quantization error."""
+    return ['{}: max quantization error {:.6g}'.format(attribute, error) for attribute, error in sorted(errors.items())]
+
+
+def __report(errors, attribute, values, quantized_values):
+    if errors is None or values.size == 0:
+        return
+    error = float(np.max(np.abs(quantized_values.astype(np.float64) - values)))
+    errors[attribute] = max(errors.get(attribute, 0.0), error)
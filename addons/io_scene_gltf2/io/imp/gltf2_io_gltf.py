@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ..com.gltf2_io import gltf_from_dict
+from ..com.gltf2_io_from_dict import gltf_from_dict
 from ..com.gltf2_io_debug import Log
 import logging
 import json
@@ -37,6 +37,9 @@ class glTFImporter():
         if 'loglevel' not in self.import_settings.keys():
             self.import_settings['loglevel'] = logging.ERROR
 
+        # skip validation of the JSON, for files written by this addon
+        self.trusted = self.import_settings.get('import_trusted', False)
+
         log = Log(import_settings['loglevel'])
         self.log = log.logger
         self.log_handler = log.hdlr
@@ -124,7 +127,7 @@ class glTFImporter():
         try:
             json_str = str(json_bytes, encoding='utf-8')
             json_ = json.loads(json_str, parse_constant=glTFImporter.bad_json_value)
-            self.data = gltf_from_dict(json_)
+            self.data = gltf_from_dict(json_, self.trusted)
         except ValueError as e:
             return False, e.args[0]
 
@@ -164,7 +167,8 @@ class glTFImporter():
             content = str(self.content, encoding='utf-8')
             self.content = None
             try:
-                self.data = gltf_from_dict(json.loads(content, parse_constant=glTFImporter.bad_json_value))
+                self.data = gltf_from_dict(json.loads(content, parse_constant=glTFImporter.bad_json_value),
+                                           self.trusted)
                 return True, None
             except ValueError as e:
                 return False, e.args[0]
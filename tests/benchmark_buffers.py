@@ -0,0 +1,58 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Micro-benchmark of the export buffers: appends the data of many accessors, then finalizes the buffer.
+#
+# Usage: blender -b --python tests/benchmark_buffers.py -- [accessor count]
+#    or: python tests/benchmark_buffers.py [accessor count], with the bpy module installed
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'addons'))
+
+from io_scene_gltf2.io.exp.gltf2_io_asobo_buffer import AsoboBuffer
+from io_scene_gltf2.io.exp.gltf2_io_binary_data import BinaryData
+from io_scene_gltf2.io.exp.gltf2_io_buffer import Buffer
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+accessor_count = int(argv[0]) if argv else 100000
+
+# Accessor sized data, from a single index up to a few vertices, most of them not 4 byte aligned
+accessors = [BinaryData(bytes(range(i % 7, i % 7 + 2 + (i % 61)))) for i in range(accessor_count)]
+
+start = time.perf_counter()
+asobo_buffer = AsoboBuffer()
+for binary_data in accessors:
+    offset = asobo_buffer.append_data(binary_data, True, True)
+    assert offset % 4 == 0
+asobo_bytes = asobo_buffer.to_bytes()
+asobo_time = time.perf_counter() - start
+
+start = time.perf_counter()
+buffer = Buffer()
+for binary_data in accessors:
+    offset = buffer.add(binary_data.data)
+    assert offset % 4 == 0
+buffer.add(asobo_bytes)
+buffer_bytes = buffer.to_bytes()
+buffer_time = time.perf_counter() - start
+
+assert len(buffer_bytes) == buffer.byte_length
+assert buffer.byte_length % 4 == 0
+
+print('{} accessors, {} bytes'.format(accessor_count, buffer.byte_length))
+print('AsoboBuffer.append_data: {:.3f} s'.format(asobo_time))
+print('Buffer.add:              {:.3f} s'.format(buffer_time))
@@ -0,0 +1,71 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Micro-benchmark of the traversal of the exported glTF properties: adds a scene of many nodes to the exporter.
+#
+# Usage: blender -b --python tests/benchmark_traversal.py -- [node count]
+#    or: python tests/benchmark_traversal.py [node count], with the bpy module installed
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'addons'))
+
+from io_scene_gltf2.io.com import gltf2_io
+from io_scene_gltf2.blender.exp import gltf2_blender_export_keys
+from io_scene_gltf2.blender.exp.gltf2_blender_gltf2_exporter import GlTF2Exporter
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+node_count = int(argv[0]) if argv else 10000
+repeat = 5
+
+
+def create_scene():
+    """Groups of 100 nodes, with their transforms, a camera for one node of each group and custom properties."""
+    cameras = [gltf2_io.Camera(extensions=None, extras=None, name='Camera', orthographic=None,
+                               perspective=gltf2_io.CameraPerspective(aspect_ratio=1.5, extensions=None, extras=None,
+                                                                      yfov=0.8, zfar=100.0, znear=0.1),
+                               type='perspective')]
+    roots = []
+    for group in range(0, node_count, 100):
+        children = [gltf2_io.Node(camera=cameras[0] if i == 0 else None, children=[], extensions=None,
+                                  extras={'index': group + i}, matrix=None, mesh=None, name='Node' + str(group + i),
+                                  rotation=[0.0, 0.0, 0.0, 1.0], scale=[1.0, 1.0, 1.0], skin=None,
+                                  translation=[float(i), 0.0, 0.0], weights=None)
+                    for i in range(1, min(100, node_count - group))]
+        roots.append(gltf2_io.Node(camera=None, children=children, extensions=None, extras=None, matrix=None,
+                                   mesh=None, name='Group' + str(group), rotation=None, scale=None, skin=None,
+                                   translation=[0.0, float(group), 0.0], weights=None))
+    return gltf2_io.Scene(extensions=None, extras=None, name='Scene', nodes=roots)
+
+
+export_settings = {
+    gltf2_blender_export_keys.COPYRIGHT: None,
+    gltf2_blender_export_keys.SPILL_BUFFERS: False,
+}
+
+times = []
+for _ in range(repeat):
+    scene = create_scene()
+    exporter = GlTF2Exporter(export_settings)
+    start = time.perf_counter()
+    exporter.add_scene(scene, True)
+    times.append(time.perf_counter() - start)
+
+exporter.finalize_buffer()
+assert len(exporter.glTF.nodes) == node_count
+
+print('{} nodes'.format(node_count))
+print('GlTF2Exporter.add_scene: {:.3f} s (best of {})'.format(min(times), repeat))
@@ -0,0 +1,222 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Unit tests of the mesh extraction: the NumPy extraction, in one go or in chunks, gathers the same primitives as the
+# legacy extraction, once their attributes are quantized.
+#
+# Usage: blender -b --python tests/test_extraction.py
+#    or: python -m pytest tests/test_extraction.py, with the bpy module installed
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'addons'))
+
+from io_scene_gltf2.blender.exp import gltf2_blender_export_keys
+from io_scene_gltf2.blender.exp import gltf2_blender_gather_primitives
+from io_scene_gltf2.io.com.gltf2_io_constants import ComponentType
+from io_scene_gltf2.io.exp.gltf2_io_asobo_vertex import VERTEX_DTYPES, VertexData
+from io_scene_gltf2.io.exp.gltf2_io_binary_data import BinaryData
+
+import bpy
+
+# Module private function, looked up by name as it would be mangled in the test classes
+gather_cache_primitives = getattr(gltf2_blender_gather_primitives, '__gather_cache_primitives')
+
+BONE_COUNT = 6
+
+
+def create_object(skinned, shape_keys, max_influences=BONE_COUNT, seed=0):
+    """
+    A triangulated sphere with 2 UV maps, vertex colors, 2 materials, flat and smooth faces, and optionally an
+    armature with up to max_influences influences per vertex, and shape keys.
+    """
+    for collection in (bpy.data.objects, bpy.data.meshes, bpy.data.armatures, bpy.data.materials):
+        for data_block in list(collection):
+            collection.remove(data_block)
+    rng = np.random.default_rng(seed)
+
+    bpy.ops.mesh.primitive_ico_sphere_add(subdivisions=2)
+    blender_object = bpy.context.active_object
+    blender_mesh = blender_object.data
+    blender_mesh.polygons.foreach_set('use_smooth', np.arange(len(blender_mesh.polygons)) % 3 != 0)
+
+    # Values on a coarse grid, so that some corners share their vertex. The sphere has a first UV map, the Asobo
+    # vertex layouts have room for 2 of them.
+    blender_mesh.uv_layers.new(name='UVMap.001')
+    for uv_layer in blender_mesh.uv_layers:
+        uv_layer.data.foreach_set('uv', (np.round(rng.random(2 * len(blender_mesh.loops)) * 4) / 4).astype(np.float32))
+    colors = blender_mesh.vertex_colors.new(name='Col')
+    colors.data.foreach_set('color', (np.round(rng.random(4 * len(blender_mesh.loops)) * 2) / 2).astype(np.float32))
+
+    for name in ('Material', 'Material.001'):
+        blender_mesh.materials.append(bpy.data.materials.new(name))
+    blender_mesh.polygons.foreach_set('material_index', rng.integers(0, 2, len(blender_mesh.polygons)))
+
+    if shape_keys:
+        blender_object.shape_key_add(name='Basis')
+        for name in ('Key 1', 'Key 2'):
+            shape_key = blender_object.shape_key_add(name=name)
+            co = np.empty(3 * len(blender_mesh.vertices), dtype=np.float32)
+            shape_key.data.foreach_get('co', co)
+            shape_key.data.foreach_set('co', co + (rng.random(len(co)) * 0.1).astype(np.float32))
+
+    if skinned:
+        bpy.ops.object.armature_add()
+        armature = bpy.context.active_object
+        bpy.ops.object.mode_set(mode='EDIT')
+        edit_bones = armature.data.edit_bones
+        bone_names = [edit_bones[0].name]
+        for i in range(1, BONE_COUNT):
+            edit_bone = edit_bones.new('Bone.{:03}'.format(i))
+            edit_bone.head = (0.0, 0.0, 0.2 * i)
+            edit_bone.tail = (0.0, 0.1, 0.2 * i + 0.2)
+            edit_bone.parent = edit_bones[bone_names[-1]]
+            bone_names.append(edit_bone.name)
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        vertex_groups = [blender_object.vertex_groups.new(name=name) for name in bone_names]
+        for vertex in blender_mesh.vertices:
+            # from 1 to max_influences influences, some of them with a zero weight
+            for group in rng.choice(BONE_COUNT, rng.integers(1, max_influences + 1), replace=False):
+                weight = float(rng.random()) if rng.random() > 0.1 else 0.0
+                vertex_groups[group].add([vertex.index], weight, 'REPLACE')
+        modifier = blender_object.modifiers.new('Armature', 'ARMATURE')
+        modifier.object = armature
+        blender_object.parent = armature
+
+    bpy.context.view_layer.update()
+    return blender_object
+
+
+def export_settings(**settings):
+    result = {
+        gltf2_blender_export_keys.YUP: True,
+        gltf2_blender_export_keys.MATERIALS: True,
+        gltf2_blender_export_keys.SKINS: True,
+        'gltf_def_bones': False,
+        gltf2_blender_export_keys.EXTRAS: False,
+        gltf2_blender_export_keys.ANIMATIONS: False,
+        gltf2_blender_export_keys.FORCE_SAMPLING: False,
+        gltf2_blender_export_keys.FRAME_RANGE: False,
+        'gltf_current_frame': True,
+        'gltf_user_extensions': [],
+        'gltf_all_vertex_influences': False,
+        gltf2_blender_export_keys.MORPH: True,
+        gltf2_blender_export_keys.MORPH_NORMAL: True,
+        gltf2_blender_export_keys.MORPH_TANGENT: False,
+        gltf2_blender_export_keys.NORMALS: True,
+        gltf2_blender_export_keys.TANGENTS: True,
+        gltf2_blender_export_keys.TEX_COORDS: True,
+        gltf2_blender_export_keys.COLORS: True,
+        gltf2_blender_export_keys.LEGACY_EXTRACTION: False,
+        gltf2_blender_export_keys.EXTRACTION_CHUNK_SIZE: 0,
+        gltf2_blender_export_keys.QUANTIZATION_ERRORS: {},
+    }
+    result.update(settings)
+    return result
+
+
+def gather(blender_object, **settings):
+    """The primitives of the object, with their attributes quantized as they are written in the buffers."""
+    skinned = len(blender_object.modifiers) != 0
+    return gather_cache_primitives(blender_object.data, None, blender_object if skinned else None,
+                                   blender_object.vertex_groups if skinned else None,
+                                   blender_object.modifiers if skinned else None, export_settings(**settings))
+
+
+def accessor_values(accessor, attribute, vertex_type):
+    """The values of an accessor, as they are written in the buffer: in the vertex layout, if they are part of it."""
+    data = accessor.buffer_view
+    if isinstance(data, VertexData):
+        return np.concatenate([vertices[attribute] for vertices in data.chunks]).reshape(-1)
+    layout = VERTEX_DTYPES[vertex_type] if vertex_type is not None else None
+    if layout is not None and attribute in layout.names:
+        dtype = layout[attribute].base
+    else:
+        dtype = np.dtype(ComponentType.to_type_code(accessor.component_type))
+    if isinstance(data, BinaryData):
+        return np.frombuffer(data.data, dtype)
+    return np.asarray(data).astype(dtype).reshape(-1)
+
+
+class TestExtraction(unittest.TestCase):
+    def assert_same_primitives(self, legacy_primitives, primitives):
+        self.assertEqual(len(primitives), len(legacy_primitives))
+        for legacy_primitive, primitive in zip(legacy_primitives, primitives):
+            self.assertEqual(primitive['material'], legacy_primitive['material'])
+            self.assertEqual(primitive['extras'], legacy_primitive['extras'])
+            np.testing.assert_array_equal(accessor_values(primitive['indices'], None, None),
+                                          accessor_values(legacy_primitive['indices'], None, None))
+
+            vertex_type = legacy_primitive['extras']['ASOBO_primitive']['VertexType']
+            self.assertEqual(sorted(primitive['attributes']), sorted(legacy_primitive['attributes']))
+            for attribute, legacy_accessor in legacy_primitive['attributes'].items():
+                with self.subTest(attribute=attribute):
+                    accessor = primitive['attributes'][attribute]
+                    self.assertEqual((accessor.component_type, accessor.type, accessor.count),
+                                     (legacy_accessor.component_type, legacy_accessor.type, legacy_accessor.count))
+                    np.testing.assert_array_equal(accessor_values(accessor, attribute, vertex_type),
+                                                  accessor_values(legacy_accessor, attribute, vertex_type))
+
+            legacy_targets = legacy_primitive['targets'] or []
+            targets = primitive['targets'] or []
+            self.assertEqual(len(targets), len(legacy_targets))
+            for legacy_target, target in zip(legacy_targets, targets):
+                self.assertEqual(sorted(target), sorted(legacy_target))
+                for attribute, legacy_accessor in legacy_target.items():
+                    with self.subTest(target_attribute=attribute):
+                        # Morph targets are not quantized, only rounding differs
+                        np.testing.assert_allclose(accessor_values(target[attribute], attribute, None),
+                                                   accessor_values(legacy_accessor, attribute, None), atol=1e-6)
+
+    def check(self, blender_object, **settings):
+        legacy_primitives = gather(blender_object, **settings, gltf_legacy_extraction=True)
+        primitives = gather(blender_object, **settings)
+        self.assert_same_primitives(legacy_primitives, primitives)
+        return primitives
+
+    def test_static(self):
+        primitives = self.check(create_object(skinned=False, shape_keys=True))
+        self.assertEqual({primitive['extras']['ASOBO_primitive']['VertexType'] for primitive in primitives}, {'VTX'})
+        self.assertEqual(len(primitives[0]['targets']), 2)
+
+    def test_skinned(self):
+        primitives = self.check(create_object(skinned=True, shape_keys=True))
+        self.assertEqual({primitive['extras']['ASOBO_primitive']['VertexType'] for primitive in primitives},
+                         {'BLEND4'})
+        self.assertEqual(len(primitives[0]['targets']), 2)
+
+    def test_skinned_single_influence(self):
+        primitives = self.check(create_object(skinned=True, shape_keys=False, max_influences=1))
+        self.assertEqual({primitive['extras']['ASOBO_primitive']['VertexType'] for primitive in primitives},
+                         {'BLEND1'})
+
+    def test_skinned_all_influences(self):
+        primitives = self.check(create_object(skinned=True, shape_keys=False), gltf_all_vertex_influences=True)
+        self.assertIn('JOINTS_1', primitives[0]['attributes'])
+
+    def test_static_chunks(self):
+        self.check(create_object(skinned=False, shape_keys=False), gltf_extraction_chunk_size=50)
+
+    def test_skinned_chunks(self):
+        primitives = self.check(create_object(skinned=True, shape_keys=False), gltf_extraction_chunk_size=50)
+        self.assertIsInstance(primitives[0]['attributes']['POSITION'].buffer_view, VertexData)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=[sys.argv[0]])
@@ -0,0 +1,60 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Unit tests of the field tuples of the gltf2_io property classes, which the exporter traverses.
+#
+# Usage: blender -b --python tests/test_gltf2_io.py
+#    or: python -m pytest tests/test_gltf2_io.py, with the bpy module installed
+
+import inspect
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'addons'))
+
+from io_scene_gltf2.io.com import gltf2_io
+
+# The glTF property classes, as generated with their from_dict and to_dict methods
+PROPERTY_CLASSES = [cls for cls in vars(gltf2_io).values()
+                    if inspect.isclass(cls) and cls.__module__ == gltf2_io.__name__ and hasattr(cls, 'from_dict')]
+
+
+class TestFields(unittest.TestCase):
+    def test_property_classes(self):
+        self.assertIn(gltf2_io.Gltf, PROPERTY_CLASSES)
+        self.assertIn(gltf2_io.Node, PROPERTY_CLASSES)
+
+    def test_fields_match_init(self):
+        # The _fields tuples are written by hand: a regenerated gltf2_io must keep them, or the exporter visits nothing
+        for cls in PROPERTY_CLASSES:
+            with self.subTest(cls=cls.__name__):
+                self.assertIn('_fields', vars(cls))
+                parameters = list(inspect.signature(cls.__init__).parameters)[1:]
+                self.assertEqual(sorted(cls._fields), sorted(parameters))
+
+    def test_fields_are_sorted(self):
+        # The exporter visits the fields in this order, which is the order of the root arrays
+        for cls in PROPERTY_CLASSES:
+            with self.subTest(cls=cls.__name__):
+                self.assertEqual(list(cls._fields), sorted(cls._fields))
+
+    def test_slots(self):
+        for cls in PROPERTY_CLASSES:
+            with self.subTest(cls=cls.__name__):
+                self.assertEqual(cls.__slots__[:len(cls._fields)], cls._fields)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=[sys.argv[0]])
@@ -0,0 +1,114 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Unit tests of the quantization of vertex attributes.
+#
+# Usage: blender -b --python tests/test_quantization.py
+#    or: python -m pytest tests/test_quantization.py, with the bpy module installed
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'addons'))
+
+from io_scene_gltf2.io.exp.gltf2_io_quantization import HALF_MAX, format_errors, to_half, to_snorm8, to_unorm16
+
+
+class TestSnorm8(unittest.TestCase):
+    def test_rounding_ties_to_even(self):
+        quantized = to_snorm8(np.array([0.5, 1.5, 2.5, -0.5, -1.5]) / 127)
+        self.assertEqual(quantized.dtype, np.int8)
+        self.assertEqual(quantized.tolist(), [0, 2, 2, 0, -2])
+
+    def test_clamping(self):
+        self.assertEqual(to_snorm8([1.0, 1.5, -1.0, -2.0]).tolist(), [127, 127, -127, -127])
+
+    def test_error(self):
+        errors = {}
+        to_snorm8([0.5 / 127, 1.0], errors, 'NORMAL')
+        self.assertAlmostEqual(errors['NORMAL'], 0.5 / 127)
+
+
+class TestUnorm16(unittest.TestCase):
+    def test_rounding_ties_to_even(self):
+        quantized = to_unorm16(np.array([0.5, 1.5, 2.5, 3.5]) / 65535)
+        self.assertEqual(quantized.dtype, np.uint16)
+        self.assertEqual(quantized.tolist(), [0, 2, 2, 4])
+
+    def test_clamping(self):
+        self.assertEqual(to_unorm16([-0.1, 0.0, 1.0, 1.2]).tolist(), [0, 0, 65535, 65535])
+
+    def test_clamping_error(self):
+        errors = {}
+        to_unorm16([1.2], errors, 'WEIGHTS_0')
+        self.assertAlmostEqual(errors['WEIGHTS_0'], 0.2)
+
+
+class TestHalf(unittest.TestCase):
+    def test_values(self):
+        quantized = to_half([0.0, 1.0, -2.5])
+        self.assertEqual(quantized.dtype, np.float16)
+        self.assertEqual(quantized.tolist(), [0.0, 1.0, -2.5])
+
+    def test_overflow_is_clamped(self):
+        quantized = to_half([1e5, -1e5, 65504.0])
+        self.assertTrue(np.all(np.isfinite(quantized)))
+        self.assertEqual(quantized.tolist(), [HALF_MAX, -HALF_MAX, HALF_MAX])
+        self.assertEqual(HALF_MAX, 65504.0)
+
+    def test_error(self):
+        errors = {}
+        to_half([1e5], errors, 'TEXCOORD_0')
+        self.assertEqual(errors['TEXCOORD_0'], 1e5 - 65504.0)
+
+
+class TestErrors(unittest.TestCase):
+    def test_largest_error_is_kept(self):
+        errors = {}
+        to_snorm8([0.5 / 127], errors, 'NORMAL')
+        to_snorm8([0.0], errors, 'NORMAL')
+        self.assertAlmostEqual(errors['NORMAL'], 0.5 / 127)
+        to_snorm8([2.0], errors, 'NORMAL')
+        self.assertAlmostEqual(errors['NORMAL'], 1.0)
+
+    def test_no_errors(self):
+        self.assertEqual(to_snorm8([0.5], None, 'NORMAL').tolist(), [64])
+        self.assertEqual(to_unorm16([0.5], attribute='WEIGHTS_0').tolist(), [32768])
+
+    def test_empty_values_are_not_reported(self):
+        errors = {}
+        self.assertEqual(to_snorm8(np.empty((0, 4)), errors, 'TANGENT').shape, (0, 4))
+        to_half([], errors, 'TEXCOORD_0')
+        self.assertEqual(errors, {})
+
+    def test_exact_values_report_no_error(self):
+        errors = {}
+        to_unorm16([0.0, 1.0], errors, 'COLOR_0')
+        self.assertEqual(errors, {'COLOR_0': 0.0})
+
+    def test_format_errors(self):
+        errors = {'TEXCOORD_0': 0.25, 'NORMAL': 1 / 254, 'COLOR_0': 0.0}
+        self.assertEqual(format_errors(errors), [
+            'COLOR_0: max quantization error 0',
+            'NORMAL: max quantization error 0.00393701',
+            'TEXCOORD_0: max quantization error 0.25',
+        ])
+        self.assertEqual(format_errors({}), [])
+
+
+if __name__ == '__main__':
+    unittest.main(argv=[sys.argv[0]])
@@ -0,0 +1,201 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Unit tests of the split of primitives using more vertices than 16 bit indices can address.
+#
+# Usage: blender -b --python tests/test_split_primitives.py
+#    or: python -m pytest tests/test_split_primitives.py, with the bpy module installed
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'addons'))
+
+from io_scene_gltf2.blender.exp import gltf2_blender_gather_primitives
+from io_scene_gltf2.blender.exp.gltf2_blender_gather_primitives import MAX_PRIMITIVE_VERTEX_COUNT
+from io_scene_gltf2.io.exp.gltf2_io_asobo_vertex import VertexData
+
+# Module private functions, looked up by name as they would be mangled in the test classes
+partition_triangles = getattr(gltf2_blender_gather_primitives, '__partition_triangles')
+split_primitive = getattr(gltf2_blender_gather_primitives, '__split_primitive')
+rebase_indices = getattr(gltf2_blender_gather_primitives, '__rebase_indices')
+
+
+def random_indices(triangle_count, vertex_count, seed=0):
+    """Triangles of vertices picked at random, all of them used."""
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, vertex_count, 3 * triangle_count, dtype=np.uint32)
+    indices[:vertex_count] = rng.permutation(vertex_count)
+    return indices
+
+
+def sequential_indices(triangle_count):
+    """Triangles sharing no vertices."""
+    return np.arange(3 * triangle_count, dtype=np.uint32)
+
+
+def grid_indices(size):
+    """Two triangles per quad of a grid of size x size quads, row by row."""
+    corners = np.arange(size * (size + 1)).reshape(size, size + 1)[:, :-1].reshape(-1)
+    quads = np.stack((corners, corners + 1, corners + size + 2, corners + size + 1), axis=1)
+    return quads[:, [0, 1, 2, 0, 2, 3]].reshape(-1).astype(np.uint32)
+
+
+def vertex_attributes(vertex_count):
+    """Attributes of each vertex, derived from its index to check where it comes from."""
+    index = np.arange(vertex_count, dtype=np.float32)
+    return {
+        'POSITION': np.stack((index, -index, index * 0.5), axis=1).reshape(-1),
+        'TEXCOORD_0': np.stack((index, index + 1), axis=1).reshape(-1),
+    }
+
+
+class TestPartitionTriangles(unittest.TestCase):
+    def check_partition(self, indices, vertex_count):
+        parts = list(partition_triangles(indices, vertex_count))
+
+        rebuilt = []
+        for part, (local_indices, vertex_indices) in enumerate(parts):
+            self.assertEqual(local_indices.dtype, np.uint32)
+            self.assertLessEqual(len(vertex_indices), MAX_PRIMITIVE_VERTEX_COUNT)
+            self.assertEqual(len(np.unique(vertex_indices)), len(vertex_indices))
+            self.assertEqual(len(local_indices) % 3, 0)
+            # every vertex of the part is used, numbered in the order of their first use
+            first_uses = np.unique(local_indices, return_index=True)[1]
+            np.testing.assert_array_equal(np.unique(local_indices), np.arange(len(vertex_indices)))
+            self.assertTrue(np.all(np.diff(first_uses) > 0))
+            rebuilt.append(vertex_indices[local_indices])
+
+            # runs are as long as possible: the next triangle does not fit in the part
+            if part + 1 < len(parts):
+                next_triangle = parts[part + 1][1][parts[part + 1][0][:3]]
+                used_vertices = np.union1d(vertex_indices, next_triangle)
+                self.assertGreater(len(used_vertices), MAX_PRIMITIVE_VERTEX_COUNT)
+
+        np.testing.assert_array_equal(np.concatenate(rebuilt), indices)
+        return parts
+
+    def test_small(self):
+        indices = random_indices(1000, 500)
+        parts = self.check_partition(indices, 500)
+        self.assertEqual(len(parts), 1)
+
+    def test_random(self):
+        parts = self.check_partition(random_indices(200000, 150000), 150000)
+        self.assertGreater(len(parts), 2)
+
+    def test_sequential(self):
+        parts = self.check_partition(sequential_indices(100000), 300000)
+        self.assertEqual(len(parts), 5)
+        self.assertEqual([len(vertex_indices) for _, vertex_indices in parts[:-1]], [65529] * 4)
+
+    def test_grid(self):
+        size = 400
+        parts = self.check_partition(grid_indices(size), (size + 1) ** 2)
+        self.assertGreater(len(parts), 2)
+
+    def test_exact_limit(self):
+        indices = sequential_indices(MAX_PRIMITIVE_VERTEX_COUNT // 3)
+        parts = self.check_partition(indices, MAX_PRIMITIVE_VERTEX_COUNT)
+        self.assertEqual(len(parts), 1)
+
+
+class TestSplitPrimitive(unittest.TestCase):
+    def test_not_split(self):
+        primitive = {'indices': random_indices(100, 50), 'attributes': vertex_attributes(50), 'VertexType': 'VTX'}
+        self.assertEqual(split_primitive(primitive), [primitive])
+
+    def test_attributes(self):
+        size = 300
+        vertex_count = (size + 1) ** 2
+        indices = grid_indices(size)
+        attributes = vertex_attributes(vertex_count)
+        primitive = {'indices': indices, 'attributes': attributes, 'material': 2, 'VertexType': 'VTX'}
+
+        parts = split_primitive(primitive)
+        self.assertGreater(len(parts), 1)
+        rebuilt = {attr: [] for attr in attributes}
+        for part in parts:
+            self.assertEqual(part['material'], 2)
+            self.assertIsNone(part['BaseVertexIndex'])
+            part_vertex_count = len(part['attributes']['POSITION']) // 3
+            self.assertLessEqual(part_vertex_count, MAX_PRIMITIVE_VERTEX_COUNT)
+            self.assertLess(int(part['indices'].max()), part_vertex_count)
+            for attr, values in part['attributes'].items():
+                rebuilt[attr].append(values.reshape(part_vertex_count, -1)[part['indices']])
+
+        # the triangles of the parts have the vertices of the original triangles, in the same order
+        for attr, values in attributes.items():
+            expected = values.reshape(vertex_count, -1)[indices]
+            np.testing.assert_array_equal(np.concatenate(rebuilt[attr]), expected)
+
+    def test_vertex_data(self):
+        size = 300
+        vertex_count = (size + 1) ** 2
+        indices = grid_indices(size)
+        vertices = VertexData('BLEND4')
+        all_vertices = np.zeros(vertex_count, dtype=vertices.dtype)
+        all_vertices['POSITION'] = vertex_attributes(vertex_count)['POSITION'].reshape(-1, 3)
+        all_vertices['JOINTS_0'][:, 0] = np.arange(vertex_count) % 7
+        # the vertices are split over several chunks, as with a chunked extraction
+        for chunk in np.array_split(all_vertices, 5):
+            vertices.append(chunk)
+        primitive = {'indices': indices, 'vertices': vertices, 'VertexType': 'BLEND4'}
+
+        parts = split_primitive(primitive)
+        self.assertGreater(len(parts), 1)
+        rebuilt = []
+        for part in parts:
+            self.assertEqual(part['vertices'].vertex_type, 'BLEND4')
+            self.assertEqual(len(part['vertices'].chunks), 1)
+            self.assertLessEqual(part['vertices'].count, MAX_PRIMITIVE_VERTEX_COUNT)
+            rebuilt.append(part['vertices'].chunks[0][part['indices']])
+
+        np.testing.assert_array_equal(np.concatenate(rebuilt), all_vertices[indices])
+
+
+class TestBaseVertexIndex(unittest.TestCase):
+    def test_rebase_round_trip(self):
+        # A grid split in parts, then sharing its vertices with the other primitives of the mesh
+        size = 400
+        vertex_count = (size + 1) ** 2
+        indices = grid_indices(size)
+        primitives = split_primitive({'indices': indices, 'attributes': vertex_attributes(vertex_count),
+                                      'VertexType': 'VTX'})
+        primitives.append({'indices': sequential_indices(10), 'attributes': vertex_attributes(30),
+                           'VertexType': 'VTX'})
+        vertex_counts = [len(primitive['attributes']['POSITION']) // 3 for primitive in primitives]
+        expected = [primitive['indices'] + offset
+                    for primitive, offset in zip(primitives, np.cumsum([0] + vertex_counts[:-1]))]
+
+        rebase_indices(primitives)
+
+        base_vertex_indices = [primitive['BaseVertexIndex'] for primitive in primitives]
+        self.assertIsNone(base_vertex_indices[0])
+        self.assertGreater(max(base_vertex_indices[1:]), 65535)
+        for primitive, expected_indices in zip(primitives, expected):
+            # The indices are exported as 16 bit integers
+            self.assertLessEqual(int(primitive['indices'].max()), 65535)
+            exported_indices = primitive['indices'].astype(np.uint16)
+            # As the importer rebuilds them, the sum must not overflow the 16 bit type of the decoded indices
+            base_vertex_index = primitive['BaseVertexIndex'] or 0
+            imported_indices = list(map(lambda x: int(x) + base_vertex_index, exported_indices))
+            self.assertEqual(imported_indices, expected_indices.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main(argv=[sys.argv[0]])